@@ -8,6 +8,8 @@ from rlbot.utils.structures.quick_chats import QuickChats
 import util.drive
 from gui.application import AppThread
 from tools.contollers import PIDController
+from tools.performance import profile_agent
+from tools.recording import record_agent
 from tools.timers import TimedActionController
 from util.vec import Vec3
 
@@ -21,6 +23,9 @@ class SprintingCheetah(BaseAgent):
         self.pid_speed = PIDController(0.042, 0.000101, -0.007)
         self.pid_boost = PIDController(0.052, 0.000006, -0.001)
         self.previous_velocity = 0
+        self.profiler = profile_agent(self, final_section='plotting')
+        # Recordings of the drive sweeps are what tools.drive_model fits its acceleration curves to
+        record_agent(self)
 
     def initialize_agent(self):
         self.gui_thread = AppThread()
@@ -82,6 +87,7 @@ class SprintingCheetah(BaseAgent):
 
         # Teleports/wraps the agent car back to the opposite site of the field
         self.field_boundaries_check_control(packet)
+        self.profiler.lap('control')
 
         # Getting target directions
         target_position = Vec3(10, 100, 20)
@@ -93,11 +99,13 @@ class SprintingCheetah(BaseAgent):
         self.renderer.draw_rect_3d(target_position, 10, 10, True, self.renderer.red(), True)
         self.renderer.draw_line_3d(target_position, target_position + target_direction * 250, self.renderer.red())
         self.renderer.end_rendering()
+        self.profiler.lap('rendering')
 
         # plot the turn angles with power slide
         # make something that layers timed controls
 
         self.plot_data(packet, 0, 40)
+        self.gui_thread.flush()
 
         return self.controls
 
@@ -140,10 +148,10 @@ class SprintingCheetah(BaseAgent):
                 ), 200)
             })
             self.set_game_state(game_state)
-            self.gui_thread.send(f'velocity:{0}:{self.action_controller.current_time * 120}')
-            self.gui_thread.send(f'acceleration:{0}:{self.action_controller.current_time * 120}')
-            self.gui_thread.send(f'pid_speed:{0}:{self.action_controller.current_time * 120}')
-            self.gui_thread.send(f'pid_boost:{0}:{self.action_controller.current_time * 120}')
+            self.gui_thread.sample('velocity', self.action_controller.current_time * 120, 0)
+            self.gui_thread.sample('acceleration', self.action_controller.current_time * 120, 0)
+            self.gui_thread.sample('pid_speed', self.action_controller.current_time * 120, 0)
+            self.gui_thread.sample('pid_boost', self.action_controller.current_time * 120, 0)
 
         def drive(packet: GameTickPacket):
             self.renderer.draw_string_2d(
@@ -163,8 +171,8 @@ class SprintingCheetah(BaseAgent):
             self.controls.throttle = util.drive.limit_to_safe_range(speed)
             self.controls.steer = steer
             self.controls.boost = boost > 1
-            self.gui_thread.send(f'pid_speed:{speed * 100}:{self.action_controller.current_time * 120}')
-            self.gui_thread.send(f'pid_boost:{boost * 100}:{self.action_controller.current_time * 120}')
+            self.gui_thread.sample('pid_speed', self.action_controller.current_time * 120, speed * 100)
+            self.gui_thread.sample('pid_boost', self.action_controller.current_time * 120, boost * 100)
 
         def finish(_):
             self.renderer.draw_string_2d(
@@ -173,8 +181,8 @@ class SprintingCheetah(BaseAgent):
             )
             self.pid_speed.reset()
             self.pid_boost.reset()
-            self.gui_thread.send(f'pid_speed:{0}:{self.action_controller.current_time * 120}')
-            self.gui_thread.send(f'pid_boost:{0}:{self.action_controller.current_time * 120}')
+            self.gui_thread.sample('pid_speed', self.action_controller.current_time * 120, 0)
+            self.gui_thread.sample('pid_boost', self.action_controller.current_time * 120, 0)
 
         self.action_controller.create(start, 0, setup)
         start += 10 / 120
@@ -202,5 +210,5 @@ class SprintingCheetah(BaseAgent):
         self.previous_velocity = speed
 
         current_tick = current_time * 120
-        self.gui_thread.send(f'acceleration:{acceleration}:{current_tick}')
-        self.gui_thread.send(f'velocity:{speed}:{current_tick}')
+        self.gui_thread.sample('acceleration', current_tick, acceleration)
+        self.gui_thread.sample('velocity', current_tick, speed)
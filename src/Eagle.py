@@ -4,11 +4,15 @@ from rlbot.agents.base_agent import BaseAgent, SimpleControllerState
 from rlbot.utils.structures.game_data_struct import GameTickPacket
 
 import tools.training
+from tools.aerial import AerialSolver
 from tools.helper import limit_controls, calculate_angle_error, \
     find_aerial_target_direction, find_aerial_direction, \
     find_aerial_target, get_target_goal, find_shot, find_aerial_ball
 from tools.contollers import PIDController, JumpController, BoostController, SmoothTargetController, ControllerManager
-from util.orientation import Orientation, relative_location
+from tools.performance import profile_agent, TickMonitor
+from tools.recording import record_agent
+from util.jump_table import get_jump_table
+from util.orientation import get_orientation, relative_location
 from util.vec import Vec3
 
 
@@ -35,12 +39,23 @@ class FlyingEagle(BaseAgent):
         self.control_manager.add_controller(self.pid_yaw, 'yaw')
         self.control_manager.add_controller(self.boost, 'boost')
         self.control_manager.add_controller(self.jump, 'jump')
+        self.tick = TickMonitor()
+        self.aerial_solver = AerialSolver()
+        self.profiler = profile_agent(self)
+        record_agent(self)
+
+    def initialize_agent(self):
+        # Load the jump table now, so the first tick that needs it doesn't wait for the file
+        get_jump_table()
 
     def get_output(self, packet: GameTickPacket) -> SimpleControllerState:
+        self.tick.step(packet.game_info.seconds_elapsed)
+        self.aerial_solver.update(packet)
+
         # Gather some information about our car
         my_car = packet.game_cars[self.index]
         car_location = Vec3(my_car.physics.location)
-        car_orientation = Orientation(my_car.physics.rotation)
+        car_orientation = get_orientation(my_car, self.index, packet.game_info.seconds_elapsed)
         car_velocity = Vec3(my_car.physics.velocity)
         car_velocity_xy_angle = math.atan2(car_velocity.y, car_velocity.x) * 180 / math.pi
         car_relative_velocity = relative_location(Vec3(), car_orientation, car_velocity)
@@ -54,6 +69,7 @@ class FlyingEagle(BaseAgent):
         ball_direction = relative_location(car_location, car_orientation, ball_location)
         ball_direction_xy_angle = math.atan2(ball_direction.y, ball_direction.x) * 180 / math.pi
         ball_direction_z_angle = math.asin(ball_direction.z / ball_direction.length()) * 180 / math.pi
+        self.profiler.lap('setup')
 
         self.training.step(packet)
         if self.training.need_boost():
@@ -61,8 +77,10 @@ class FlyingEagle(BaseAgent):
         elif self.training.is_finished():
             if self.training.is_done():
                 self.set_game_state(self.training.reset(''))
+                self.aerial_solver.invalidate()
             self.control_manager.reset()
             return SimpleControllerState()
+        self.profiler.lap('training')
 
         # goal_a, goal_b = get_target_goal(self.team)
         # target_location = find_aerial_ball(car_location, car_velocity, self.get_ball_prediction_struct(), packet)
@@ -85,8 +103,12 @@ class FlyingEagle(BaseAgent):
         # target_direction = self.smooth_target.step(target_direction)
 
         target_location = target_shot = ball_location
-        target_direction = find_aerial_target_direction(target_location, ball_velocity, car_location, car_velocity)
+        # Let the solver use at most half of this tick, so we keep up with the packet rate
+        target_direction = find_aerial_target_direction(target_location, ball_velocity, car_location, car_velocity,
+                                                        budget=self.tick.solver_budget(0.5),
+                                                        solver=self.aerial_solver)
         target_direction = self.smooth_target.step(target_direction)
+        self.profiler.lap('target')
 
         target_z_angle = math.asin(target_direction.z / target_direction.length()) * 180 / math.pi
         target_xy_angle = math.atan2(target_direction.y, target_direction.x) * 180 / math.pi
@@ -120,6 +142,7 @@ class FlyingEagle(BaseAgent):
         self.renderer.draw_string_2d(10, 30, 3, 5, f'2: {my_car.jumped}', self.renderer.white())
         self.renderer.draw_string_2d(10, 60, 3, 5, f'3: {my_car.double_jumped}', self.renderer.white())
         self.renderer.draw_string_2d(10, 90, 3, 5, f'3: {my_car.is_super_sonic}', self.renderer.white())
+        self.profiler.lap('rendering')
 
         # Controlling the car
         controls = SimpleControllerState()
@@ -5,11 +5,15 @@ from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPac
 
 from tools.helper import find_shot, find_boost_in_path, clip_to_field, predict_ball_fall, get_target_goal
 from tools.contollers import PIDController
-from tools.performance import TickMonitor
-from util.ball_prediction_analysis import find_slice_at_time
+from tools.drive_model import get_drive_model
+from tools.performance import TickMonitor, profile_agent
+from tools.recording import record_agent
+from tools.shots import plan_shot
 from util.boost_pad_tracker import BoostPadTracker
 from util.drive import steer_toward_target, limit_to_safe_range
-from util.orientation import relative_location, Orientation
+from util.jump_table import get_jump_table
+from util.orientation import relative_location, get_orientation
+from util.prediction_cache import get_ball_prediction
 from util.sequence import Sequence, ControlStep
 from util.vec import Vec3
 
@@ -39,12 +43,17 @@ class ChargingRhino(BaseAgent):
 
         self.time = 0
         self.tick = TickMonitor()
+        self.profiler = profile_agent(self)
+        record_agent(self)
 
     def initialize_agent(self):
         # Set up information about the boost pads now that the game is active and the info is available
         self.boost_pad_tracker.initialize_boosts(self.get_field_info())
         field_info: FieldInfoPacket = self.get_field_info()
         self.goal_info = [field_info.goals[x] for x in range(field_info.num_goals)]
+        # Load the lookup tables now, so the first tick that needs them doesn't wait for the file
+        get_jump_table()
+        get_drive_model()
 
     def get_output(self, packet: GameTickPacket) -> SimpleControllerState:
         """
@@ -54,7 +63,7 @@ class ChargingRhino(BaseAgent):
 
         # Keep our boost pad info updated with which pads are currently active
         self.boost_pad_tracker.update_boost_status(packet)
-        self.tick.step()
+        self.tick.step(packet.game_info.seconds_elapsed)
 
         # This is good to keep at the beginning of get_output. It will allow you to continue
         # any sequences that you may have started during a previous call to get_output.
@@ -69,12 +78,13 @@ class ChargingRhino(BaseAgent):
         car_location = Vec3(my_car.physics.location)
         car_velocity = Vec3(my_car.physics.velocity)
         car_speed = car_velocity.length()
-        car_orientation = Orientation(my_car.physics.rotation)
+        car_orientation = get_orientation(my_car, self.index, packet.game_info.seconds_elapsed)
         ball_location = Vec3(packet.game_ball.physics.location)
         ball_relative = relative_location(car_location, car_orientation, ball_location)
         ball_angle = math.atan2(ball_relative.y, ball_relative.x)
         ball_angle *= 180 / math.pi
         ball_distance = car_location.dist(ball_location)
+        self.profiler.lap('setup')
 
         # Prediction of the ball according to how quickly the car moves
         prediction_speed = (1100 - car_speed) // 220 / 10
@@ -82,9 +92,9 @@ class ChargingRhino(BaseAgent):
         prediction_time += prediction_speed
 
         # We're far away from the ball, let's try to lead it a little
-        ball_prediction_struct = self.get_ball_prediction_struct()  # This can predict bounces, etc
-        ball_in_future = find_slice_at_time(
-            ball_prediction_struct, packet.game_info.seconds_elapsed + prediction_time)
+        prediction = get_ball_prediction(self, packet)  # This can predict bounces, etc
+        ball_in_future = prediction.slice_at_time(packet.game_info.seconds_elapsed + prediction_time)
+        self.profiler.lap('prediction')
 
         # ball_in_future might be None if we don't have an adequate ball prediction right now, like during
         # replays, so check it to avoid errors.
@@ -118,18 +128,24 @@ class ChargingRhino(BaseAgent):
         #         target_location = closest_boost
 
         if ball_location.z > 200:
-            # When the ball is in the air wait for it to come down.
-            # We're far away from the ball, let's try to lead it a little
-            ball_prediction_struct = self.get_ball_prediction_struct()
-            ball_approach_time, ball_prediction = predict_ball_fall(
-                ball_location, ball_prediction_struct, packet)
-            target_location = find_shot(target_goal_a, target_goal_b, ball_prediction, car_location)
+            # When the ball is in the air wait for it to come down, at the reachable slice that is quickest to
+            # drive to with the best angle on goal
+            shot = plan_shot(prediction.view, packet.game_info.seconds_elapsed, car_location,
+                             car_orientation.forward, car_speed, target_goal_a, target_goal_b, boost=my_car.boost > 0)
+            if shot is not None:
+                ball_approach_time = shot.time - packet.game_info.seconds_elapsed
+                target_location = shot.target
+            else:
+                ball_approach_time, ball_prediction = predict_ball_fall(
+                    ball_location, prediction.view, packet)
+                target_location = find_shot(target_goal_a, target_goal_b, ball_prediction, car_location)
             ball_prediction = target_location
         else:
             ball_approach_time = 0.1
             ball_prediction = ball_location
 
         target_location = clip_to_field(target_location)
+        self.profiler.lap('target')
 
         # Draw some things to help understand what the bot is thinking
         self.renderer.draw_line_3d(car_location, target_location, self.renderer.white())
@@ -138,17 +154,17 @@ class ChargingRhino(BaseAgent):
 
         line_coord_a = ball_location
         for i in range(50):
-            ball_in_future = find_slice_at_time(
-                ball_prediction_struct, packet.game_info.seconds_elapsed + 0.1 * i)
+            ball_in_future = prediction.slice_at_time(packet.game_info.seconds_elapsed + 0.1 * i)
             if ball_in_future is None:
                 break
             line_coord_b = Vec3(ball_in_future.physics.location)
             self.renderer.draw_line_3d(line_coord_a, line_coord_b, self.renderer.cyan())
             line_coord_a = line_coord_b
+        self.profiler.lap('rendering')
 
         # Controller state
         controls = SimpleControllerState()
-        controls.steer = steer_toward_target(my_car, target_location)
+        controls.steer = steer_toward_target(my_car, target_location, car_orientation)
         controls.yaw = controls.steer
 
         target_distance = target_location.length()
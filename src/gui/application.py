@@ -3,8 +3,21 @@ import threading
 import time
 import tkinter as tk
 import multiprocessing
+from typing import Dict
+
+import numpy as np
 
 from gui.graph import Graph
+from gui.ring_buffer import SharedRingBuffer
+
+# Messages registering the name of a series look like (SERIES_MESSAGE, series id, name)
+SERIES_MESSAGE = 'series'
+# Number of samples a tick can hold before the buffer grows
+SAMPLE_CAPACITY = 256
+# Number of samples the shared ring buffer holds, the oldest are dropped when the window falls behind further
+RING_CAPACITY = 1 << 16
+# Times per second the window takes in new samples and redraws
+DEFAULT_REFRESH_RATE = 10
 
 
 def has_game_focus():
@@ -41,57 +54,120 @@ def has_tkinter_focus():
 
 
 class AppRunnable:
-    def __init__(self, *args, **kwargs):
+    """
+    Runs the telemetry window. Agents add points with sample(key, x, y) during a tick and call flush() once at
+    the end of it, which writes all points of the tick as (series id, x, y) rows into a shared ring buffer.
+    Writing never blocks: when the window falls behind, the oldest samples are dropped. The name of a series
+    is only sent once through the queue, when its first point is added.
+    """
+
+    def __init__(self, *args, refresh_rate: float = DEFAULT_REFRESH_RATE, blit: bool = True, **kwargs):
         super().__init__(*args, **kwargs)
+        self.refresh_rate = refresh_rate
+        self.blit = blit
         self.stop_event = multiprocessing.Event()
         self.queue_in = multiprocessing.Queue()
+        self.series_ids: Dict[str, int] = {}
+        # A multiprocessing lock, AppProcess has to stay picklable for spawned processes
+        self._series_lock = multiprocessing.Lock()
+        self._samples = np.empty((SAMPLE_CAPACITY, 3))
+        self._sample_count = 0
+        self.ring = SharedRingBuffer(RING_CAPACITY)
+
+    @property
+    def dropped(self) -> int:
+        """Number of samples dropped because the window could not keep up."""
+        return self.ring.dropped
 
     def send(self, message):
         self.queue_in.put(message)
 
+    def series_id(self, key: str) -> int:
+        series_id = self.series_ids.get(key)
+        if series_id is None:
+            # Only new series take the lock, so two threads never give different keys the same id
+            with self._series_lock:
+                series_id = self.series_ids.get(key)
+                if series_id is None:
+                    series_id = self.series_ids[key] = len(self.series_ids)
+                    self.queue_in.put((SERIES_MESSAGE, series_id, key))
+        return series_id
+
+    def sample(self, key: str, x: float, y: float):
+        if self._sample_count == len(self._samples):
+            self._samples = np.concatenate((self._samples, np.empty_like(self._samples)))
+        self._samples[self._sample_count] = (self.series_id(key), x, y)
+        self._sample_count += 1
+
+    def sample_many(self, key: str, xs, ys):
+        """Sends a whole series at once, without waiting for flush. Safe to call from another thread."""
+        samples = np.empty((len(xs), 3))
+        samples[:, 0] = self.series_id(key)
+        samples[:, 1] = xs
+        samples[:, 2] = ys
+        self.queue_in.put(samples)
+
+    def flush(self):
+        if self._sample_count == 0:
+            return
+        self.ring.write(self._samples[:self._sample_count])
+        self._sample_count = 0
+
     def run(self) -> None:
         for thread in threading.enumerate():
             if thread.name == 'Tkinter' and thread is not self:
                 thread.join()
-        app = Application(self.stop_event, self.queue_in)
+        # The window reads through its own attachment and never frees the memory, only stop() of the producer does
+        ring = self.ring.consumer()
+        app = Application(self.stop_event, self.queue_in, ring, self.refresh_rate, self.blit)
         if has_game_focus() is True:
             app.wm_iconify()
         elif has_tkinter_focus() is True:
             app.wm_iconify()
             app.after(1000, app.wm_deiconify)
-        app.mainloop()
-        app.quit()
+        try:
+            app.mainloop()
+            app.quit()
+        finally:
+            ring.close()
 
     def stop(self):
         self.stop_event.set()
+        # The window has its own attachment to the ring buffer, this frees the memory once it detaches as well
+        self.ring.close()
 
 
 class AppThread(AppRunnable, threading.Thread):
-    def __init__(self):
-        super().__init__(name='Tkinter')
+    def __init__(self, refresh_rate: float = DEFAULT_REFRESH_RATE, blit: bool = True):
+        super().__init__(name='Tkinter', refresh_rate=refresh_rate, blit=blit)
 
 
 class AppProcess(AppRunnable, multiprocessing.Process):
-    def __init__(self):
-        super().__init__(name='Tkinter')
+    def __init__(self, refresh_rate: float = DEFAULT_REFRESH_RATE, blit: bool = True):
+        super().__init__(name='Tkinter', refresh_rate=refresh_rate, blit=blit)
 
 
 class Application(tk.Tk):
-    def __init__(self, event: threading.Event, queue_in: multiprocessing.Queue):
+    def __init__(self, event: threading.Event, queue_in: multiprocessing.Queue, ring: SharedRingBuffer = None,
+                 refresh_rate: float = DEFAULT_REFRESH_RATE, blit: bool = True):
         super().__init__()
         self.event = event
         self.queue_in = queue_in
+        self.ring = ring
+        self.refresh_interval = max(1, int(1000 / refresh_rate))
 
         self.frame = tk.Frame(self)
         self.frame.pack(fill='both', expand=True)
 
-        self.graph = Graph(self.frame)
+        self.graph = Graph(self.frame, blit)
         self.graph.pack(expand=True, fill='both')
 
         self.graph.plot.set_xlim(-1, 10)
         self.graph.plot.set_ylim(-1, 10)
+        self.series_names: Dict[int, str] = {}
+        self.pending_samples = np.empty((0, 3))
 
-        self.after(100, lambda: self.poll_data())
+        self.after(self.refresh_interval, lambda: self.poll_data())
         self.after(100, lambda: self.poll_running())
 
     def poll_running(self):
@@ -101,18 +177,34 @@ class Application(tk.Tk):
         self.after(100, lambda: self.poll_running())
 
     def poll_data(self):
-        self.after(100, lambda: self.poll_data())
-        if self.queue_in.empty():
-            return
+        self.after(self.refresh_interval, lambda: self.poll_data())
+        received = False
         for _ in range(1000):
             if self.queue_in.empty():
                 break
+            received = True
             message = self.queue_in.get()
-            data = self.process_message(message)
-            self.process_graph(data)
+            if isinstance(message, np.ndarray):
+                self.process_samples(message)
+            elif isinstance(message, tuple) and message[0] == SERIES_MESSAGE:
+                self.series_names[message[1]] = message[2]
+            else:
+                data = self.process_message(message)
+                self.process_graph(data)
+        if self.ring is not None:
+            samples = np.concatenate((self.pending_samples, self.ring.read()))
+            self.pending_samples = samples[:0]
+            if len(samples) > 0:
+                received = True
+                self.process_samples(samples)
+        if not received or not self.graph.lines:
+            return
         key = next(iter(self.graph.lines.keys()))
         self.graph.size_line(key, 5000)
-        self.graph.view_line(key)
+        if self.graph.blit:
+            self.graph.follow_line(key)
+        else:
+            self.graph.view_line(key)
         self.graph.draw()
 
     def process_message(self, message):
@@ -129,6 +221,21 @@ class Application(tk.Tk):
             value = float(message)
         return key, value, point
 
+    def process_samples(self, samples: np.ndarray):
+        """
+        Adds a batch of (series id, x, y) rows to the graph, one extend per series. Samples of a series whose
+        name did not arrive yet are kept for the next poll.
+        """
+        series_ids = samples[:, 0].astype(np.int64)
+        known = np.isin(series_ids, list(self.series_names))
+        self.pending_samples = np.concatenate((self.pending_samples, samples[~known]))
+        for series_id in np.unique(series_ids[known]):
+            key = self.series_names[int(series_id)]
+            rows = samples[series_ids == series_id]
+            if key not in self.graph.lines:
+                self.graph.create_line(key, value=rows[0, 2], point=rows[0, 1] - 1)
+            self.graph.extend_line_data(key, rows[:, 2], rows[:, 1])
+
     def process_graph(self, data):
         key, value, point = data
         if key not in self.graph.lines:
@@ -147,6 +254,15 @@ def main():
         time.sleep(0.1)
         print(timeit.timeit(lambda: process.send(random.random() * 10 - 1), number=10000))
 
+    def send_samples():
+        for tick in range(10):
+            process.sample('samples', tick, random.random() * 10 - 1)
+        process.flush()
+
+    for _ in range(10):
+        time.sleep(0.1)
+        print(timeit.timeit(send_samples, number=1000))
+
     time.sleep(10)
     process.stop()
 
@@ -5,11 +5,38 @@ from matplotlib.backends._backend_tk import NavigationToolbar2Tk
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from matplotlib.lines import Line2D
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+from gui.series import Series
+
+# Share of the data range added to the view when the data leaves it, so the view does not move every sample
+VIEW_HEADROOM = 0.25
+
+
+def expand_view(bounds: Tuple[float, float, float, float], view_x: Tuple[float, float],
+                view_y: Tuple[float, float], headroom: float = VIEW_HEADROOM) -> Optional[Tuple[tuple, tuple]]:
+    """
+    Returns the new x and y limits when the data bounds (x_min, x_max, y_min, y_max) left the view, or None
+    when the data still fits. The new view has headroom past the data, most of it past the newest x values.
+    """
+    x_min, x_max, y_min, y_max = bounds
+    if view_x[0] <= x_min and x_max <= view_x[1] and view_y[0] <= y_min and y_max <= view_y[1]:
+        return None
+    span_x = x_max - x_min
+    span_y = y_max - y_min
+    new_x = (x_min - span_x * 0.05 - 1, x_max + span_x * headroom + 1)
+    new_y = (y_min - span_y * headroom - 1, y_max + span_y * headroom + 1)
+    return new_x, new_y
 
 
 class Graph(tk.Frame):
-    def __init__(self, master):
+    """
+    Plot of live lines. With blit enabled the lines are animated artists: the axes, ticks and legend are drawn
+    once into a cached background, and every draw only restores that background and draws the lines on top of
+    it. The whole figure is drawn again only when the view or the legend changed.
+    """
+
+    def __init__(self, master, blit: bool = False):
         super().__init__(master)
         cnf = {'fill': 'both', 'expand': True}
 
@@ -25,13 +52,55 @@ class Graph(tk.Frame):
         self.toolbar.pack_configure(fill='x', side='top')
 
         self.lines: Dict[str, Line2D] = {}
+        self.series: Dict[str, Series] = {}
+        self._x_range = None
         self.plot: Axes = self.figure.add_subplot()
 
+        self.blit = blit
+        self._background = None
+        if blit:
+            self.canvas.mpl_connect('draw_event', self._on_draw)
+
     def draw(self):
         if self.winfo_viewable() == 0:
             return
+        self.update_lines()
+        if not self.blit:
+            self.canvas.flush_events()
+            self.canvas.draw_idle()
+            return
+        if self._background is None:
+            # Draws everything, the draw event stores the new background and draws the lines
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.canvas.blit(self.plot.bbox)
         self.canvas.flush_events()
-        self.canvas.draw_idle()
+
+    def invalidate(self):
+        """Makes the next draw a full one, needed after anything other than the lines changed."""
+        self._background = None
+
+    def _on_draw(self, _event):
+        # Also called after zooming, panning and resizing, which all change the background
+        self._background = self.canvas.copy_from_bbox(self.plot.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        for line in self.lines.values():
+            self.plot.draw_artist(line)
+
+    def update_lines(self):
+        """Hands the changed lines to matplotlib, decimated to the width of the plot in pixels."""
+        width = int(self.plot.bbox.width)
+        x_range = self.plot.get_xlim()
+        for key, line in self.lines.items():
+            series = self.series[key]
+            if series.changed or x_range != self._x_range:
+                line.set_data(*series.decimate(width, x_range))
+                series.changed = False
+        self._x_range = x_range
 
     def create_line(self, key, value=0, point=0):
         if key in self.lines:
@@ -39,42 +108,55 @@ class Graph(tk.Frame):
         if point is None:
             point = 0
         index = len(self.lines)
-        line = Line2D([point], [value], linewidth=1, color=f'C{index}')
+        series = Series()
+        series.append(point, value)
+        line = Line2D([point], [value], linewidth=1, color=f'C{index}', animated=self.blit)
         line.set_label(s=key)
         self.plot.add_line(line)
         self.plot.legend(loc='upper right')
         self.lines[key] = line
+        self.series[key] = series
+        self.invalidate()
 
     def remove_line(self, key):
         line = self.lines.pop(key)
+        self.series.pop(key)
         line.set_label(s=None)
         line.remove()
+        self.invalidate()
 
     def view_line(self, key):
-        line = self.lines[key]
-        data_y = line.get_ydata()
-        data_x = line.get_xdata()
-        offset_x = (max(data_x) - min(data_x)) * 0.05 + 1
-        offset_y = (max(data_y) - min(data_y)) * 0.05 + 1
-        self.plot.set_xlim(min(data_x) - offset_x, max(data_x) + offset_x)
-        self.plot.set_ylim(min(data_y) - offset_y, max(data_y) + offset_y)
+        x_min, x_max, y_min, y_max = self.series[key].bounds()
+        offset_x = (x_max - x_min) * 0.05 + 1
+        offset_y = (y_max - y_min) * 0.05 + 1
+        self.plot.set_xlim(x_min - offset_x, x_max + offset_x)
+        self.plot.set_ylim(y_min - offset_y, y_max + offset_y)
+        self.invalidate()
+
+    def follow_line(self, key, headroom: float = VIEW_HEADROOM) -> bool:
+        """
+        Like view_line, but only moves the view when the line left it, which keeps the cached background of a
+        blitting graph valid most of the time. Returns whether the view moved.
+        """
+        view = expand_view(self.series[key].bounds(), self.plot.get_xlim(), self.plot.get_ylim(), headroom)
+        if view is None:
+            return False
+        self.plot.set_xlim(*view[0])
+        self.plot.set_ylim(*view[1])
+        self.invalidate()
+        return True
 
     def size_line(self, key, size):
-        line = self.lines[key]
-        if len(line.get_xdata()) < size:
+        if len(self.series[key]) < size:
             return
-        for line in self.lines.values():
-            del line.get_xdata()[:-size // 2]
-            del line.get_ydata()[:-size // 2]
+        for series in self.series.values():
+            series.keep_last(size // 2)
 
     def extend_line(self, key, value, point=None):
-        line = self.lines[key]
-        data_y = line.get_ydata()
-        data_x = line.get_xdata()
-
+        series = self.series[key]
         if point is None:
-            point = max(data_x) + 1
-        data_x += (point,)
-        data_y += (value,)
-        line.set_ydata(data_y)
-        line.set_xdata(data_x)
+            point = series.last_x + 1
+        series.append(point, value)
+
+    def extend_line_data(self, key, values, points):
+        self.series[key].extend(points, values)
@@ -0,0 +1,126 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+# Positions in the header, the counters only ever grow so they double as sequence numbers
+WRITE_INDEX = 0
+READ_INDEX = 1
+DROPPED = 2
+RESERVED = 3
+HEADER_SIZE = 4
+
+
+class SharedRingBuffer:
+    """
+    Single-producer single-consumer ring buffer of float rows in shared memory, so samples reach the plot process
+    without pickling or pipes, and neither side ever waits for the other.
+
+    Only the producer moves the write index and only the consumer moves the read index. The producer never
+    checks for free space: when it laps the consumer, the oldest rows are overwritten, and the consumer counts
+    them as dropped when it notices. Before writing, the producer announces how far it is about to write, so
+    rows it may have overwritten while the consumer was copying them are dropped as well and a read never
+    returns a torn row.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, width: int = 3, name: Optional[str] = None):
+        self.capacity = capacity
+        self.width = width
+        self.owner = name is None
+        size = (HEADER_SIZE + capacity * width) * 8
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self._attach()
+        if self.owner:
+            self.header[:] = 0
+
+    def _attach(self):
+        self.header = np.ndarray((HEADER_SIZE,), dtype=np.int64, buffer=self.memory.buf)
+        self.data = np.ndarray((self.capacity, self.width), dtype=np.float64, buffer=self.memory.buf,
+                               offset=HEADER_SIZE * 8)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    @property
+    def dropped(self) -> int:
+        return int(self.header[DROPPED])
+
+    def __len__(self):
+        """Rows written but not read yet, at most the capacity."""
+        return int(min(self.header[WRITE_INDEX] - self.header[READ_INDEX], self.capacity))
+
+    def __getstate__(self):
+        # Another process attaches to the same memory by name
+        return self.name, self.capacity, self.width
+
+    def __setstate__(self, state):
+        name, capacity, width = state
+        self.__init__(capacity, width, name)
+
+    def consumer(self) -> 'SharedRingBuffer':
+        """
+        A separate attachment to the same memory that never frees it, for the reading side. Closing it while the
+        producer writes through its own attachment is safe, and only the producer's close frees the memory.
+        """
+        return SharedRingBuffer(self.capacity, self.width, self.name)
+
+    def write(self, rows: np.ndarray):
+        """Appends rows (producer side), never blocks. Only the last capacity rows are kept of a large batch."""
+        count = len(rows)
+        if count == 0 or self.memory is None:
+            return
+        write_index = int(self.header[WRITE_INDEX])
+        if count > self.capacity:
+            write_index += count - self.capacity
+            rows = rows[-self.capacity:]
+            count = self.capacity
+        # Announce the rows about to be overwritten before touching them, so a concurrent read can tell
+        self.header[RESERVED] = write_index + count
+        start = write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self.data[start:start + first] = rows[:first]
+        self.data[:count - first] = rows[first:]
+        # The rows are in place before the consumer can see them
+        self.header[WRITE_INDEX] = write_index + count
+
+    def read(self) -> np.ndarray:
+        """Returns a copy of all unread rows (consumer side), oldest first."""
+        write_index = int(self.header[WRITE_INDEX])
+        read_index = int(self.header[READ_INDEX])
+        if write_index - read_index > self.capacity:
+            self.header[DROPPED] += write_index - self.capacity - read_index
+            read_index = write_index - self.capacity
+        count = write_index - read_index
+        if count == 0:
+            return np.empty((0, self.width))
+
+        start = read_index % self.capacity
+        first = min(count, self.capacity - start)
+        rows = np.concatenate((self.data[start:start + first], self.data[:count - first]))
+
+        # Rows the producer wrote over (or started to write over) during the copy are not trusted
+        overwritten = int(self.header[RESERVED]) - self.capacity - read_index
+        if overwritten > 0:
+            overwritten = min(overwritten, count)
+            self.header[DROPPED] += overwritten
+            rows = rows[overwritten:]
+        self.header[READ_INDEX] = write_index
+        return rows
+
+    def close(self):
+        """Detaches from the shared memory, the owner also frees it."""
+        if self.memory is None:
+            return
+        self.header = self.data = None
+        self.memory.close()
+        if self.owner:
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                # A forked copy of the owner freed it already
+                pass
+        self.memory = None
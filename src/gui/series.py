@@ -0,0 +1,134 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class Series:
+    """
+    Points of one graph line in a growable numpy ring: appending is O(1) (amortized, the arrays double when
+    full), dropping the oldest points only moves the head. The minimum and maximum of both axes are kept up to
+    date while appending and only computed again after old points were dropped.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._head = 0
+        self._count = 0
+        self.is_sorted = True
+        self.changed = False
+        self._bounds = None
+        self._bounds_stale = False
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return len(self._x)
+
+    @property
+    def last_x(self) -> float:
+        return float(self._x[(self._head + self._count - 1) % self.capacity])
+
+    def append(self, x: float, y: float):
+        if self._count == self.capacity:
+            self._grow(self._count + 1)
+        if self._count > 0 and x < self.last_x:
+            self.is_sorted = False
+        position = (self._head + self._count) % self.capacity
+        self._x[position] = x
+        self._y[position] = y
+        self._count += 1
+        self.changed = True
+        if self._bounds is not None and not self._bounds_stale:
+            x_min, x_max, y_min, y_max = self._bounds
+            self._bounds = (min(x_min, x), max(x_max, x), min(y_min, y), max(y_max, y))
+
+    def extend(self, xs, ys):
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        count = len(xs)
+        if count == 0:
+            return
+        if self._count + count > self.capacity:
+            self._grow(self._count + count)
+        if (self._count > 0 and xs[0] < self.last_x) or np.any(xs[1:] < xs[:-1]):
+            self.is_sorted = False
+        start = (self._head + self._count) % self.capacity
+        first = min(count, self.capacity - start)
+        self._x[start:start + first] = xs[:first]
+        self._y[start:start + first] = ys[:first]
+        self._x[:count - first] = xs[first:]
+        self._y[:count - first] = ys[first:]
+        self._count += count
+        self.changed = True
+        if self._bounds is not None and not self._bounds_stale:
+            x_min, x_max, y_min, y_max = self._bounds
+            self._bounds = (min(x_min, xs.min()), max(x_max, xs.max()), min(y_min, ys.min()), max(y_max, ys.max()))
+
+    def keep_last(self, size: int):
+        """Drops the oldest points until at most size are left."""
+        if self._count <= size:
+            return
+        self._head = (self._head + self._count - size) % self.capacity
+        self._count = size
+        self._bounds_stale = True
+        self.changed = True
+
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The points in the order they were added, as views when they do not wrap around the end."""
+        end = self._head + self._count
+        if end <= self.capacity:
+            return self._x[self._head:end], self._y[self._head:end]
+        end -= self.capacity
+        return (np.concatenate((self._x[self._head:], self._x[:end])),
+                np.concatenate((self._y[self._head:], self._y[:end])))
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Returns x_min, x_max, y_min, y_max."""
+        if self._count == 0:
+            return 0.0, 0.0, 0.0, 0.0
+        if self._bounds is None or self._bounds_stale:
+            x, y = self.data()
+            self._bounds = (float(x.min()), float(x.max()), float(y.min()), float(y.max()))
+            self._bounds_stale = False
+        return self._bounds
+
+    def decimate(self, width: int, x_range: Tuple[float, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduces the points (within x_range, when the x values are sorted) to at most 2 * width points. The points
+        are split in width buckets and of each bucket the lowest and the highest point are kept in their
+        original order, so peaks survive no matter how far the line is zoomed out.
+        """
+        x, y = self.data()
+        if x_range is not None and self.is_sorted:
+            # One point beyond both edges, so the line still runs to the edge of the view
+            start = max(int(np.searchsorted(x, x_range[0])) - 1, 0)
+            stop = int(np.searchsorted(x, x_range[1], side='right')) + 1
+            x, y = x[start:stop], y[start:stop]
+        count = len(x)
+        if width <= 0 or count <= 2 * width:
+            return x, y
+
+        bucket = -(-count // width)
+        full = count // bucket
+        buckets = y[:full * bucket].reshape(full, bucket)
+        offsets = np.arange(full) * bucket
+        indices = [offsets + buckets.argmin(axis=1), offsets + buckets.argmax(axis=1)]
+        if full * bucket < count:
+            tail = y[full * bucket:]
+            indices.append(np.array([full * bucket + tail.argmin(), full * bucket + tail.argmax()]))
+        indices = np.unique(np.concatenate(indices))
+        return x[indices], y[indices]
+
+    def _grow(self, size: int):
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        x, y = self.data()
+        self._x = np.empty(capacity)
+        self._y = np.empty(capacity)
+        self._x[:self._count] = x
+        self._y[:self._count] = y
+        self._head = 0
@@ -0,0 +1,290 @@
+"""
+Runs an agent without Rocket League. The harness owns a synthetic GameTickPacket, FieldInfoPacket and
+BallPrediction, feeds them to the agent's get_output as fast as the agent can answer, moves a stand-in car
+with the returned controls and records the controls and the time every tick took.
+
+# harness = SimulationHarness(create_agent(ChargingRhino))
+# harness.reset(car_location=Vec3(0, -3000, 17), ball_location=Vec3(0, 0, 93))
+# record = harness.run(1200)
+# print(record.ticks_per_second, record.percentile(99))
+"""
+import random
+import time
+from typing import Optional
+
+import numpy as np
+from rlbot.agents.base_agent import BaseAgent, SimpleControllerState
+from rlbot.utils.game_state_util import GameState
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+
+from simulation.packets import create_field_info, create_game_tick_packet, fill_ball_prediction, write_physics, \
+    BOOST_PAD_LOCATIONS, FULL_BOOST_LOCATIONS
+from simulation.physics import SimulatedBall, SimulatedCar, predict_ball_path, step_ball_state, resolve_touch, \
+    BALL_RADIUS, CAR_REST_HEIGHT
+from tools.recording import CONTROLS_DTYPE, PacketRecorder, controls_to_tuple
+from util.boost_pad_tracker import BOOST_PAD_STATE_DTYPE, FULL_BOOST_RESPAWN_TIME, SMALL_BOOST_RESPAWN_TIME
+from util.orientation import clear_orientation_cache
+from util.prediction_cache import shared_prediction_cache
+from util.vec import Vec3
+
+PREDICTION_SLICES = 360
+PREDICTION_STEP = 1 / 60
+FULL_BOOST_PICKUP_RADIUS = 208
+SMALL_BOOST_PICKUP_RADIUS = 144
+SMALL_BOOST_AMOUNT = 12
+
+
+def _ignore(*args, **kwargs):
+    return None
+
+
+class NullRenderer:
+    """Accepts every rendering call and draws nothing, so agents can render without a game to render in."""
+
+    def __getattr__(self, name):
+        return _ignore
+
+
+def create_agent(agent_class, team=0, index=0, name=None) -> BaseAgent:
+    """Instantiates an agent the way the framework does, name, team and index are positional."""
+    return agent_class(name or agent_class.__name__, team, index)
+
+
+class SimulationRecord:
+    """Controls the agent returned and the wall time get_output took, one row per tick."""
+
+    def __init__(self, game_times: np.ndarray, controls: np.ndarray, durations: np.ndarray):
+        self.game_times = game_times
+        self.controls = controls
+        self.durations = durations
+
+    def __len__(self):
+        return len(self.durations)
+
+    @property
+    def total_time(self) -> float:
+        return float(self.durations.sum())
+
+    @property
+    def ticks_per_second(self) -> float:
+        total = self.total_time
+        return len(self) / total if total > 0 else float('inf')
+
+    def percentile(self, percentile: float) -> float:
+        """Duration of get_output in seconds at the given percentile."""
+        if len(self) == 0:
+            return 0.0
+        return float(np.percentile(self.durations, percentile))
+
+    def slowest_ticks(self, count=5) -> np.ndarray:
+        """Indices of the slowest ticks, slowest first."""
+        return np.argsort(self.durations)[::-1][:count]
+
+
+class SimulationHarness:
+    """
+    Drives one agent in a headless simulation. The agent's framework hooks (field info, ball prediction,
+    game state setting and the renderer) are redirected to the harness, so the agent code runs unchanged.
+
+    The ball follows a deterministic path, so the path is predicted once and only predicted again when
+    something (a touch or a game state change) disturbs the ball. The ball prediction of every tick is a
+    strided copy of that path.
+    """
+
+    def __init__(self, agent: BaseAgent, tick_rate=120, initialize=True, start_time=10.0, seed: Optional[int] = None):
+        if tick_rate % 60 != 0:
+            raise ValueError('tick_rate must be a multiple of 60 so the ticks line up with the prediction slices')
+        self.agent = agent
+        self.dt = 1 / tick_rate
+        self.stride = tick_rate // 60
+        self.path_length = PREDICTION_SLICES * self.stride
+        self.start_time = start_time
+
+        self.field_info = create_field_info()
+        self.packet = create_game_tick_packet(agent.index + 1)
+        self.game_time = start_time
+        self.frame = 0
+        self.car = SimulatedCar()
+        self.ball = SimulatedBall()
+        self.ball_path = np.empty((0, 6))
+        self.path_offset = 0
+        self.touches = 0
+
+        self._pad_locations = np.array(BOOST_PAD_LOCATIONS, dtype=float)
+        self._pad_is_full = np.array([pad in FULL_BOOST_LOCATIONS for pad in BOOST_PAD_LOCATIONS])
+        self._pad_radius = np.where(self._pad_is_full, FULL_BOOST_PICKUP_RADIUS, SMALL_BOOST_PICKUP_RADIUS)
+        self._pad_respawn = np.where(self._pad_is_full, FULL_BOOST_RESPAWN_TIME, SMALL_BOOST_RESPAWN_TIME)
+        self._pad_picked_up = np.full(len(BOOST_PAD_LOCATIONS), -np.inf)
+        self._pad_states = np.frombuffer(self.packet.game_boosts, dtype=BOOST_PAD_STATE_DTYPE,
+                                         count=len(BOOST_PAD_LOCATIONS))
+        self._ball_prediction: Optional[BallPrediction] = None
+
+        if seed is not None:
+            random.seed(seed)
+        agent.renderer = NullRenderer()
+        agent.get_field_info = lambda: self.field_info
+        agent.get_ball_prediction_struct = self.get_ball_prediction_struct
+        agent.set_game_state = self.set_game_state
+        agent.send_quick_chat = _ignore
+        self.reset()
+        if initialize:
+            agent.initialize_agent()
+
+    def reset(self, car_location=Vec3(0, -4608, CAR_REST_HEIGHT), car_yaw=np.pi / 2, car_boost=34.0,
+              ball_location=Vec3(0, 0, BALL_RADIUS), ball_velocity=Vec3()):
+        """Starts over from the given scenario, by default a straight kickoff position with a resting ball."""
+        shared_prediction_cache.reset()
+        clear_orientation_cache()
+        self.game_time = self.start_time
+        self.frame = 0
+        self.touches = 0
+        self.car = SimulatedCar(car_location, car_yaw, car_boost)
+        self.ball = SimulatedBall(ball_location, ball_velocity)
+        self._pad_picked_up[:] = -np.inf
+        self.packet.game_ball.latest_touch.time_seconds = 0
+        self._predict_ball_path()
+        self._write_packet()
+
+    def get_ball_prediction_struct(self) -> BallPrediction:
+        """Like the framework, hands out a new struct every tick, built only if the agent asks for one."""
+        if self._ball_prediction is None:
+            path = self.ball_path[self.path_offset:self.path_offset + self.path_length:self.stride]
+            self._ball_prediction = fill_ball_prediction(BallPrediction(), path, self.game_time, PREDICTION_STEP,
+                                                         self.ball.angular_velocity)
+        return self._ball_prediction
+
+    def set_game_state(self, game_state: GameState):
+        """Applies the parts of a GameState the simulation knows about: car and ball physics and boost."""
+        if game_state.ball is not None and game_state.ball.physics is not None:
+            physics = game_state.ball.physics
+            self.ball.location = _merge_vector(self.ball.location, physics.location)
+            self.ball.velocity = _merge_vector(self.ball.velocity, physics.velocity)
+            self.ball.angular_velocity = _merge_vector(self.ball.angular_velocity, physics.angular_velocity)
+            self._predict_ball_path()
+        car_state = (game_state.cars or {}).get(self.agent.index)
+        if car_state is not None:
+            if car_state.physics is not None:
+                physics = car_state.physics
+                self.car.location = _merge_vector(self.car.location, physics.location)
+                self.car.velocity = _merge_vector(self.car.velocity, physics.velocity)
+                self.car.angular_velocity = _merge_vector(self.car.angular_velocity, physics.angular_velocity)
+                if physics.rotation is not None:
+                    rotation = physics.rotation
+                    self.car.pitch = self.car.pitch if rotation.pitch is None else rotation.pitch
+                    self.car.yaw = self.car.yaw if rotation.yaw is None else rotation.yaw
+                    self.car.roll = self.car.roll if rotation.roll is None else rotation.roll
+                self.car.has_wheel_contact = self.car.location.z <= CAR_REST_HEIGHT + 5
+            if car_state.boost_amount is not None:
+                self.car.boost = car_state.boost_amount
+        self._write_packet()
+
+    def step(self) -> SimpleControllerState:
+        """Runs one tick: the agent looks at the packet, then the world moves on with its controls."""
+        controls = self.agent.get_output(self.packet)
+        self.advance(controls)
+        return controls
+
+    def advance(self, controls: SimpleControllerState):
+        """Moves the world one tick forward with the given controls of the agent's car."""
+        self.car.step(controls, self.dt)
+        self.path_offset += 1
+        if self.path_offset + self.path_length > len(self.ball_path):
+            self._extend_ball_path()
+        self._sync_ball()
+        if resolve_touch(self.car, self.ball):
+            self.touches += 1
+            latest_touch = self.packet.game_ball.latest_touch
+            latest_touch.time_seconds = self.game_time + self.dt
+            latest_touch.player_index = self.agent.index
+            latest_touch.team = self.agent.team
+            self._predict_ball_path()
+        self._pick_up_boost()
+        self.game_time += self.dt
+        self.frame += 1
+        self._write_packet()
+
+    def run(self, ticks: int, recorder: Optional[PacketRecorder] = None) -> SimulationRecord:
+        """
+        Runs the given number of ticks and records the controls and the duration of get_output. Pass a recorder
+        to also write the ticks to a recording, which can be replayed with simulation.replay.Replayer.
+        """
+        game_times = np.empty(ticks)
+        controls = np.empty(ticks, dtype=CONTROLS_DTYPE)
+        durations = np.empty(ticks)
+        get_output = self.agent.get_output
+        clock = time.perf_counter
+        for tick in range(ticks):
+            game_times[tick] = self.game_time
+            # Fetched before get_output, the agent may change the game state and with it the prediction
+            prediction = self.get_ball_prediction_struct() if recorder is not None else None
+            start = clock()
+            output = get_output(self.packet)
+            durations[tick] = clock() - start
+            controls[tick] = controls_to_tuple(output)
+            if recorder is not None:
+                recorder.record(self.packet, prediction, output, durations[tick])
+            self.advance(output)
+        return SimulationRecord(game_times, controls, durations)
+
+    def _predict_ball_path(self):
+        state = tuple(self.ball.location) + tuple(self.ball.velocity)
+        self.ball_path = predict_ball_path(state, 2 * self.path_length, self.dt)
+        self.path_offset = 0
+
+    def _extend_ball_path(self):
+        # Steps on from the last known state, which gives exactly the path a full prediction would give
+        remaining = self.ball_path[self.path_offset:]
+        extension = predict_ball_path(step_ball_state(tuple(remaining[-1]), self.dt), self.path_length, self.dt)
+        self.ball_path = np.concatenate((remaining, extension))
+        self.path_offset = 0
+
+    def _sync_ball(self):
+        state = self.ball_path[self.path_offset]
+        self.ball.location = Vec3(*state[:3])
+        self.ball.velocity = Vec3(*state[3:])
+
+    def _pick_up_boost(self):
+        active = self.game_time - self._pad_picked_up >= self._pad_respawn
+        if self.car.location.z > 2 * BALL_RADIUS:
+            return
+        offset = self._pad_locations - (self.car.location.x, self.car.location.y)
+        in_reach = (offset ** 2).sum(axis=1) < self._pad_radius ** 2
+        for index in np.flatnonzero(active & in_reach):
+            if self._pad_is_full[index]:
+                self.car.boost = 100.0
+            else:
+                self.car.boost = min(100.0, self.car.boost + SMALL_BOOST_AMOUNT)
+            self._pad_picked_up[index] = self.game_time
+
+    def _write_packet(self):
+        packet = self.packet
+        packet.game_info.seconds_elapsed = self.game_time
+        packet.game_info.frame_num = self.frame
+        self._ball_prediction = None
+
+        car = packet.game_cars[self.agent.index]
+        write_physics(car.physics, self.car.location, self.car.velocity, self.car.rotation,
+                      self.car.angular_velocity)
+        car.boost = int(self.car.boost)
+        car.has_wheel_contact = self.car.has_wheel_contact
+        car.jumped = self.car.jumped
+        car.double_jumped = self.car.double_jumped
+        car.is_super_sonic = self.car.velocity.length() > 2200
+        car.team = self.agent.team
+
+        ball = packet.game_ball
+        write_physics(ball.physics, self.ball.location, self.ball.velocity, angular_velocity=self.ball.angular_velocity)
+
+        since_pick_up = self.game_time - self._pad_picked_up
+        active = since_pick_up >= self._pad_respawn
+        self._pad_states['is_active'] = active
+        self._pad_states['timer'] = np.where(active, 0, since_pick_up)
+
+
+def _merge_vector(current: Vec3, state_vector) -> Vec3:
+    """Game state vectors may leave out any component, those keep their current value."""
+    if state_vector is None:
+        return current
+    return Vec3(current.x if state_vector.x is None else state_vector.x,
+                current.y if state_vector.y is None else state_vector.y,
+                current.z if state_vector.z is None else state_vector.z)
@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket
+
+from simulation.physics import predict_ball_path
+from util.ball_prediction_analysis import SLICE_DTYPE
+from util.vec import Vec3
+
+# Standard soccar boost pad layout, in the order the framework reports it (sorted by y, then x)
+FULL_BOOST_LOCATIONS = [(-3072, -4096), (3072, -4096), (-3584, 0), (3584, 0), (-3072, 4096), (3072, 4096)]
+BOOST_PAD_LOCATIONS = [
+    (0, -4240), (-1792, -4184), (1792, -4184), (-3072, -4096), (3072, -4096),
+    (-940, -3308), (940, -3308), (0, -2816), (-3584, -2484), (3584, -2484),
+    (-1788, -2300), (1788, -2300), (-2048, -1036), (0, -1024), (2048, -1036),
+    (-3584, 0), (-1024, 0), (1024, 0), (3584, 0),
+    (-2048, 1036), (0, 1024), (2048, 1036), (-1788, 2300), (1788, 2300),
+    (-3584, 2484), (3584, 2484), (0, 2816), (-940, 3310), (940, 3308),
+    (-3072, 4096), (3072, 4096), (-1792, 4184), (1792, 4184), (0, 4240),
+]
+BOOST_PAD_HEIGHT = 73
+GOAL_Y = 5120
+GOAL_WIDTH = 1785.5
+GOAL_HEIGHT = 642.775
+
+CAR_HITBOX = (118.01, 84.2, 36.16)
+CAR_HITBOX_OFFSET = (13.88, 0, 20.75)
+
+
+def create_field_info() -> FieldInfoPacket:
+    """Builds the FieldInfoPacket of a standard soccar field: 34 boost pads and both goals."""
+    field_info = FieldInfoPacket()
+    field_info.num_boosts = len(BOOST_PAD_LOCATIONS)
+    for index, (x, y) in enumerate(BOOST_PAD_LOCATIONS):
+        pad = field_info.boost_pads[index]
+        pad.location.x = x
+        pad.location.y = y
+        pad.location.z = BOOST_PAD_HEIGHT
+        pad.is_full_boost = (x, y) in FULL_BOOST_LOCATIONS
+
+    field_info.num_goals = 2
+    for team, sign in enumerate((-1, 1)):
+        goal = field_info.goals[team]
+        goal.team_num = team
+        goal.location.y = sign * GOAL_Y
+        goal.location.z = GOAL_HEIGHT
+        goal.direction.y = -sign
+        goal.width = GOAL_WIDTH
+        goal.height = GOAL_HEIGHT
+    return field_info
+
+
+def create_game_tick_packet(num_cars=1) -> GameTickPacket:
+    """Builds an empty, active GameTickPacket with the given number of cars and the standard boost pads."""
+    packet = GameTickPacket()
+    packet.num_cars = num_cars
+    packet.num_boost = len(BOOST_PAD_LOCATIONS)
+    packet.num_teams = 2
+    packet.game_info.is_round_active = True
+    packet.game_info.game_speed = 1
+    packet.game_info.world_gravity_z = -650
+    for index in range(packet.num_boost):
+        packet.game_boosts[index].is_active = True
+    for index in range(num_cars):
+        car = packet.game_cars[index]
+        car.name = f'Car {index}'
+        car.team = index % 2
+        car.is_bot = True
+        car.hitbox.length, car.hitbox.width, car.hitbox.height = CAR_HITBOX
+        car.hitbox_offset.x, car.hitbox_offset.y, car.hitbox_offset.z = CAR_HITBOX_OFFSET
+    packet.teams[1].team_index = 1
+    packet.game_ball.latest_touch.player_index = -1
+    return packet
+
+
+def write_physics(physics, location, velocity, rotation=None, angular_velocity=None):
+    """Copies plain python values into an rlbot Physics struct."""
+    physics.location.x, physics.location.y, physics.location.z = location
+    physics.velocity.x, physics.velocity.y, physics.velocity.z = velocity
+    if rotation is not None:
+        physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = rotation
+    if angular_velocity is not None:
+        physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z = angular_velocity
+
+
+def create_ball_prediction(ball, game_time, num_slices=360, step=1 / 60) -> BallPrediction:
+    """
+    Builds a BallPrediction by stepping the simulated ball forward, like the framework does with the real
+    physics. The first slice is the current state of the ball.
+    """
+    path = predict_ball_path(tuple(ball.location) + tuple(ball.velocity), num_slices, step)
+    return fill_ball_prediction(BallPrediction(), path, game_time, step, ball.angular_velocity)
+
+
+def fill_ball_prediction(prediction: BallPrediction, path: np.ndarray, game_time, step=1 / 60,
+                         angular_velocity=Vec3()) -> BallPrediction:
+    """Writes rows of (x, y, z, vx, vy, vz) ball states into the slices of the prediction in one go."""
+    num_slices = len(path)
+    slices = np.frombuffer(prediction.slices, dtype=SLICE_DTYPE, count=num_slices)
+    slices['location'] = path[:, :3]
+    slices['velocity'] = path[:, 3:]
+    slices['angular_velocity'] = tuple(angular_velocity)
+    slices['game_seconds'] = game_time + np.arange(num_slices) * step
+    prediction.num_slices = num_slices
+    return prediction
+
+
+def yaw_toward(source: Vec3, target: Vec3) -> float:
+    """Yaw of a car at source facing the target, handy to set up scenarios."""
+    return math.atan2(target.y - source.y, target.x - source.x)
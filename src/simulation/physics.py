@@ -0,0 +1,214 @@
+"""
+Deliberately simple stand-ins for the game physics. They are good enough to make the bots drive, jump and
+chase a bouncing ball, which is what we need to exercise the bot logic offline, not to match the game.
+"""
+import math
+
+import numpy as np
+
+from tools.aerial import BOOST_ACCELERATION, BOOST_CONSUMPTION, MAX_CAR_SPEED
+from util.vec import Vec3
+
+GRAVITY = -650
+BALL_RADIUS = 92.75
+BALL_RESTITUTION = 0.6
+BALL_MAX_SPEED = 6000
+FIELD_X = 4096
+FIELD_Y = 5120
+CEILING_Z = 2044
+
+CAR_REST_HEIGHT = 17.01
+BRAKE_ACCELERATION = 3500
+COAST_DECELERATION = 525
+JUMP_SPEED = 291.667
+AIR_ROTATION_SPEED = 5.5
+TOUCH_DISTANCE = BALL_RADIUS + 60
+TOUCH_SPEED = 500
+
+
+def throttle_acceleration(speed):
+    """Approximation of the throttle acceleration curve of the game."""
+    speed = abs(speed)
+    if speed < 1400:
+        return 1600 - speed * (1440 / 1400)
+    if speed < 1410:
+        return 160 - (speed - 1400) * 16
+    return 0
+
+
+def max_curvature(speed):
+    """Approximation of the inverse turning radius of a car at full steer."""
+    speed = abs(speed)
+    if speed < 500:
+        return 0.0069 - speed * 5.84e-6
+    if speed < 1000:
+        return 0.00398 - (speed - 500) * 3.26e-6
+    if speed < 1500:
+        return 0.00235 - (speed - 1000) * 1.35e-6
+    return max(0.00088, 0.001375 - (speed - 1500) * 0.55e-6)
+
+
+class SimulatedBall:
+    """Ballistic ball bouncing off the floor, the ceiling and the side walls."""
+
+    def __init__(self, location=Vec3(0, 0, BALL_RADIUS), velocity=Vec3(), angular_velocity=Vec3()):
+        self.location = Vec3(location)
+        self.velocity = Vec3(velocity)
+        self.angular_velocity = Vec3(angular_velocity)
+
+    def copy(self):
+        return SimulatedBall(self.location, self.velocity, self.angular_velocity)
+
+    def step(self, dt):
+        state = step_ball_state(tuple(self.location) + tuple(self.velocity), dt)
+        self.location = Vec3(*state[:3])
+        self.velocity = Vec3(*state[3:])
+
+
+def step_ball_state(state, dt):
+    """Advances a (x, y, z, vx, vy, vz) ball state by dt. Works on plain floats, it runs for every slice."""
+    x, y, z, vx, vy, vz = state
+    vz += GRAVITY * dt
+    x += vx * dt
+    y += vy * dt
+    z += vz * dt
+
+    if z < BALL_RADIUS:
+        z = BALL_RADIUS
+        vz = -vz * BALL_RESTITUTION if vz < -1 else 0
+    elif z > CEILING_Z - BALL_RADIUS:
+        z = CEILING_Z - BALL_RADIUS
+        vz = -abs(vz) * BALL_RESTITUTION
+    if abs(x) > FIELD_X - BALL_RADIUS:
+        x = math.copysign(FIELD_X - BALL_RADIUS, x)
+        vx = -vx * BALL_RESTITUTION
+    if abs(y) > FIELD_Y - BALL_RADIUS:
+        y = math.copysign(FIELD_Y - BALL_RADIUS, y)
+        vy = -vy * BALL_RESTITUTION
+    return x, y, z, vx, vy, vz
+
+
+def predict_ball_path(state, steps, dt) -> np.ndarray:
+    """Returns the next steps ball states as rows of (x, y, z, vx, vy, vz), starting with state itself."""
+    path = np.empty((steps, 6))
+    for index in range(steps):
+        path[index] = state
+        state = step_ball_state(state, dt)
+    return path
+
+
+class SimulatedCar:
+    """
+    Kinematic car: on the ground it follows the throttle curve and turns on a circle given by the steer,
+    in the air it falls, boosts along its nose and rotates at a constant rate per unit of input.
+    """
+
+    def __init__(self, location=Vec3(0, 0, CAR_REST_HEIGHT), yaw=0.0, boost=34.0):
+        self.location = Vec3(location)
+        self.velocity = Vec3()
+        self.angular_velocity = Vec3()
+        self.pitch = 0.0
+        self.yaw = yaw
+        self.roll = 0.0
+        self.boost = boost
+        self.has_wheel_contact = True
+        self.jumped = False
+        self.double_jumped = False
+        self.jump_held = False
+
+    @property
+    def rotation(self):
+        return self.pitch, self.yaw, self.roll
+
+    def forward(self):
+        cp, sp = math.cos(self.pitch), math.sin(self.pitch)
+        return Vec3(cp * math.cos(self.yaw), cp * math.sin(self.yaw), sp)
+
+    def step(self, controls, dt):
+        boosting = controls.boost and self.boost > 0
+        if boosting:
+            self.boost = max(0.0, self.boost - BOOST_CONSUMPTION * dt)
+        if self.has_wheel_contact:
+            self._step_ground(controls, boosting, dt)
+        else:
+            self._step_air(controls, boosting, dt)
+        self.jump_held = bool(controls.jump)
+        self._clip_to_field()
+
+    def _step_ground(self, controls, boosting, dt):
+        forward = self.forward()
+        speed = self.velocity.dot(forward)
+        throttle = controls.throttle
+        if throttle * speed < 0:
+            acceleration = math.copysign(BRAKE_ACCELERATION, throttle)
+        elif abs(throttle) > 0.01:
+            acceleration = throttle * throttle_acceleration(speed)
+        else:
+            acceleration = -math.copysign(min(COAST_DECELERATION, abs(speed) / dt), speed)
+        if boosting:
+            acceleration += BOOST_ACCELERATION
+        speed = max(-MAX_CAR_SPEED, min(MAX_CAR_SPEED, speed + acceleration * dt))
+
+        yaw_rate = controls.steer * max_curvature(speed) * speed
+        self.yaw = (self.yaw + yaw_rate * dt + math.pi) % (2 * math.pi) - math.pi
+        self.pitch = self.roll = 0.0
+        self.angular_velocity = Vec3(0, 0, yaw_rate)
+        self.velocity = self.forward() * speed
+        self.location = Vec3(self.location.x, self.location.y, CAR_REST_HEIGHT) + self.velocity * dt
+
+        if controls.jump and not self.jump_held:
+            self.velocity += Vec3(0, 0, JUMP_SPEED)
+            self.has_wheel_contact = False
+            self.jumped = True
+
+    def _step_air(self, controls, boosting, dt):
+        if controls.jump and not self.jump_held and not self.double_jumped:
+            self.velocity += Vec3(0, 0, JUMP_SPEED)
+            self.double_jumped = True
+        self.pitch = max(-math.pi / 2, min(math.pi / 2, self.pitch + controls.pitch * AIR_ROTATION_SPEED * dt))
+        self.yaw = (self.yaw + controls.yaw * AIR_ROTATION_SPEED * dt + math.pi) % (2 * math.pi) - math.pi
+        self.roll = (self.roll + controls.roll * AIR_ROTATION_SPEED * dt + math.pi) % (2 * math.pi) - math.pi
+        self.angular_velocity = Vec3(controls.roll, controls.pitch, controls.yaw) * AIR_ROTATION_SPEED
+
+        acceleration = Vec3(0, 0, GRAVITY)
+        if boosting:
+            acceleration += self.forward() * BOOST_ACCELERATION
+        self.velocity += acceleration * dt
+        if self.velocity.length() > MAX_CAR_SPEED:
+            self.velocity = self.velocity.rescale(MAX_CAR_SPEED)
+        self.location += self.velocity * dt
+
+        if self.location.z <= CAR_REST_HEIGHT and self.velocity.z <= 0:
+            self.location = Vec3(self.location.x, self.location.y, CAR_REST_HEIGHT)
+            self.velocity = Vec3(self.velocity.x, self.velocity.y, 0)
+            self.pitch = self.roll = 0.0
+            self.has_wheel_contact = True
+            self.jumped = self.double_jumped = False
+
+    def _clip_to_field(self):
+        x, y, z = self.location.x, self.location.y, self.location.z
+        vx, vy, vz = self.velocity.x, self.velocity.y, self.velocity.z
+        if abs(x) > FIELD_X:
+            x, vx = math.copysign(FIELD_X, x), 0
+        if abs(y) > FIELD_Y:
+            y, vy = math.copysign(FIELD_Y, y), 0
+        if z > CEILING_Z:
+            z, vz = CEILING_Z, min(vz, 0)
+        self.location = Vec3(x, y, z)
+        self.velocity = Vec3(vx, vy, vz)
+
+
+def resolve_touch(car: SimulatedCar, ball: SimulatedBall) -> bool:
+    """Pushes the ball away from the car when they overlap and the ball is not already moving away."""
+    offset = ball.location - car.location
+    distance = offset.length()
+    if distance > TOUCH_DISTANCE or distance == 0:
+        return False
+    normal = offset / distance
+    approach_speed = (car.velocity - ball.velocity).dot(normal)
+    if approach_speed <= 0:
+        return False
+    ball.velocity = ball.velocity + normal * (approach_speed + TOUCH_SPEED)
+    if ball.velocity.length() > BALL_MAX_SPEED:
+        ball.velocity = ball.velocity.rescale(BALL_MAX_SPEED)
+    return True
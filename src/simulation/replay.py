@@ -0,0 +1,92 @@
+"""
+Feeds a recording back into an agent. Every recorded packet and ball prediction is handed to get_output exactly
+as it was recorded, so a slow tick or a misplay from a match can be reproduced and profiled offline.
+
+# recording = Recording('ChargingRhino-20240101-120000.dmrec')
+# replayer = Replayer(recording, create_agent(ChargingRhino))
+# record = replayer.replay(*replayer.around(recording.slowest(1)[0]))
+"""
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+from rlbot.agents.base_agent import BaseAgent
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+
+from simulation.harness import NullRenderer, SimulationRecord
+from tools.performance import TickMonitor
+from tools.recording import Recording, CONTROLS_DTYPE, controls_to_tuple
+from util.orientation import clear_orientation_cache
+from util.prediction_cache import shared_prediction_cache
+
+
+# Iterations solvers get per tick during a replay, instead of a share of the tick's wall clock time
+REPLAY_SOLVER_ITERATIONS = 50
+
+
+class Replayer:
+    """
+    Replays a recording into an agent. The agent's framework hooks are redirected to the recording, game state
+    changes are ignored because the recording already holds what happened after them. The TickMonitors of the
+    agent hand out budgets of solver_iterations iterations, so replaying gives the same controls every time,
+    however fast the machine runs.
+    """
+
+    def __init__(self, recording: Recording, agent: BaseAgent, initialize=True,
+                 solver_iterations: int = REPLAY_SOLVER_ITERATIONS):
+        self.recording = recording
+        self.agent = agent
+        self.solver_iterations = solver_iterations
+        self._ball_prediction: Optional[BallPrediction] = None
+
+        agent.renderer = NullRenderer()
+        agent.get_field_info = lambda: recording.field_info
+        agent.get_ball_prediction_struct = lambda: self._ball_prediction
+        agent.set_game_state = lambda game_state: None
+        agent.send_quick_chat = lambda *args, **kwargs: None
+        if initialize:
+            agent.initialize_agent()
+        self._fix_solver_budgets()
+
+    def _fix_solver_budgets(self):
+        for value in vars(self.agent).values():
+            if isinstance(value, TickMonitor):
+                value.fixed_iterations = self.solver_iterations
+
+    def around(self, index: int, warm_up: int = 120) -> Tuple[int, int]:
+        """Range of records to replay to reproduce the given tick, with warm_up ticks in front to set the agent up."""
+        return max(0, index - warm_up), index + 1
+
+    def replay(self, start: int = 0, stop: int = None) -> SimulationRecord:
+        """Replays the records from start to stop and records the controls and durations of the agent."""
+        stop = len(self.recording) if stop is None else min(stop, len(self.recording))
+        ticks = max(0, stop - start)
+        game_times = np.array(self.recording.game_times[start:stop], dtype=float)
+        controls = np.empty(ticks, dtype=CONTROLS_DTYPE)
+        durations = np.empty(ticks)
+
+        shared_prediction_cache.reset()
+        clear_orientation_cache()
+        get_output = self.agent.get_output
+        clock = time.perf_counter
+        for tick, index in enumerate(range(start, stop)):
+            # Decoding is done before the clock starts, only the agent is timed
+            packet = self.recording.packet(index)
+            self._ball_prediction = self.recording.ball_prediction(index)
+            begin = clock()
+            output = get_output(packet)
+            durations[tick] = clock() - begin
+            controls[tick] = controls_to_tuple(output)
+        return SimulationRecord(game_times, controls, durations)
+
+    def mismatches(self, record: SimulationRecord, start: int = 0, tolerance: float = 1e-5) -> np.ndarray:
+        """Indices into the recording where the replayed controls differ from the recorded controls."""
+        recorded = self.recording.controls[start:start + len(record)]
+        replayed = record.controls
+        different = np.zeros(len(record), dtype=bool)
+        for name in CONTROLS_DTYPE.names:
+            if CONTROLS_DTYPE[name] == np.bool_:
+                different |= recorded[name] != replayed[name]
+            else:
+                different |= np.abs(recorded[name] - replayed[name]) > tolerance
+        return np.flatnonzero(different) + start
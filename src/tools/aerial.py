@@ -0,0 +1,260 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from tools.performance import SolverBudget
+from util.ball_prediction_analysis import BallPredictionView, find_first_index
+from util.vec import Vec3
+
+# Acceleration of the car while boosting in the air, in uu/s^2
+BOOST_ACCELERATION = 991.667
+# Boost used per second of holding the boost button
+BOOST_CONSUMPTION = 33.3
+MAX_CAR_SPEED = 2300
+GRAVITY = Vec3(0, 0, -650)
+
+
+@dataclass
+class AerialSolution:
+    direction: Vec3  # Unit vector in which the car should boost
+    time: float  # Seconds until the car reaches the target
+    boost_needed: float  # Boost amount used by boosting until the intercept
+    feasible: bool  # Enough boost and the car stays below the maximum speed
+    converged: bool  # The time changed less than the tolerance in the last iteration
+    iterations: int
+
+
+@dataclass
+class SolverResult:
+    value: Vec3  # The best answer found, also when the solver did not converge
+    converged: bool
+    iterations: int
+
+
+@dataclass
+class AerialScan:
+    index: Optional[int]  # Earliest reachable slice, None when nothing can be reached
+    reachable: np.ndarray  # One boolean per slice
+    required_acceleration: np.ndarray  # Boost acceleration needed to reach each slice, in uu/s^2
+    times: np.ndarray  # Seconds from now until each slice
+
+    def best_index(self) -> Optional[int]:
+        """The earliest reachable slice, or the slice needing the least acceleration if none is reachable."""
+        if self.index is not None:
+            return self.index
+        if np.isnan(self.required_acceleration).all():
+            return None
+        return int(np.nanargmin(self.required_acceleration))
+
+
+def scan_aerial_slices(view: BallPredictionView, car_location: Vec3, car_velocity: Vec3, game_time: float,
+                       boost_amount: float = 100, min_time: float = 1 / 60) -> AerialScan:
+    """
+    Evaluates every slice of the ball prediction at once. For each slice it computes the constant boost
+    acceleration the car needs to be at the ball at exactly that moment:
+
+        a = 2 (ball - car - car_velocity t) / t^2 - gravity
+
+    A slice is reachable when that acceleration is achievable and there is enough boost to hold it that long.
+    """
+    times = view.times.astype(np.float64) - game_time
+    valid = times >= min_time
+    safe_times = np.where(valid, times, 1.0)
+
+    car = np.array((car_location.x, car_location.y, car_location.z))
+    velocity = np.array((car_velocity.x, car_velocity.y, car_velocity.z))
+    gravity = np.array((GRAVITY.x, GRAVITY.y, GRAVITY.z))
+    relative = view.locations - car - velocity * safe_times[:, None]
+    acceleration = 2 * relative / (safe_times ** 2)[:, None] - gravity
+
+    required_acceleration = np.sqrt(np.einsum('ij,ij->i', acceleration, acceleration))
+    required_acceleration[~valid] = np.nan
+    reachable = valid & (required_acceleration <= BOOST_ACCELERATION) & (times * BOOST_CONSUMPTION <= boost_amount)
+    return AerialScan(find_first_index(reachable), reachable, required_acceleration, times)
+
+
+def solve_aerial_intercept(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3,
+                           boost_amount: float = 100, tolerance: float = 1e-4, max_iterations: int = 50,
+                           initial_time: float = None, budget: SolverBudget = None) -> AerialSolution:
+    """
+    Finds the earliest time at which a car boosting at full power in a fixed direction meets a target that
+    moves ballistically. Car and target fall with the same gravity, so it cancels out and the relative motion is:
+
+        D + V t = 0.5 a t^2  with D the relative location and V the relative velocity
+
+    Requiring |a| to be the boost acceleration gives a quartic in t, which is solved with Newton's method kept
+    inside a bracket, so it can not diverge. When the target moves toward the car (D.V < 0) the quartic can
+    have three positive roots: the car can meet the target, fall behind it and meet it again. The bracket then
+    ends at the local maximum of the quartic, so Newton finds the earliest intercept and can not run off to a
+    later one. When a budget is given it replaces max_iterations, and the best time so far is used when it runs
+    out.
+    """
+    if budget is None:
+        budget = SolverBudget(max_iterations)
+
+    dx = target.x - car_location.x
+    dy = target.y - car_location.y
+    dz = target.z - car_location.z
+    vx = target_velocity.x - car_velocity.x
+    vy = target_velocity.y - car_velocity.y
+    vz = target_velocity.z - car_velocity.z
+
+    dd = dx * dx + dy * dy + dz * dz
+    dv = dx * vx + dy * vy + dz * vz
+    vv = vx * vx + vy * vy + vz * vz
+    aa = BOOST_ACCELERATION ** 2
+
+    if dd == 0:
+        return _create_solution(0.0, vx, vy, vz, car_velocity, boost_amount, True, 0)
+
+    # f(t) = A^2 t^4 - 4 V.V t^2 - 8 D.V t - 4 D.D, negative at t = 0 and positive after the root
+    def f(t):
+        t2 = t * t
+        return aa * t2 * t2 - 4 * vv * t2 - 8 * dv * t - 4 * dd
+
+    def df(t):
+        return 4 * aa * t * t * t - 8 * vv * t - 8 * dv
+
+    # Cauchy's bound on the roots of the polynomial
+    low = 0.0
+    high = 1 + max(4 * vv, 8 * abs(dv), 4 * dd) / aa
+    if dv < 0:
+        turning_points = _turning_points(aa, dv, vv)
+        if turning_points is not None:
+            maximum, minimum = turning_points
+            if f(maximum) >= 0:
+                # The car meets the target before it falls behind, f rises up to the maximum
+                high = maximum
+            else:
+                # The only root is where f rises again after the minimum
+                low = minimum
+    if initial_time is None or not low < initial_time < high:
+        # Time needed to cover the distance from standstill
+        initial_time = math.sqrt(2 * math.sqrt(dd) / BOOST_ACCELERATION)
+        if not low < initial_time < high:
+            initial_time = 0.5 * (low + high)
+
+    t = initial_time
+    converged = False
+    iterations = 0
+    while not budget.exhausted(iterations):
+        iterations += 1
+        value = f(t)
+        if value < 0:
+            low = t
+        else:
+            high = t
+        slope = df(t)
+        new_t = t - value / slope if slope > 0 else low - 1
+        if not low < new_t < high:
+            # Newton left the bracket, fall back to bisection
+            new_t = 0.5 * (low + high)
+        converged = abs(new_t - t) < tolerance
+        t = new_t
+        if converged:
+            break
+
+    # The direction of the required acceleration 2 (D + V t) / t^2
+    return _create_solution(t, dx + vx * t, dy + vy * t, dz + vz * t, car_velocity, boost_amount, converged,
+                            iterations)
+
+
+def _turning_points(aa, dv, vv):
+    """
+    The local maximum and minimum of the quartic at positive t, or None when it only rises there. They are the
+    roots of its derivative, the depressed cubic t^3 + p t + q with p = -2 V.V / A^2 and q = -2 D.V / A^2,
+    which has two positive roots when D.V < 0 and its discriminant is positive.
+    """
+    p = -2 * vv / aa
+    q = -2 * dv / aa
+    if 4 * p * p * p + 27 * q * q >= 0:
+        return None
+    # Trigonometric solution for three real roots, k = 0 is the largest and k = 1 the smallest positive one
+    scale = 2 * math.sqrt(-p / 3)
+    angle = math.acos(3 * q / (p * scale)) / 3
+    return scale * math.cos(angle - 2 * math.pi / 3), scale * math.cos(angle)
+
+
+def _create_solution(t, ax, ay, az, car_velocity, boost_amount, converged, iterations):
+    length = math.sqrt(ax * ax + ay * ay + az * az)
+    if length > 0:
+        direction = Vec3(ax / length, ay / length, az / length)
+    else:
+        direction = Vec3(0, 0, 1)
+
+    boost_needed = t * BOOST_CONSUMPTION
+    final_velocity = car_velocity + (direction * BOOST_ACCELERATION + GRAVITY) * t
+    feasible = boost_needed <= boost_amount and final_velocity.length() <= MAX_CAR_SPEED
+    return AerialSolution(direction, t, boost_needed, feasible, converged, iterations)
+
+
+class AerialSolver:
+    """
+    Keeps the intercept of the previous tick, so the next tick's search starts from it instead of from scratch.
+    During steady flight the previous intercept time, minus the time that passed, is almost exactly the new
+    one, and the solver converges in one or two iterations. The boost direction follows from the time.
+
+    Call update with every packet. Ball touches and jumps in game time (like a reset from the
+    TrainingController) make the previous intercept meaningless, so they start the next search from scratch.
+    """
+
+    def __init__(self, tolerance: float = 1e-4, max_time_jump: float = 0.25):
+        self.tolerance = tolerance
+        # A warm solution that moved more than this many seconds counts as a discontinuity
+        self.max_time_jump = max_time_jump
+        self.game_time = 0.0
+        self.previous: Optional[AerialSolution] = None
+        self.previous_game_time = 0.0
+        self.last_touch_time = None
+
+        self.cold_solves = 0
+        self.cold_iterations = 0
+        self.warm_solves = 0
+        self.warm_iterations = 0
+        self.invalidations = 0
+
+    def update(self, packet):
+        game_time = packet.game_info.seconds_elapsed
+        touch_time = packet.game_ball.latest_touch.time_seconds
+        if self.last_touch_time is not None and touch_time != self.last_touch_time:
+            self.invalidate()
+        if not 0 <= game_time - self.game_time <= self.max_time_jump:
+            self.invalidate()
+        self.last_touch_time = touch_time
+        self.game_time = game_time
+
+    def invalidate(self):
+        if self.previous is not None:
+            self.invalidations += 1
+        self.previous = None
+
+    def solve(self, target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3,
+              boost_amount: float = 100, budget: SolverBudget = None) -> AerialSolution:
+        initial_time = None
+        if self.previous is not None:
+            initial_time = self.previous.time - (self.game_time - self.previous_game_time)
+        solution = solve_aerial_intercept(target, target_velocity, car_location, car_velocity, boost_amount,
+                                          self.tolerance, initial_time=initial_time, budget=budget)
+
+        if initial_time is not None and abs(solution.time - initial_time) <= self.max_time_jump:
+            self.warm_solves += 1
+            self.warm_iterations += solution.iterations
+        else:
+            if initial_time is not None:
+                # The target jumped, this search did not profit from the previous one
+                self.invalidations += 1
+            self.cold_solves += 1
+            self.cold_iterations += solution.iterations
+
+        self.previous = solution if solution.converged else None
+        self.previous_game_time = self.game_time
+        return solution
+
+    def iterations_saved(self) -> float:
+        """Estimate of the iterations saved by warm starts, compared to the average search from scratch."""
+        if self.cold_solves == 0:
+            return 0.0
+        average_cold_iterations = self.cold_iterations / self.cold_solves
+        return self.warm_solves * average_cold_iterations - self.warm_iterations
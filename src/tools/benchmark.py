@@ -0,0 +1,272 @@
+"""
+Benchmarks of the geometry and planning hot paths, measured on the synthetic packets of the simulation package.
+
+Run `python -m tools.benchmark` from the src directory to compare against the stored baseline, which exits with
+an error when a benchmark got slower than the threshold allows. Run it with --save after a deliberate change
+(or on a new machine, timings do not carry over between machines) to store the current timings as the baseline.
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from rlbot.utils.structures.game_data_struct import Rotator
+
+from simulation.packets import create_ball_prediction, create_field_info, create_game_tick_packet
+from simulation.physics import SimulatedBall
+from tools.helper import find_shot, clamp2D, find_boost_in_path, predict_ball_fall, find_aerial_target_direction, \
+    find_aerial_ball, find_aerial_target, find_aerial_direction, get_target_goal
+from tools.shots import plan_shot
+from util.ball_prediction_analysis import find_matching_slice, predict_future_goal, as_view
+from util.boost_pad_tracker import BoostPadTracker
+from util.jump import MAX_HOLD_TICKS, jump_trajectory, simulate_jumps
+from util.orientation import Orientation, relative_location
+from util.vec import Vec3
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+# A benchmark regresses when it takes this much longer than its baseline
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    # Number of operations one call of the benchmarked function does, the results are per operation
+    operations: int = 1
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, operations: int = 1):
+    """Registers a setup function, which builds the fixtures and returns the function to time."""
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, operations))
+        return setup
+    return register
+
+
+def measure(function: Callable[[], object], repeat: int = 5, min_time: float = 0.1) -> float:
+    """Best time of one call over the repeats, each repeat running the function for at least min_time."""
+    timer = timeit.Timer(function)
+    elapsed = timer.timeit(1)  # Also warms up caches, like the first tick of a match
+    number = max(1, int(min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.1) -> Dict[str, float]:
+    """Seconds per operation of every (selected) benchmark."""
+    results = {}
+    for case in BENCHMARKS:
+        if names and not any(name in case.name for name in names):
+            continue
+        results[case.name] = measure(case.setup(), repeat, min_time) / case.operations
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Regression]:
+    """Benchmarks that got slower than their baseline by more than the threshold, new benchmarks never regress."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is not None and current > previous * (1 + threshold):
+            regressions.append(Regression(name, previous, current))
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, float]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(results: Dict[str, float], path: str = BASELINE_PATH):
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, 'w') as file:
+        json.dump(dict(sorted(baseline.items())), file, indent=2)
+        file.write('\n')
+
+
+# Fixtures shared by the benchmarks: a car in our half chasing a ball flying over the middle of the field
+CAR_LOCATION = Vec3(-800, -3000, 17)
+CAR_VELOCITY = Vec3(200, 900, 0)
+BALL_LOCATION = Vec3(300, 200, 600)
+BALL_VELOCITY = Vec3(-200, 800, 900)
+GAME_TIME = 10.0
+
+
+def create_prediction():
+    return create_ball_prediction(SimulatedBall(BALL_LOCATION, BALL_VELOCITY), GAME_TIME)
+
+
+def create_packet():
+    packet = create_game_tick_packet()
+    packet.game_info.seconds_elapsed = GAME_TIME
+    return packet
+
+
+@benchmark('vec3_arithmetic')
+def bench_vec3_arithmetic():
+    a, b = Vec3(1, 2, 3), Vec3(-4, 5, 0.5)
+
+    def run():
+        return ((a + b) * 2 - a).normalized().cross(b).dot(a) + a.dist(b) + a.ang_to(b)
+    return run
+
+
+@benchmark('orientation_relative_location')
+def bench_orientation():
+    rotator = Rotator(0.2, 1.3, -0.1)
+
+    def run():
+        return relative_location(CAR_LOCATION, Orientation(rotator), BALL_LOCATION)
+    return run
+
+
+@benchmark('find_shot')
+def bench_find_shot():
+    goal_a, goal_b = get_target_goal(0)
+    return lambda: find_shot(goal_a, goal_b, BALL_LOCATION, CAR_LOCATION)
+
+
+@benchmark('clamp2D')
+def bench_clamp2d():
+    direction, start, end = Vec3(0.3, 0.9, 0).normalized(), Vec3(-0.5, 1, 0).normalized(), Vec3(0.5, 1, 0).normalized()
+    return lambda: clamp2D(direction, start, end)
+
+
+@benchmark('find_boost_in_path')
+def bench_find_boost_in_path():
+    tracker = BoostPadTracker()
+    tracker.initialize_boosts(create_field_info())
+    tracker.update_boost_status(create_packet())
+    return lambda: find_boost_in_path(CAR_LOCATION, BALL_LOCATION, tracker)
+
+
+@benchmark('predict_ball_fall')
+def bench_predict_ball_fall():
+    view, packet = as_view(create_prediction()), create_packet()
+    return lambda: predict_ball_fall(BALL_LOCATION, view, packet)
+
+
+@benchmark('find_aerial_target_direction')
+def bench_find_aerial_target_direction():
+    return lambda: find_aerial_target_direction(BALL_LOCATION, BALL_VELOCITY, CAR_LOCATION, CAR_VELOCITY)
+
+
+@benchmark('find_aerial_ball')
+def bench_find_aerial_ball():
+    prediction, packet = create_prediction(), create_packet()
+    return lambda: find_aerial_ball(CAR_LOCATION, CAR_VELOCITY, prediction, packet)
+
+
+@benchmark('find_aerial_target')
+def bench_find_aerial_target():
+    return lambda: find_aerial_target(BALL_LOCATION, BALL_VELOCITY, CAR_LOCATION, CAR_VELOCITY)
+
+
+@benchmark('find_aerial_direction')
+def bench_find_aerial_direction():
+    return lambda: find_aerial_direction(BALL_LOCATION, CAR_LOCATION, CAR_VELOCITY)
+
+
+@benchmark('find_matching_slice')
+def bench_find_matching_slice():
+    prediction = create_prediction()
+    return lambda: find_matching_slice(prediction, 0, lambda s: s.physics.location.z < 200)
+
+
+@benchmark('predict_future_goal')
+def bench_predict_future_goal():
+    prediction = create_prediction()
+    return lambda: predict_future_goal(prediction)
+
+
+@benchmark('plan_shot')
+def bench_plan_shot():
+    view = as_view(create_prediction())
+    goal_a, goal_b = get_target_goal(0)
+    forward = Vec3(0, 1, 0)
+    return lambda: plan_shot(view, GAME_TIME, CAR_LOCATION, forward, CAR_VELOCITY.length(), goal_a, goal_b)
+
+
+@benchmark('simulate_jumps', operations=MAX_HOLD_TICKS)
+def bench_simulate_jumps():
+    hold_ticks = list(range(1, MAX_HOLD_TICKS + 1))
+    return lambda: simulate_jumps(hold_ticks)
+
+
+@benchmark('jump_trajectory')
+def bench_jump_trajectory():
+    return lambda: jump_trajectory(0.1)
+
+
+def _bench_agent(agent_class, ticks):
+    # A full tick: get_output of the agent plus the (cheap) simulation step of the harness.
+    # Imported here, the agents live at the top of src and pull in the whole bot
+    from simulation.harness import SimulationHarness, create_agent
+    harness = SimulationHarness(create_agent(agent_class), seed=0)
+
+    def run():
+        harness.reset()
+        harness.run(ticks)
+    return run
+
+
+@benchmark('rhino_tick', operations=240)
+def bench_rhino():
+    from Rhino import ChargingRhino
+    return _bench_agent(ChargingRhino, 240)
+
+
+@benchmark('eagle_tick', operations=240)
+def bench_eagle():
+    from Eagle import FlyingEagle
+    return _bench_agent(FlyingEagle, 240)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the geometry and planning hot paths')
+    parser.add_argument('names', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown before a benchmark counts as a regression (0.25 is 25%%)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.names, args.repeat)
+    baseline = load_baseline()
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        change = f'{(seconds / previous - 1) * 100:+7.1f}%' if previous else '    new'
+        print(f'{name:32} {seconds * 1e6:10.2f} us {change}')
+
+    if args.save:
+        save_baseline(results)
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f'Regression: {regression.name} is {regression.ratio:.2f}x slower than its baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""
+Model of driving on the ground: the throttle and boost acceleration curves, and tables derived from them that
+answer how long the car needs to reach a point with a few array lookups instead of a simulation.
+
+The curves start from the known values of the game and can be fitted to recordings of real runs (for example
+the throttle and boost sweeps of SprintingCheetah, recorded with DREAMMATE_RECORD set). Run
+`python -m tools.drive_model <recordings...>` from the src directory to fit the curves and store them next to
+this module, where get_drive_model() picks them up.
+"""
+import ctypes
+import math
+import os
+import sys
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from rlbot.utils.structures.game_data_struct import Physics, PlayerInfo, Vector3
+
+from tools.aerial import BOOST_ACCELERATION, MAX_CAR_SPEED
+from tools.recording import CAR_SIZE, Recording
+from util.vec import Vec3
+
+DRIVE_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'drive_model.npz')
+ArrayLike = Union[float, np.ndarray]
+
+# Speeds at which the acceleration curves are defined, linear in between
+SPEED_KNOTS = np.array([0, 250, 500, 750, 1000, 1250, 1400, 1410, 1600, 1800, 2000, 2200, 2300], dtype=float)
+# Throttle acceleration of the game: linear from 1600 at rest to 160 at 1400, then gone at 1410
+DEFAULT_THROTTLE_ACCELERATION = np.interp(SPEED_KNOTS, [0, 1400, 1410, MAX_CAR_SPEED], [1600, 160, 0, 0])
+DEFAULT_BOOST_ACCELERATION = np.where(SPEED_KNOTS < MAX_CAR_SPEED, BOOST_ACCELERATION, 0)
+
+# Inverse turning radius at full steer of the game
+CURVATURE_SPEEDS = np.array([0, 500, 1000, 1500, 1750, MAX_CAR_SPEED], dtype=float)
+CURVATURES = np.array([0.0069, 0.00398, 0.00235, 0.001375, 0.0011, 0.00088])
+
+# Resolution of the tables, all lookups index them directly
+TABLE_STEP = 1 / 120
+TABLE_DURATION = 6
+SPEED_STEP = 10
+STEER_STEP = 0.05
+# Below this speed a turn is assumed to happen at this speed, the car speeds up while it turns
+MIN_TURN_SPEED = 500
+
+# Fitting only uses ticks on the ground with the controls of a straight sprint
+FIT_MAX_STEER = 0.1
+FIT_MIN_SAMPLES = 5
+
+_VELOCITY_OFFSET = PlayerInfo.physics.offset + Physics.velocity.offset
+_WHEEL_CONTACT_OFFSET = PlayerInfo.has_wheel_contact.offset
+
+
+def _interpolate(table: np.ndarray, step: float, value: ArrayLike) -> ArrayLike:
+    """Linear interpolation in a table sampled every step from 0, clamped to its ends. Costs O(1) per value."""
+    position = np.clip(np.asarray(value, dtype=float) / step, 0, len(table) - 1)
+    low = np.minimum(position.astype(np.int64), len(table) - 2)
+    fraction = position - low
+    result = table[low] * (1 - fraction) + table[low + 1] * fraction
+    return float(result) if np.ndim(result) == 0 else result
+
+
+class DriveCurve:
+    """
+    Straight line sprint from rest with one set of controls, integrated once. Starting at any speed is the same
+    sprint entered later, so the time to cover a distance from a speed is the difference of two lookups.
+    """
+
+    def __init__(self, accelerations: np.ndarray):
+        ticks = int(TABLE_DURATION / TABLE_STEP) + 1
+        speeds = np.zeros(ticks)
+        distances = np.zeros(ticks)
+        for tick in range(1, ticks):
+            acceleration = np.interp(speeds[tick - 1], SPEED_KNOTS, accelerations)
+            speeds[tick] = min(speeds[tick - 1] + acceleration * TABLE_STEP, MAX_CAR_SPEED)
+            distances[tick] = distances[tick - 1] + (speeds[tick - 1] + speeds[tick]) / 2 * TABLE_STEP
+        self.speeds = speeds
+        self.distances = distances
+        self.top_speed = float(speeds[-1])
+
+        # The inverses, sampled evenly as well, so they are lookups too
+        speed_grid = np.arange(0, self.top_speed + SPEED_STEP, SPEED_STEP)
+        self.time_at_speed = np.interp(speed_grid, speeds, np.arange(ticks) * TABLE_STEP)
+        self.distance_step = float(distances[-1]) / (ticks - 1)
+        distance_grid = np.arange(ticks) * self.distance_step
+        self.time_at_distance = np.interp(distance_grid, distances, np.arange(ticks) * TABLE_STEP)
+
+    def time_to_reach(self, distance: ArrayLike, speed: ArrayLike) -> ArrayLike:
+        """Seconds to cover the distance starting at speed, never slowing down."""
+        distance = np.asarray(distance, dtype=float)
+        speed = np.minimum(np.asarray(speed, dtype=float), MAX_CAR_SPEED)
+        # Faster than this sprint ever gets: the car keeps its speed
+        entry_speed = np.minimum(speed, self.top_speed)
+        start_time = _interpolate(self.time_at_speed, SPEED_STEP, entry_speed)
+        start_distance = _interpolate(self.distances, TABLE_STEP, start_time)
+        end_distance = start_distance + distance
+        end_time = _interpolate(self.time_at_distance, self.distance_step, end_distance)
+        # Past the end of the table the car drives on at its last speed
+        beyond = np.maximum(end_distance - self.distances[-1], 0) / max(self.speeds[-1], 1)
+        result = np.where(speed > self.top_speed, distance / np.maximum(speed, 1), end_time - start_time + beyond)
+        return float(result) if np.ndim(result) == 0 else result
+
+
+class DriveModel:
+    """
+    Acceleration of the car on the ground by speed, for full throttle and for full throttle with boost, and the
+    tables built from them: straight line sprints with and without boost and the turning radius by speed and
+    steer.
+    """
+
+    def __init__(self, throttle_accelerations: np.ndarray = DEFAULT_THROTTLE_ACCELERATION,
+                 boost_accelerations: np.ndarray = DEFAULT_BOOST_ACCELERATION):
+        self.throttle_accelerations = np.asarray(throttle_accelerations, dtype=float)
+        self.boost_accelerations = np.asarray(boost_accelerations, dtype=float)
+        self.throttle = DriveCurve(self.throttle_accelerations)
+        self.boost = DriveCurve(self.throttle_accelerations + self.boost_accelerations)
+
+        speeds = np.arange(0, MAX_CAR_SPEED + SPEED_STEP, SPEED_STEP)
+        steers = np.arange(0, 1 + STEER_STEP / 2, STEER_STEP)
+        curvatures = np.interp(speeds, CURVATURE_SPEEDS, CURVATURES)
+        with np.errstate(divide='ignore'):
+            # Steering scales the curvature, not steering at all never turns
+            self.turning_radii = 1 / np.outer(curvatures, steers)
+
+    def acceleration(self, speed: ArrayLike, boost: bool = False) -> ArrayLike:
+        accelerations = self.throttle_accelerations + (self.boost_accelerations if boost else 0)
+        return np.interp(speed, SPEED_KNOTS, accelerations)
+
+    def turning_radius(self, speed: ArrayLike, steer: ArrayLike = 1) -> ArrayLike:
+        speed_index = np.clip(np.rint(np.abs(speed) / SPEED_STEP), 0, len(self.turning_radii) - 1).astype(np.int64)
+        steer_index = np.clip(np.rint(np.abs(steer) / STEER_STEP), 0, self.turning_radii.shape[1] - 1)
+        result = self.turning_radii[speed_index, steer_index.astype(np.int64)]
+        return float(result) if np.ndim(result) == 0 else result
+
+    def time_to_reach(self, distance: ArrayLike, speed: ArrayLike, boost: bool = False) -> ArrayLike:
+        curve = self.boost if boost else self.throttle
+        return curve.time_to_reach(distance, speed)
+
+    def arrival_time(self, location, forward, speed: float, targets, boost: bool = False) -> ArrayLike:
+        """
+        Fastest time to drive to the targets (one Vec3 or an array of rows x, y, z): turn at full steer while
+        keeping the speed until the car faces the target along a tangent of its turning circle, then sprint in a
+        straight line. Targets inside the circle on their own side are reached by turning the other way around.
+        """
+        if isinstance(targets, Vec3):
+            targets = (targets.x, targets.y, targets.z)
+        targets = np.asarray(targets, dtype=float)
+        offsets = targets[..., :2] - (location[0], location[1])
+        # The target in the frame of the car: ahead along forward, and to the side
+        forward_x, forward_y = forward[0], forward[1]
+        length = math.hypot(forward_x, forward_y) or 1
+        forward_x, forward_y = forward_x / length, forward_y / length
+        ahead = offsets[..., 0] * forward_x + offsets[..., 1] * forward_y
+        side = np.abs(offsets[..., 0] * forward_y - offsets[..., 1] * forward_x)
+
+        # The car turns on the circle of its current speed and speeds up while it turns
+        radius = self.turning_radius(speed)
+        turn_speed = max(abs(speed), MIN_TURN_SPEED)
+        toward = self._turn_and_sprint(ahead, side, radius, turn_speed, abs(speed), boost)
+        away = self._turn_and_sprint(ahead, -side, radius, turn_speed, abs(speed), boost)
+        result = np.minimum(toward, away)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def _turn_and_sprint(self, ahead, side, radius, turn_speed, speed, boost) -> np.ndarray:
+        # Turning toward the side the target is on, around the center (radius, 0)
+        center_x = side - radius
+        center_distance = np.hypot(center_x, ahead)
+        # The car leaves the circle where the line to the target touches it, at the angle psi (from +x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            psi = np.arctan2(ahead, center_x) + np.arccos(np.minimum(radius / center_distance, 1))
+        arc = (np.pi - psi) % (2 * np.pi)
+        # A target straight ahead can round to a full circle
+        arc = np.where(arc > 2 * np.pi - 1e-9, 0, arc)
+        straight = np.sqrt(np.maximum(center_distance ** 2 - radius ** 2, 0))
+        times = arc * radius / turn_speed + self.time_to_reach(straight, speed, boost)
+        # Inside the circle no tangent reaches the target this way
+        return np.where(center_distance >= radius, times, np.inf)
+
+    def save(self, path: str = DRIVE_MODEL_PATH):
+        np.savez(path, throttle=self.throttle_accelerations, boost=self.boost_accelerations)
+
+    @classmethod
+    def load(cls, path: str = DRIVE_MODEL_PATH) -> 'DriveModel':
+        with np.load(path) as data:
+            return cls(data['throttle'], data['boost'])
+
+
+def recorded_car_states(recording: Recording, index: int = 0):
+    """Flat speed and wheel contact of one car in every tick of a recording, read straight from the records."""
+    cars = recording.records['cars'][:, index * CAR_SIZE:(index + 1) * CAR_SIZE]
+    velocity_size = ctypes.sizeof(Vector3)
+    velocities = np.ascontiguousarray(cars[:, _VELOCITY_OFFSET:_VELOCITY_OFFSET + velocity_size])
+    velocities = velocities.view(np.float32).reshape(-1, 3)
+    speeds = np.hypot(velocities[:, 0], velocities[:, 1]).astype(float)
+    wheel_contact = cars[:, _WHEEL_CONTACT_OFFSET] != 0
+    return speeds, wheel_contact
+
+
+def fit_drive_model(recordings: Iterable[Recording], index: int = 0, base: DriveModel = None) -> DriveModel:
+    """
+    Fits the acceleration curves to the ticks of the recordings in which the car drove straight at full throttle
+    on the ground. The acceleration of a tick is the change of speed until the next tick, grouped by the knot
+    its speed is nearest to; knots without enough samples keep the curve of base (the game's curve by default).
+    """
+    base = base or DriveModel()
+    samples = {False: ([], []), True: ([], [])}
+    for recording in recordings:
+        speeds, wheel_contact = recorded_car_states(recording, index)
+        controls = recording.controls[:-1]
+        delta_times = np.diff(recording.game_times.astype(float))
+        valid = (wheel_contact[:-1] & wheel_contact[1:] & (delta_times > 0) & (delta_times < 0.05) &
+                 (controls['throttle'] > 0.99) & (np.abs(controls['steer']) < FIT_MAX_STEER) &
+                 ~controls['handbrake'].astype(bool))
+        accelerations = np.diff(speeds) / np.where(delta_times > 0, delta_times, 1)
+        for boost in (False, True):
+            selected = valid & (controls['boost'].astype(bool) == boost)
+            samples[boost][0].append(speeds[:-1][selected])
+            samples[boost][1].append(accelerations[selected])
+
+    def fit(speeds, accelerations, default):
+        curve = default.copy()
+        if not speeds:
+            return curve
+        speeds, accelerations = np.concatenate(speeds), np.concatenate(accelerations)
+        knots = np.abs(speeds[:, None] - SPEED_KNOTS).argmin(axis=1)
+        for knot in range(len(SPEED_KNOTS)):
+            in_knot = accelerations[knots == knot]
+            if len(in_knot) >= FIT_MIN_SAMPLES:
+                curve[knot] = np.median(in_knot)
+        return curve
+
+    throttle = fit(*samples[False], base.throttle_accelerations)
+    with_boost = fit(*samples[True], base.throttle_accelerations + base.boost_accelerations)
+    return DriveModel(throttle, np.maximum(with_boost - throttle, 0))
+
+
+_drive_model: Optional[DriveModel] = None
+
+
+def get_drive_model() -> DriveModel:
+    """The model shared by all agents: the fitted one when it was stored, otherwise the game's curves."""
+    global _drive_model
+    if _drive_model is None:
+        _drive_model = DriveModel.load() if os.path.exists(DRIVE_MODEL_PATH) else DriveModel()
+    return _drive_model
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python -m tools.drive_model <recordings...>')
+        sys.exit(1)
+    model = fit_drive_model(Recording(path) for path in sys.argv[1:])
+    model.save()
+    print('Throttle:', np.round(model.throttle_accelerations).tolist())
+    print('Boost:', np.round(model.boost_accelerations).tolist())
+    print(f'Saved the drive model to {DRIVE_MODEL_PATH}')
@@ -1,55 +1,35 @@
 import math
 
+import numpy as np
 from rlbot.agents.base_agent import SimpleControllerState
 
-from util.ball_prediction_analysis import find_slice_at_time
+from tools.aerial import solve_aerial_intercept, scan_aerial_slices, SolverResult, AerialSolver
+from tools.performance import SolverBudget
+from util.ball_prediction_analysis import as_view
 from util.boost_pad_tracker import BoostPadTracker
 from util.drive import limit_to_safe_range
+from util.kernels import clamp2d_index, shot_target
 from util.vec import Vec3
 
 
-def find_shot(target_a: Vec3, target_b: Vec3, ball_location: Vec3, car_location: Vec3):
-    try:
-        car_to_ball = ball_location - car_location
-        car_to_ball_direction = car_to_ball.normalized()
-    except ZeroDivisionError:
-        return ball_location
+# Size of the ball, and how far find_shot moves its target sideways per radian the car has to turn
+BALL_RADIUS = 92.75
+SHOT_SIDE_ADJUSTMENT = 2560
 
-    ball_to_left_target_direction = (target_a - ball_location).normalized()
-    ball_to_right_target_direction = (target_b - ball_location).normalized()
-    direction_of_approach = clamp2D(car_to_ball_direction,
-                                    ball_to_left_target_direction,
-                                    ball_to_right_target_direction)
 
-    offset_ball_location = ball_location - (direction_of_approach * 92.75)
-
-    try:
-        side_of_approach_direction = sign(
-            (ball_location - car_location).dot(direction_of_approach.cross(Vec3(0, 0, 1))))
-        car_to_ball_perpendicular = car_to_ball.cross(Vec3(0, 0, side_of_approach_direction)).normalized()
-        adjustment = abs(car_to_ball.flat().ang_to(direction_of_approach.flat())) * 2560
-        final_target = offset_ball_location + (car_to_ball_perpendicular * adjustment)
-    except ZeroDivisionError:
-        return offset_ball_location
-    except ValueError:
-        return offset_ball_location
-    return final_target
+def find_shot(target_a: Vec3, target_b: Vec3, ball_location: Vec3, car_location: Vec3):
+    x, y, z = shot_target(target_a.x, target_a.y, target_a.z, target_b.x, target_b.y, target_b.z,
+                          ball_location.x, ball_location.y, ball_location.z,
+                          car_location.x, car_location.y, car_location.z, BALL_RADIUS, SHOT_SIDE_ADJUSTMENT)
+    return Vec3(x, y, z)
 
 
 def clamp2D(direction: Vec3, start: Vec3, end: Vec3):
-    is_right = direction.dot(end.cross(Vec3(0, 0, -1))) < 0
-    is_left = direction.dot(start.cross(Vec3(0, 0, -1))) > 0
-
-    if end.dot(start.cross(Vec3(0, 0, -1))) > 0:
-        if is_left and is_right:
-            return direction
-    else:
-        if is_left or is_right:
-            return direction
-
-    if start.dot(direction) < end.dot(direction):
+    index = clamp2d_index(direction.x, direction.y, direction.z, start.x, start.y, start.z, end.x, end.y, end.z)
+    if index == 0:
+        return direction
+    if index == 2:
         return end
-
     return start
 
 
@@ -129,22 +109,17 @@ def find_boost_in_path(car, target, boost_map):
     """
 
     distance_car_to_target = car.dist(target)
+    # Only active boost pads that are on track of the path, full boost gets a bit more priority
+    indices, distances_to_car, distances_to_target = boost_map.find_pads_in_ellipse(
+        car, target, distance_car_to_target * 1.2, full_boost_bonus=300)
+    distances_to_target -= np.where(boost_map.is_full_boost[indices], 300, 0)
+
     closest_boost = None
-    for pad in boost_map.boost_pads:
-        distance_to_target = pad.location.dist(target)
-        distance_to_car = pad.location.dist(car)
-        if not pad.is_active:
-            # Skip non-active boost pads
-            continue
-        if pad.is_full_boost:
-            # Give a bit more priority to full boost
-            distance_to_target -= 300
-        if distance_to_target + distance_to_car > distance_car_to_target * 1.2:
-            # Skip if the boost is not on track of the path
-            continue
+    for index, distance_to_car, distance_to_target in zip(
+            indices.tolist(), distances_to_car.tolist(), distances_to_target.tolist()):
         if closest_boost is None:
             # If no boost has been selected, so temporarily select it
-            closest_boost = (pad, distance_to_car, distance_to_target)
+            closest_boost = (index, distance_to_car, distance_to_target)
             continue
         is_closer_to_car = distance_to_car < closest_boost[1]
         is_closer_to_target = distance_to_target < closest_boost[2]
@@ -159,36 +134,44 @@ def find_boost_in_path(car, target, boost_map):
             if sum_previous < sum_current:
                 # Boost is not closer to the car
                 continue
-        closest_boost = (pad, distance_to_car, distance_to_target)
+        closest_boost = (index, distance_to_car, distance_to_target)
 
     if closest_boost is None:
         return None
-    return closest_boost[0].location
+    return boost_map.boost_pads[closest_boost[0]].location
 
 
 def predict_ball_fall(ball_prediction, ball_prediction_struct, packet):
+    """
+    :param Vec3 ball_prediction: Current ball location
+    :param ball_prediction_struct: BallPrediction struct or a BallPredictionView of it
+    """
+    view = as_view(ball_prediction_struct)
     game_time = packet.game_info.seconds_elapsed
     ball_approach_time = 0.1
-    for i in range(50):
-        ball_in_future = find_slice_at_time(
-            ball_prediction_struct, game_time + 0.1 * i)
-        if ball_in_future is None:
-            # There is nothing to predict
-            break
-        # Convert the location to Vec3
-        new_ball_prediction = Vec3(ball_in_future.physics.location)
-        if new_ball_prediction.z < ball_prediction.z:
+    if view.num_slices == 0:
+        return ball_approach_time, ball_prediction
+
+    # Look up all 50 samples at once, the loop below only has to deal with floats
+    approx_indices = ((game_time + 0.1 * np.arange(50) - view.start_time) * 60).astype(np.int64)
+    valid = (approx_indices >= 0) & (approx_indices < view.num_slices)
+    num_valid = len(valid) if valid.all() else int(np.argmin(valid))
+    future_locations = view.locations[approx_indices[:num_valid]].tolist()
+
+    prediction_x, prediction_y, prediction_z = ball_prediction.x, ball_prediction.y, ball_prediction.z
+    for i, (x, y, z) in enumerate(future_locations):
+        if z < prediction_z:
             # The new prediction needs to be lower than the previous prediction
-            ball_prediction = new_ball_prediction
-        elif ball_prediction.z < 200:
+            prediction_x, prediction_y, prediction_z = x, y, z
+        elif prediction_z < 200:
             ball_approach_time = 0.1 * i
-            ball_prediction_distance = ball_prediction.length()
+            ball_prediction_distance = math.sqrt(prediction_x ** 2 + prediction_y ** 2 + prediction_z ** 2)
             approach_speed = ball_prediction_distance / ball_approach_time
             if approach_speed > 800:
                 continue
-            ball_prediction = new_ball_prediction
+            prediction_x, prediction_y, prediction_z = x, y, z
             break
-    return ball_approach_time, ball_prediction
+    return ball_approach_time, Vec3(prediction_x, prediction_y, prediction_z)
 
 
 def limit_controls(controls: SimpleControllerState):
@@ -200,137 +183,47 @@ def limit_controls(controls: SimpleControllerState):
     return controls
 
 
-def find_aerial_target_direction(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3):
-    relative_target = BetterVec3(target - car_location)
+def find_aerial_target_direction(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3,
+                                 budget: SolverBudget = None, solver: AerialSolver = None):
+    """Pass the agent's AerialSolver to start the search from the previous tick's solution."""
+    relative_target = target - car_location
+    relative_distance = relative_target.length()
 
     car_speed = car_velocity.length() + 1
-    trajectory_time = abs(relative_target.xyz_length / car_speed)
-
-    increment_z_angle = 10
-    increment_xy_angle = 10
-    increment_boost = 1
-    last_z_angle_error = 1000
-    last_xy_angle_error = 1000
-    last_boost_error = 1000
-
-    gravity = Vec3(0, 0, 650)
-    boost_direction = BetterVec3(relative_target.normalized())
-
-    if relative_target.xyz_length < car_speed / 2:
+    if relative_distance < car_speed / 2:
         return car_velocity
 
-    for i in range(15):
-        future_target_position = BetterVec3(relative_target + target_velocity * trajectory_time
-                                            + 0.5 * -gravity * trajectory_time ** 2)
-        needed_car_velocity = future_target_position / trajectory_time
-        needed_car_acceleration = (needed_car_velocity - car_velocity) / trajectory_time
-        boost_force = needed_car_acceleration + gravity
-
-        boost_error = 991.667 - boost_force.length()
-        if abs(boost_error) > abs(last_boost_error):
-            increment_boost *= -0.5
-        trajectory_time += increment_boost
-        last_boost_error = boost_error
-
-    for i in range(15):
-        acceleration = boost_direction * 991.6667 - gravity
-        try:
-            acceleration_sss = (boost_direction - car_velocity.normalized()) * 991.6667 - gravity
-        except ZeroDivisionError:
-            acceleration_sss = acceleration
-
-        trajectory_time_before_sss = (2200 - car_speed) / acceleration.length()
-        trajectory_time_after_sss = 0
-        if trajectory_time_before_sss < 0:
-            trajectory_time_before_sss = 0
-        if trajectory_time < trajectory_time_before_sss:
-            trajectory_time_after_sss = trajectory_time - trajectory_time_before_sss
-        else:
-            trajectory_time_before_sss = trajectory_time
-
-        future_car_velocity = BetterVec3(car_velocity + acceleration * trajectory_time_before_sss
-                                         + acceleration_sss * trajectory_time_after_sss
-                                         )
-        future_car_position = BetterVec3(car_velocity * trajectory_time_before_sss
-                                         + 0.5 * acceleration * trajectory_time_before_sss ** 2
-                                         + future_car_velocity * trajectory_time_after_sss
-                                         + 0.5 * acceleration_sss * trajectory_time_after_sss ** 2
-                                         )
-        future_target_position = BetterVec3(relative_target + target_velocity * trajectory_time
-                                            + 0.5 * -gravity * trajectory_time ** 2)
-
-        ratio_before_sss = (trajectory_time_before_sss / trajectory_time)
-        ratio_after_sss = (trajectory_time_after_sss / trajectory_time)
-        trajectory_speed = (0.5 * (future_car_velocity.xyz_length + car_speed) * ratio_before_sss
-                            + future_car_velocity.xyz_length * ratio_after_sss)
-        trajectory_time = future_target_position.xyz_length / trajectory_speed
-
-        z_angle_error = 0
-        z_angle_error += calculate_angle_error(future_target_position.z_angle, future_car_position.z_angle)
-        z_angle_error += calculate_angle_error(future_target_position.z_angle, future_car_velocity.z_angle)
-        if abs(z_angle_error) > abs(last_z_angle_error):
-            increment_z_angle *= -0.5
-        boost_direction.z_angle += increment_z_angle
-        last_z_angle_error = z_angle_error
-
-        xy_angle_error = 0
-        xy_angle_error += calculate_angle_error(future_target_position.xy_angle, future_car_position.xy_angle)
-        xy_angle_error += calculate_angle_error(future_target_position.xy_angle, future_car_velocity.xy_angle)
-        if abs(xy_angle_error) > abs(last_xy_angle_error):
-            increment_xy_angle *= -0.5
-        boost_direction.xy_angle += increment_xy_angle
-        last_xy_angle_error = xy_angle_error
-
-        boost_direction.z = math.sin(boost_direction.z_angle * math.pi / 180)
-        boost_direction.xy_length = math.cos(boost_direction.z_angle * math.pi / 180)
-        boost_direction.x = math.cos(boost_direction.xy_angle * math.pi / 180) * boost_direction.xy_length
-        boost_direction.y = math.sin(boost_direction.xy_angle * math.pi / 180) * boost_direction.xy_length
-
-    return boost_direction * (relative_target.xyz_length * 0.2)
+    if solver is not None:
+        solution = solver.solve(target, target_velocity, car_location, car_velocity, budget=budget)
+    else:
+        solution = solve_aerial_intercept(target, target_velocity, car_location, car_velocity, budget=budget)
+    return solution.direction * (relative_distance * 0.2)
 
 
 def find_aerial_ball(car_location: Vec3, car_velocity: Vec3, ball_prediction_struct, packet):
+    view = as_view(ball_prediction_struct)
     game_time = packet.game_info.seconds_elapsed
-    ball_slice = find_slice_at_time(ball_prediction_struct, game_time)
-    if ball_slice is None:
+    scan = scan_aerial_slices(view, car_location, car_velocity, game_time)
+    index = scan.best_index()
+    if index is None:
         return car_location + car_velocity * 0.5
+    x, y, z = view.locations[index].tolist()
+    return Vec3(x, y, z)
 
-    target_location = Vec3(ball_slice.physics.location)
-    relative_target = target_location - car_location
-
-    car_speed = car_velocity.length() + 1
-    trajectory_time = abs(relative_target.length() / car_speed) if car_speed > 200 else 1
-
-    increment_boost = 0.1
-    last_boost_error = 1000
 
-    gravity = Vec3(0, 0, 650)
+def find_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3,
+                       budget: SolverBudget = None):
+    return solve_aerial_target(target, target_velocity, car_location, car_velocity, budget).value
 
-    for i in range(30):
-        ball_in_future = find_slice_at_time(ball_prediction_struct, game_time + trajectory_time)
-        if ball_in_future is None: break
-        future_ball_position = Vec3(ball_in_future.physics.location)
-        future_relative_position = future_ball_position - car_location
-        needed_car_velocity = future_relative_position / trajectory_time
-        needed_car_acceleration = (needed_car_velocity - car_velocity) / trajectory_time
-        needed_boost_force = needed_car_acceleration + gravity
-        boost_force = needed_boost_force.length()
 
-        if boost_force < 991.667:
-            break
-        boost_error = 991.667 - boost_force
-        if abs(boost_error) > abs(last_boost_error):
-            increment_boost *= -0.5
-        trajectory_time += increment_boost
-        last_boost_error = boost_error
-
-    new_target = find_slice_at_time(ball_prediction_struct, game_time + trajectory_time - 0.05)
-    if new_target is None:
-        return car_location + car_velocity * 0.5
-    return Vec3(new_target.physics.location)
-
-
-def find_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3):
+def solve_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3, car_velocity: Vec3,
+                        budget: SolverBudget = None) -> SolverResult:
+    """
+    Searches the time at which the needed boost force drops below what the car can deliver.
+    Without a budget it runs at most 15 iterations. Returns the target location at the best time found.
+    """
+    if budget is None:
+        budget = SolverBudget(max_iterations=15)
     relative_target = (target - car_location)
 
     car_speed = car_velocity.length() + 1
@@ -342,9 +235,13 @@ def find_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3,
     gravity = Vec3(0, 0, 650)
 
     if trajectory_time < 0.5:
-        return target + target_velocity * trajectory_time + 0.5 * -gravity * trajectory_time ** 2
+        return SolverResult(target + target_velocity * trajectory_time + 0.5 * -gravity * trajectory_time ** 2,
+                            True, 0)
 
-    for i in range(15):
+    converged = False
+    iterations = 0
+    while not budget.exhausted(iterations):
+        iterations += 1
         future_target_position = (target + target_velocity * trajectory_time
                                   + 0.5 * -gravity * trajectory_time ** 2)
         future_relative_position = future_target_position - car_location
@@ -354,6 +251,7 @@ def find_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3,
         boost_force = needed_boost_force.length()
 
         if boost_force < 991:
+            converged = True
             break
 
         boost_error = 991.667 - boost_force
@@ -362,10 +260,23 @@ def find_aerial_target(target: Vec3, target_velocity: Vec3, car_location: Vec3,
         trajectory_time += increment_boost
         last_boost_error = boost_error
 
-    return target + target_velocity * trajectory_time + 0.5 * -gravity * trajectory_time ** 2
+    location = target + target_velocity * trajectory_time + 0.5 * -gravity * trajectory_time ** 2
+    return SolverResult(location, converged, iterations)
 
 
-def find_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3):
+def find_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3, budget: SolverBudget = None):
+    return solve_aerial_direction(target, car_location, car_velocity, budget).value
+
+
+def solve_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3, budget: SolverBudget = None,
+                           tolerance: float = 0.1) -> SolverResult:
+    """
+    Searches the boost direction for which the velocity of the car points at the target. Stops when both angle
+    errors or both search steps are below the tolerance in degrees, without a budget after at most 30 iterations.
+    Returns the direction with the smallest angle errors seen.
+    """
+    if budget is None:
+        budget = SolverBudget(max_iterations=30)
     relative_target = BetterVec3(target - car_location)
 
     car_speed = car_velocity.length() + 1
@@ -377,12 +288,17 @@ def find_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3):
     last_xy_angle_error = 1000
 
     if relative_target.xyz_length < car_speed / 2:
-        return car_velocity
+        return SolverResult(car_velocity, True, 0)
 
     gravity = Vec3(0, 0, 650)
     boost_direction = BetterVec3(relative_target.normalized())
+    best_direction = Vec3(boost_direction)
+    best_error = math.inf
 
-    for i in range(30):
+    converged = False
+    iterations = 0
+    while not budget.exhausted(iterations):
+        iterations += 1
         acceleration = boost_direction * 991.666 - gravity
         future_car_velocity = BetterVec3(car_velocity + acceleration * trajectory_time)
         # future_car_position = BetterVec3(relative_target - car_velocity * trajectory_time
@@ -394,14 +310,24 @@ def find_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3):
         z_angle_error = 0
         # z_angle_error += calculate_angle_error(relative_target.z_angle, future_car_position.z_angle)
         z_angle_error += calculate_angle_error(relative_target.z_angle, future_car_velocity.z_angle)
+        xy_angle_error = 0
+        # xy_angle_error += calculate_angle_error(relative_target.xy_angle, future_car_position.xy_angle)
+        xy_angle_error += calculate_angle_error(relative_target.xy_angle, future_car_velocity.xy_angle)
+
+        # The errors belong to the current direction, remember it before stepping away from it
+        if abs(z_angle_error) + abs(xy_angle_error) < best_error:
+            best_error = abs(z_angle_error) + abs(xy_angle_error)
+            best_direction = Vec3(boost_direction)
+        if abs(z_angle_error) < tolerance and abs(xy_angle_error) < tolerance or \
+                abs(increment_z_angle) < tolerance and abs(increment_xy_angle) < tolerance:
+            converged = True
+            break
+
         if abs(z_angle_error) > abs(last_z_angle_error):
             increment_z_angle *= -0.5
         boost_direction.z_angle += increment_z_angle
         last_z_angle_error = z_angle_error
 
-        xy_angle_error = 0
-        # xy_angle_error += calculate_angle_error(relative_target.xy_angle, future_car_position.xy_angle)
-        xy_angle_error += calculate_angle_error(relative_target.xy_angle, future_car_velocity.xy_angle)
         if abs(xy_angle_error) > abs(last_xy_angle_error):
             increment_xy_angle *= -0.5
         boost_direction.xy_angle += increment_xy_angle
@@ -412,7 +338,7 @@ def find_aerial_direction(target: Vec3, car_location: Vec3, car_velocity: Vec3):
         boost_direction.x = math.cos(boost_direction.xy_angle * math.pi / 180) * boost_direction.xy_length
         boost_direction.y = math.sin(boost_direction.xy_angle * math.pi / 180) * boost_direction.xy_length
 
-    return boost_direction * (relative_target.xyz_length * 0.1)
+    return SolverResult(best_direction * (relative_target.xyz_length * 0.1), converged, iterations)
 
 
 def calculate_vector(vector: Vec3):
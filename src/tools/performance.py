@@ -1,21 +1,313 @@
+import heapq
+import os
 import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Set this environment variable to 1 to profile the get_output of every DreamMate agent
+PROFILE_ENVIRONMENT_VARIABLE = 'DREAMMATE_PROFILE'
+# Edges of the tick time histogram in milliseconds, the last bin holds everything slower
+HISTOGRAM_EDGES = (0.5, 1, 2, 4, 8.33, 16.67, 33.33)
+
 
 class TickMonitor:
-    def __init__(self):
+    """
+    Keeps track of the frame timing of an agent. Call step once at the start of every get_output.
+
+    tps is smoothed with an exponential moving average over the frame times, so one late frame does not
+    make it swing; raw_tps is the value of the last frame alone and window_tps the average over the last
+    `window` frames. The first step only starts the clock, the time since creating the monitor is no frame.
+    Frames taking longer than the budget plus the margin count as late frames; a frame is the time between two
+    steps, so this includes waiting for the next packet, not only the time spent in get_output.
+    When the game time is given, drift tracks how much the wall clock ran ahead of the game clock.
+    """
+
+    def __init__(self, budget: float = 1 / 120, smoothing: float = 0.05, window: int = 120,
+                 late_margin: float = 0.5):
         time_now = time.perf_counter()
         self.last_time = time_now
         self.tps = 1
+        self.raw_tps = 1
+        self.window_tps = 1
+
+        self.budget = budget
+        self.smoothing = smoothing
+        self.late_margin = late_margin
+        self.tick_count = 0
+        self.late_frames = 0
+
+        self.frame_time = None
+        self._window = np.zeros(window)
+        self._window_sum = 0.0
 
-    def step(self):
+        self.drift = 0.0
+        self._start_time = time_now
+        self._start_game_time = None
+        # When set, solver budgets only count iterations, see solver_budget
+        self.fixed_iterations: Optional[int] = None
+
+    def step(self, game_time: float = None):
         time_now = time.perf_counter()
+        if game_time is not None and self._start_game_time is None:
+            self._start_time = time_now
+            self._start_game_time = game_time
+        if self.tick_count == 0:
+            # The time since __init__ is no frame, timing starts with the second step
+            self.tick_count = 1
+            self.last_time = time_now
+            return self.tps
+
         time_dif = time_now - self.last_time
         if time_dif > 0:
-            self.tps = 1 / time_dif
+            self.raw_tps = 1 / time_dif
+            if self.frame_time is None:
+                self.frame_time = time_dif
+            else:
+                self.frame_time += self.smoothing * (time_dif - self.frame_time)
+            self.tps = 1 / self.frame_time
         else:
-            self.tps = 1
+            self.raw_tps = 1
+
+        frames = self.tick_count - 1
+        position = frames % len(self._window)
+        self._window_sum += time_dif - self._window[position]
+        self._window[position] = time_dif
+        if self._window_sum > 0:
+            self.window_tps = min(frames + 1, len(self._window)) / self._window_sum
+
+        if time_dif > self.budget * (1 + self.late_margin):
+            self.late_frames += 1
+
+        if game_time is not None:
+            self.drift = (time_now - self._start_time) - (game_time - self._start_game_time)
+
+        self.tick_count += 1
         self.last_time = time_now
         return self.tps
 
+    def elapsed(self) -> float:
+        """Seconds since the start of this tick."""
+        return time.perf_counter() - self.last_time
+
+    def remaining_budget(self) -> float:
+        """
+        Seconds left of this tick's budget. Expensive routines can check this and settle for a cheaper answer
+        when it runs low, instead of making the agent miss the next frame.
+        """
+        return self.budget - self.elapsed()
+
+    def deadline(self) -> float:
+        """The time.perf_counter() value at which this tick's budget runs out."""
+        return self.last_time + self.budget
+
+    def late_rate(self) -> float:
+        if self.tick_count <= 1:
+            return 0.0
+        return self.late_frames / (self.tick_count - 1)
+
+    def solver_budget(self, fraction: float = 0.5, max_iterations: int = None) -> 'SolverBudget':
+        """
+        A budget for an iterative solver that ends after the given fraction of this tick. The tick length is the
+        smallest of the budget and the smoothed frame time, so the solver gets less time when packets arrive
+        faster than expected, and more iterations when the machine is idle.
+
+        With fixed_iterations set the budget has no deadline, so the results do not depend on how fast the
+        machine runs. Replays set it to give the same controls every time.
+        """
+        if self.fixed_iterations is not None:
+            iterations = self.fixed_iterations if max_iterations is None else min(max_iterations,
+                                                                                  self.fixed_iterations)
+            return SolverBudget(iterations)
+        tick_length = self.budget if self.frame_time is None else min(self.budget, self.frame_time)
+        return SolverBudget(max_iterations, self.last_time + tick_length * fraction)
+
+
+class SolverBudget:
+    """
+    Limits how long an iterative solver may run, by a number of iterations, a time.perf_counter() deadline
+    or both. Solvers check exhausted after every iteration and return their best result so far when it is.
+    """
+    # Protects against solvers that never converge when neither limit is given
+    HARD_ITERATION_LIMIT = 1000
+
+    def __init__(self, max_iterations: int = None, deadline: float = None, min_iterations: int = 1):
+        self.max_iterations = max_iterations
+        self.deadline = deadline
+        self.min_iterations = min_iterations
+
+    def exhausted(self, iterations: int) -> bool:
+        if iterations < self.min_iterations:
+            return False
+        if iterations >= (self.HARD_ITERATION_LIMIT if self.max_iterations is None else self.max_iterations):
+            return True
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+
+class ProfilerSpan:
+    """Context manager timing one named section. It is reused for every tick, so entering it allocates nothing."""
+
+    def __init__(self, profiler: 'TickProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+
+class TickProfiler:
+    """
+    Records how long every tick and the named sections inside it take. The last `capacity` ticks are kept in
+    ring buffers, from which the percentiles are computed. The slowest ticks ever seen are kept separately
+    together with the time of each of their sections, so a single slow tick can still be traced back.
+
+    Sections are either timed with a span, or with lap which charges the time since the previous lap (or the
+    start of the tick) to the named section. Laps don't need the code to be indented and also work around
+    early returns: whatever runs after the last lap is charged to final_section. Usage inside get_output:
+    # prediction = get_ball_prediction(self, packet)
+    # self.profiler.lap('prediction')
+    # with self.profiler.span('solver'):
+    #     solution = solve_aerial_intercept(...)
+    """
+
+    def __init__(self, name: str, capacity: int = 1200, worst_ticks: int = 5, final_section: str = 'control'):
+        self.name = name
+        self.final_section = final_section
+        self.capacity = capacity
+        self.worst_ticks = worst_ticks
+        self.tick_count = 0
+        self.tick_start = 0.0
+        self.totals = np.zeros(capacity)
+        self.sections: Dict[str, np.ndarray] = {}
+        self.histogram = np.zeros(len(HISTOGRAM_EDGES) + 1, dtype=np.int64)
+        self.worst: List[Tuple[float, int, Dict[str, float]]] = []
+        self._spans: Dict[str, ProfilerSpan] = {}
+        self._current: Dict[str, float] = {}
+        self._last_lap = 0.0
+
+    def span(self, name: str) -> ProfilerSpan:
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans[name] = ProfilerSpan(self, name)
+        return span
+
+    def lap(self, name: str):
+        time_now = time.perf_counter()
+        self.add_time(name, time_now - self._last_lap)
+        self._last_lap = time_now
+
+    def add_time(self, name: str, duration: float):
+        if name not in self.sections:
+            # Ticks before the section was first seen have no sample, statistics skip them
+            self.sections[name] = np.full(self.capacity, np.nan)
+        self._current[name] = self._current.get(name, 0.0) + duration
+
+    def start_tick(self):
+        self._current.clear()
+        self.tick_start = self._last_lap = time.perf_counter()
+
+    def end_tick(self):
+        self.lap(self.final_section)
+        duration = self._last_lap - self.tick_start
+        position = self.tick_count % self.capacity
+        self.totals[position] = duration
+        for name, times in self.sections.items():
+            times[position] = self._current.get(name, 0.0)
+        self.histogram[np.searchsorted(HISTOGRAM_EDGES, duration * 1000)] += 1
+
+        if len(self.worst) < self.worst_ticks or duration > self.worst[0][0]:
+            entry = (duration, self.tick_count, dict(self._current))
+            if len(self.worst) < self.worst_ticks:
+                heapq.heappush(self.worst, entry)
+            else:
+                heapq.heapreplace(self.worst, entry)
+        self.tick_count += 1
+
+    def statistics(self) -> Dict[str, Tuple[float, float, float, float]]:
+        """Returns the p50, p95, p99 and maximum in milliseconds of the total and every section."""
+        size = min(self.tick_count, self.capacity)
+        result = {}
+        if size == 0:
+            return result
+        for name, times in [('total', self.totals)] + list(self.sections.items()):
+            p50, p95, p99 = np.nanpercentile(times[:size], (50, 95, 99)) * 1000
+            result[name] = (p50, p95, p99, np.nanmax(times[:size]) * 1000)
+        return result
+
+    def report(self) -> str:
+        lines = [f'Profile of {self.name} over the last {min(self.tick_count, self.capacity)} '
+                 f'of {self.tick_count} ticks (ms)',
+                 f'{"section":<16}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}']
+        for name, (p50, p95, p99, maximum) in self.statistics().items():
+            lines.append(f'{name:<16}{p50:>9.3f}{p95:>9.3f}{p99:>9.3f}{maximum:>9.3f}')
+
+        edges = ('0',) + tuple(f'{edge}' for edge in HISTOGRAM_EDGES)
+        lines.append('Tick time histogram (ms):')
+        for i, count in enumerate(self.histogram.tolist()):
+            upper = f'{HISTOGRAM_EDGES[i]}' if i < len(HISTOGRAM_EDGES) else 'inf'
+            lines.append(f'  {edges[i]:>6} - {upper:<6}{count:>8}')
+
+        lines.append('Worst ticks:')
+        for duration, tick, sections in sorted(self.worst, reverse=True):
+            spans = ', '.join(f'{name} {value * 1000:.3f}' for name, value in sections.items())
+            lines.append(f'  tick {tick}: {duration * 1000:.3f} ({spans})')
+        return '\n'.join(lines)
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+class NullProfiler:
+    """Stands in for TickProfiler when profiling is disabled, so the spans in get_output cost next to nothing."""
+    _span = NullSpan()
+
+    def span(self, name: str) -> NullSpan:
+        return self._span
+
+    def lap(self, name: str):
+        pass
+
+
+def profile_agent(agent, enabled: bool = None, final_section: str = 'control'):
+    """
+    Wraps get_output and retire of the agent when profiling is enabled, either by passing enabled=True
+    or by setting the DREAMMATE_PROFILE environment variable. Every get_output call is then timed as a tick,
+    and the report is printed when the agent retires. Returns the profiler for the agent to create spans with.
+    """
+    if enabled is None:
+        enabled = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, '0') not in ('', '0')
+    if not enabled:
+        return NullProfiler()
+
+    profiler = TickProfiler(getattr(agent, 'name', type(agent).__name__), final_section=final_section)
+    get_output = agent.get_output
+    retire = agent.retire
+
+    def profiled_get_output(packet):
+        profiler.start_tick()
+        try:
+            return get_output(packet)
+        finally:
+            profiler.end_tick()
+
+    def profiled_retire():
+        print(profiler.report())
+        retire()
+
+    agent.get_output = profiled_get_output
+    agent.retire = profiled_retire
+    return profiler
+
 
 def main():
     tick = TickMonitor()
@@ -0,0 +1,306 @@
+"""
+Records every tick of an agent (the GameTickPacket, the ball prediction, the controls the agent returned and the
+time get_output took) into a binary file of fixed-size records, so slow ticks and misplays can be replayed.
+
+The file starts with a header holding the record layout and the FieldInfoPacket of the match, followed by the
+records. Every record has the same size, so the records can be memory-mapped as one numpy structured array and
+the frame, game time and duration columns serve as the index of the file. Only the cars in the match are stored.
+
+Ball predictions go into a table of slices next to the recording (the same path with SLICES_SUFFIX), and a
+record only holds where its prediction starts in that table. A prediction is added to the table only when it
+changed: one that is the same as the last one costs nothing, and one that continues it (the same slices,
+shifted because time moved on) only adds the slices at its end. Replaying still hands the agent the exact
+prediction it saw.
+
+Set the DREAMMATE_RECORD environment variable to a directory to record every DreamMate agent, or record a single
+agent with record_agent(agent, path=...). Replay a recording with simulation.replay.Replayer.
+"""
+import ctypes
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction, Slice
+from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket, PlayerInfo
+
+# Set this environment variable to a directory to record the ticks of every DreamMate agent there
+RECORD_ENVIRONMENT_VARIABLE = 'DREAMMATE_RECORD'
+RECORDING_MAGIC = b'DMREC'
+RECORDING_VERSION = 2
+SLICES_SUFFIX = '.slices'
+
+CONTROLS_DTYPE = np.dtype([
+    ('throttle', np.float32), ('steer', np.float32), ('pitch', np.float32), ('yaw', np.float32),
+    ('roll', np.float32), ('jump', np.bool_), ('boost', np.bool_), ('handbrake', np.bool_),
+])
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S5'), ('version', '<u2'), ('num_cars', '<u2'), ('num_slices', '<u2'),
+    ('field_info', np.uint8, (ctypes.sizeof(FieldInfoPacket),)),
+])
+
+# Only the cars that are in the match are stored, everything after the car array is stored as a whole
+CAR_SIZE = ctypes.sizeof(PlayerInfo)
+PACKET_TAIL_OFFSET = GameTickPacket.num_cars.offset
+PACKET_TAIL_SIZE = ctypes.sizeof(GameTickPacket) - PACKET_TAIL_OFFSET
+SLICE_SIZE = ctypes.sizeof(Slice)
+# Slices of the same time are the same slice when the prediction did not change
+_SLICE_TIME = slice(Slice.game_seconds.offset, Slice.game_seconds.offset + 4)
+
+
+def record_dtype(num_cars: int) -> np.dtype:
+    return np.dtype([
+        ('frame', '<i4'), ('game_time', '<f4'), ('duration', '<f4'), ('controls', CONTROLS_DTYPE),
+        ('cars', np.uint8, (num_cars * CAR_SIZE,)), ('packet_tail', np.uint8, (PACKET_TAIL_SIZE,)),
+        ('slice_start', '<i4'), ('num_slices', '<i4'),
+    ])
+
+
+def _find_shift(last: np.ndarray, slices: np.ndarray) -> Optional[int]:
+    """The number of slices the prediction moved on since the last one, or None when it is not a continuation."""
+    if len(last) == 0 or len(slices) == 0:
+        return None
+    candidates = np.flatnonzero((last[:, _SLICE_TIME] == slices[0, _SLICE_TIME]).all(axis=1))
+    if len(candidates) == 0:
+        return None
+    shift = int(candidates[0])
+    overlap = min(len(last) - shift, len(slices))
+    if not np.array_equal(last[shift:shift + overlap], slices[:overlap]):
+        return None
+    return shift
+
+
+def controls_to_tuple(controls: SimpleControllerState):
+    return (controls.throttle, controls.steer, controls.pitch, controls.yaw, controls.roll,
+            controls.jump, controls.boost, controls.handbrake)
+
+
+def controls_from_record(controls) -> SimpleControllerState:
+    return SimpleControllerState(steer=float(controls['steer']), throttle=float(controls['throttle']),
+                                 pitch=float(controls['pitch']), yaw=float(controls['yaw']),
+                                 roll=float(controls['roll']), jump=bool(controls['jump']),
+                                 boost=bool(controls['boost']), handbrake=bool(controls['handbrake']))
+
+
+class PacketRecorder:
+    """
+    Appends ticks to a recording. Records are collected in a buffer and written every flush_interval ticks,
+    so recording costs a few copies per tick and no system call. The cars stored per record are num_cars, or
+    the cars in the first recorded packet when it is not given.
+    """
+
+    def __init__(self, path: str, field_info: Optional[FieldInfoPacket] = None, num_cars: int = None,
+                 num_slices: int = 360, flush_interval: int = 120):
+        self.path = path
+        self.field_info = field_info
+        self.num_cars = num_cars
+        self.num_slices = num_slices
+        self.flush_interval = flush_interval
+        self.dtype: Optional[np.dtype] = None
+        self.count = 0
+        self.slice_count = 0
+        self._buffer: Optional[np.ndarray] = None
+        self._buffered = 0
+        self._pending_slices: List[np.ndarray] = []
+        self._last_slices = np.empty((0, SLICE_SIZE), dtype=np.uint8)
+        self._last_start = 0
+        self._file = None
+        self._slice_file = None
+
+    def _open(self, num_cars: int):
+        self.num_cars = num_cars
+        self.dtype = record_dtype(num_cars)
+        self._buffer = np.zeros(self.flush_interval, dtype=self.dtype)
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = RECORDING_MAGIC
+        header['version'] = RECORDING_VERSION
+        header['num_cars'] = num_cars
+        header['num_slices'] = self.num_slices
+        if self.field_info is not None:
+            header['field_info'][0] = np.frombuffer(self.field_info, dtype=np.uint8)
+        self._file = open(self.path, 'wb')
+        self._file.write(header.tobytes())
+        self._slice_file = open(self.path + SLICES_SUFFIX, 'wb')
+
+    def record(self, packet: GameTickPacket, ball_prediction: Optional[BallPrediction],
+               controls: SimpleControllerState, duration: float):
+        if self._file is None:
+            self._open(packet.num_cars if self.num_cars is None else self.num_cars)
+        record = self._buffer[self._buffered]
+        record['frame'] = packet.game_info.frame_num
+        record['game_time'] = packet.game_info.seconds_elapsed
+        record['duration'] = duration
+        record['controls'] = controls_to_tuple(controls)
+
+        raw_packet = np.frombuffer(packet, dtype=np.uint8)
+        num_cars = min(packet.num_cars, self.num_cars)
+        record['cars'][:num_cars * CAR_SIZE] = raw_packet[:num_cars * CAR_SIZE]
+        record['cars'][num_cars * CAR_SIZE:] = 0
+        record['packet_tail'] = raw_packet[PACKET_TAIL_OFFSET:]
+        record['packet_tail'][:4] = np.frombuffer(np.int32(num_cars).tobytes(), dtype=np.uint8)
+        record['slice_start'], record['num_slices'] = self._store_slices(ball_prediction)
+
+        self._buffered += 1
+        self.count += 1
+        if self._buffered == len(self._buffer):
+            self.flush()
+
+    def _store_slices(self, ball_prediction: Optional[BallPrediction]) -> Tuple[int, int]:
+        if ball_prediction is None:
+            return self.slice_count, 0
+        num_slices = min(ball_prediction.num_slices, self.num_slices)
+        slices = np.frombuffer(ball_prediction.slices, dtype=np.uint8,
+                               count=num_slices * SLICE_SIZE).reshape(num_slices, SLICE_SIZE)
+        last = self._last_slices
+        shift = _find_shift(last, slices)
+        # New slices can only be appended to the last prediction when it ends the table
+        if shift is None or self._last_start + len(last) != self.slice_count:
+            start, new_slices = self.slice_count, slices
+        else:
+            start, new_slices = self._last_start + shift, slices[len(last) - shift:]
+        if len(new_slices) > 0:
+            self._pending_slices.append(new_slices.copy())
+            self.slice_count += len(new_slices)
+        if shift != 0 or len(new_slices) > 0:
+            self._last_slices = slices.copy()
+            self._last_start = start
+        return start, num_slices
+
+    def flush(self):
+        if self._file is None:
+            return
+        if self._buffered:
+            self._file.write(self._buffer[:self._buffered].tobytes())
+            self._buffered = 0
+        if self._pending_slices:
+            self._slice_file.write(np.concatenate(self._pending_slices).tobytes())
+            self._pending_slices.clear()
+        self._file.flush()
+        self._slice_file.flush()
+
+    def close(self):
+        if self._file is None:
+            # Nothing was recorded, still leave a valid recording behind
+            self._open(self.num_cars or 0)
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            self._slice_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Recording:
+    """Read access to a recording. The records are memory-mapped, so opening a long recording is instant."""
+
+    def __init__(self, path: str):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != RECORDING_MAGIC:
+            raise ValueError(f'{path} is not a recording')
+        if header['version'][0] != RECORDING_VERSION:
+            raise ValueError(f'{path} has version {header["version"][0]}, expected {RECORDING_VERSION}')
+        self.num_cars = int(header['num_cars'][0])
+        self.num_slices = int(header['num_slices'][0])
+        self.dtype = record_dtype(self.num_cars)
+        self.field_info = FieldInfoPacket.from_buffer_copy(header['field_info'][0].tobytes())
+
+        size = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // self.dtype.itemsize
+        if size > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=HEADER_DTYPE.itemsize, shape=(size,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self.frames: np.ndarray = self.records['frame']
+        self.game_times: np.ndarray = self.records['game_time']
+        self.durations: np.ndarray = self.records['duration']
+        self.controls: np.ndarray = self.records['controls']
+
+        slice_path = path + SLICES_SUFFIX
+        num_rows = os.path.getsize(slice_path) // SLICE_SIZE if os.path.exists(slice_path) else 0
+        if num_rows > 0:
+            self.slices = np.memmap(slice_path, dtype=np.uint8, mode='r', shape=(num_rows, SLICE_SIZE))
+        else:
+            self.slices = np.zeros((0, SLICE_SIZE), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.records)
+
+    def packet(self, index: int) -> GameTickPacket:
+        record = self.records[index]
+        packet = GameTickPacket()
+        raw_packet = np.frombuffer(packet, dtype=np.uint8)
+        raw_packet[:len(record['cars'])] = record['cars']
+        raw_packet[PACKET_TAIL_OFFSET:] = record['packet_tail']
+        return packet
+
+    def ball_prediction(self, index: int) -> BallPrediction:
+        record = self.records[index]
+        prediction = BallPrediction()
+        start, num_slices = int(record['slice_start']), int(record['num_slices'])
+        prediction.num_slices = num_slices
+        raw_slices = np.frombuffer(prediction.slices, dtype=np.uint8, count=num_slices * SLICE_SIZE)
+        raw_slices[:] = self.slices[start:start + num_slices].reshape(-1)
+        return prediction
+
+    def controls_at(self, index: int) -> SimpleControllerState:
+        return controls_from_record(self.controls[index])
+
+    def find_frame(self, frame: int) -> Optional[int]:
+        """Index of the record of the given frame number, frames are recorded in increasing order."""
+        index = int(np.searchsorted(self.frames, frame))
+        if index < len(self) and self.frames[index] == frame:
+            return index
+        return None
+
+    def slowest(self, count: int = 5) -> np.ndarray:
+        """Indices of the slowest ticks, slowest first."""
+        return np.argsort(self.durations)[::-1][:count]
+
+
+def record_agent(agent, path: str = None, enabled: bool = None) -> Optional[str]:
+    """
+    Wraps get_output and retire of the agent when recording is enabled, either by passing a path or by setting
+    the DREAMMATE_RECORD environment variable to a directory. Every tick is then recorded together with the
+    ball prediction of that tick. The recorder is created on the first tick, when the field info is available,
+    so the path of the recording is returned.
+    """
+    directory = os.environ.get(RECORD_ENVIRONMENT_VARIABLE, '')
+    if enabled is None:
+        enabled = path is not None or directory != ''
+    if not enabled:
+        return None
+    if path is None:
+        name = getattr(agent, 'name', type(agent).__name__)
+        path = os.path.join(directory or '.', f'{name}-{time.strftime("%Y%m%d-%H%M%S")}.dmrec')
+
+    # Imported here to keep tools.recording free of the agent side of the bot
+    from util.prediction_cache import get_ball_prediction
+    get_output = agent.get_output
+    retire = agent.retire
+    recorder = None
+
+    def recorded_get_output(packet):
+        nonlocal recorder
+        start = time.perf_counter()
+        controls = get_output(packet)
+        duration = time.perf_counter() - start
+        if recorder is None:
+            recorder = PacketRecorder(path, agent.get_field_info())
+        prediction = get_ball_prediction(agent, packet)
+        recorder.record(packet, prediction.view.ball_prediction, controls, duration)
+        return controls
+
+    def recorded_retire():
+        if recorder is not None:
+            recorder.close()
+        retire()
+
+    agent.get_output = recorded_get_output
+    agent.retire = recorded_retire
+    return path
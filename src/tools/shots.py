@@ -0,0 +1,108 @@
+"""
+Shot selection over the whole ball prediction at once. find_shot and clamp2D of tools.helper work on one ball
+location; the functions here do the same for every slice in a few array operations, so the planner can look at
+all of them within a tick and pick the slice the car reaches in time with the best angle on goal.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from tools.drive_model import DriveModel, get_drive_model
+from tools.helper import BALL_RADIUS, SHOT_SIDE_ADJUSTMENT
+from util.ball_prediction_analysis import BallPredictionView
+from util.vec import Vec3, Vec3Array
+
+UP = Vec3(0, 0, 1)
+DOWN = Vec3(0, 0, -1)
+
+# Only slices this low can be hit from the ground
+MAX_SHOT_HEIGHT = 200
+# Seconds the car may arrive late and still count as reaching the ball
+ARRIVAL_SLACK = 0.05
+# Seconds a shot may take longer for every radian less the car has to correct its approach
+ANGLE_WEIGHT = 0.5
+
+
+def clamp2D_many(directions: Vec3Array, starts: Vec3Array, ends: Vec3Array) -> Vec3Array:
+    """clamp2D for every row: the direction when it lies between start and end, otherwise the closer of both."""
+    is_right = directions.dot(ends.cross(DOWN)) < 0
+    is_left = directions.dot(starts.cross(DOWN)) > 0
+    narrow = ends.dot(starts.cross(DOWN)) > 0
+    inside = np.where(narrow, is_left & is_right, is_left | is_right)
+    closer_end = starts.dot(directions) < ends.dot(directions)
+    result = np.where(closer_end[:, None], ends.data, starts.data)
+    return Vec3Array(np.where(inside[:, None], directions.data, result))
+
+
+def find_shots(target_a: Vec3, target_b: Vec3, ball_locations: Vec3Array, car_location: Vec3) -> Vec3Array:
+    """find_shot for every ball location, with the same fallbacks where find_shot catches an error."""
+    return _find_shots(target_a, target_b, ball_locations, car_location)[0]
+
+
+def _find_shots(target_a: Vec3, target_b: Vec3, ball_locations: Vec3Array, car_location: Vec3):
+    # Also returns the angles between the way the car comes in and the way it should hit the ball
+    car_to_ball = ball_locations - car_location
+    car_to_ball_direction = car_to_ball.normalized()
+    direction_of_approach = clamp2D_many(car_to_ball_direction,
+                                         (-(ball_locations - target_a)).normalized(),
+                                         (-(ball_locations - target_b)).normalized())
+    offset_ball_locations = ball_locations - direction_of_approach * BALL_RADIUS
+
+    side = np.where(car_to_ball.dot(direction_of_approach.cross(UP)) < 0, -1.0, 1.0)
+    perpendicular = car_to_ball.cross(np.outer(side, (UP.x, UP.y, UP.z)))
+    perpendicular_length = perpendicular.length()
+    flat = car_to_ball.flat()
+    flat_approach = direction_of_approach.flat()
+    valid = (perpendicular_length > 0) & (flat.length() > 0) & (flat_approach.length() > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        angles = np.abs(flat.ang_to(flat_approach))
+        final_targets = offset_ball_locations + perpendicular.normalized() * (angles * SHOT_SIDE_ADJUSTMENT)
+    data = np.where(valid[:, None], final_targets.data, offset_ball_locations.data)
+    # find_shot aims at the ball itself when the car is inside it
+    data = np.where((car_to_ball.length() > 0)[:, None], data, ball_locations.data)
+    return Vec3Array(data), np.where(valid, angles, 0)
+
+
+@dataclass
+class ShotPlan:
+    index: int
+    time: float
+    ball_location: Vec3
+    target: Vec3
+    arrival_time: float
+    angle: float
+
+
+def plan_shot(view: BallPredictionView, game_time: float, car_location: Vec3, car_forward: Vec3, car_speed: float,
+              target_a: Vec3, target_b: Vec3, boost: bool = False,
+              drive_model: DriveModel = None) -> Optional[ShotPlan]:
+    """
+    Looks at every future slice low enough to hit: the approach target of find_shot, how long driving to the
+    ball takes according to the drive model, and the angle between the direction the car comes from and the
+    direction it should hit the ball in (the angle find_shot corrects for). Of the slices the car reaches in
+    time, returns the one with the lowest travel time plus ANGLE_WEIGHT times the angle, or None when the car
+    reaches none of them.
+    """
+    drive_model = drive_model or get_drive_model()
+    times = view.times.astype(np.float64) - game_time
+    candidates = np.flatnonzero((times > 0) & (view.locations[:, 2] < MAX_SHOT_HEIGHT))
+    if len(candidates) == 0:
+        return None
+    ball_locations = Vec3Array(view.locations[candidates])
+    targets, angles = _find_shots(target_a, target_b, ball_locations, car_location)
+    arrival_times = drive_model.arrival_time(car_location, car_forward, car_speed, ball_locations.data, boost)
+    reachable = arrival_times <= times[candidates] + ARRIVAL_SLACK
+    if not reachable.any():
+        return None
+
+    scores = np.where(reachable, arrival_times + ANGLE_WEIGHT * angles, np.inf)
+    best = int(np.argmin(scores))
+    return ShotPlan(
+        index=int(candidates[best]),
+        time=float(view.times[candidates[best]]),
+        ball_location=ball_locations[best],
+        target=targets[best],
+        arrival_time=float(arrival_times[best]),
+        angle=float(angles[best]),
+    )
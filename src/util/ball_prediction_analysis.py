@@ -1,15 +1,77 @@
-from typing import Callable
+from typing import Callable, Optional, Tuple, Union
 
+import numpy as np
 from rlbot.utils.structures.ball_prediction_struct import BallPrediction, Slice
 
 # field length(5120) + ball radius(93) = 5213 however that results in false positives
 GOAL_THRESHOLD = 5235
 
-# We will jump this number of frames when looking for a moment where the ball is inside the goal.
+# Suggested search_increment for find_matching_slice when looking for a moment where the ball is inside the goal.
 # Big number for efficiency, but not so big that the ball could go in and then back out during that
 # time span. Unit is the number of frames in the ball prediction, and the prediction is at 60 frames per second.
+# predict_future_goal itself checks every slice at once using the BallPredictionView.
 GOAL_SEARCH_INCREMENT = 20
 
+# Memory layout of a single Slice: Physics(location, rotation, velocity, angular_velocity) followed by game_seconds,
+# all of them 32 bit floats. Rotation is stored as pitch, yaw, roll.
+SLICE_DTYPE = np.dtype([
+    ('location', np.float32, (3,)),
+    ('rotation', np.float32, (3,)),
+    ('velocity', np.float32, (3,)),
+    ('angular_velocity', np.float32, (3,)),
+    ('game_seconds', np.float32),
+])
+
+
+class BallPredictionView:
+    """
+    Exposes the slices of a BallPrediction struct as numpy arrays without copying them. The arrays point
+    directly into the memory of the ctypes struct, so the view keeps a reference to the struct to keep it alive.
+    Build it once per tick right after `self.get_ball_prediction_struct()` and pass it to everything that
+    searches the prediction, instead of walking `ball_prediction.slices[i].physics.location` in Python.
+
+    Every array has one row per slice: times is (N,), the vector arrays are (N, 3) float32.
+    """
+
+    def __init__(self, ball_prediction: BallPrediction):
+        self.ball_prediction = ball_prediction
+        self.num_slices = ball_prediction.num_slices
+        self.slices = np.frombuffer(ball_prediction.slices, dtype=SLICE_DTYPE, count=self.num_slices)
+        self.times: np.ndarray = self.slices['game_seconds']
+        self.locations: np.ndarray = self.slices['location']
+        self.rotations: np.ndarray = self.slices['rotation']
+        self.velocities: np.ndarray = self.slices['velocity']
+        self.angular_velocities: np.ndarray = self.slices['angular_velocity']
+
+    def __len__(self):
+        return self.num_slices
+
+    @property
+    def start_time(self) -> float:
+        if self.num_slices == 0:
+            return 0.0
+        return float(self.times[0])
+
+    def index_at_time(self, game_time: float) -> Optional[int]:
+        """The same lookup as find_slice_at_time, but returns the index of the slice instead of the slice."""
+        if self.num_slices == 0:
+            return None
+        approx_index = int((game_time - self.times[0]) * 60)  # We know that there are 60 slices per second.
+        if 0 <= approx_index < self.num_slices:
+            return approx_index
+        return None
+
+    def indices_at_times(self, game_times: np.ndarray) -> np.ndarray:
+        """Vectorized index_at_time. Times outside the prediction are clipped to the first or last slice."""
+        approx_indices = ((np.asarray(game_times) - self.start_time) * 60).astype(np.int64)
+        return np.clip(approx_indices, 0, max(self.num_slices - 1, 0))
+
+    def slice_at(self, index: Optional[int]) -> Optional[Slice]:
+        """Returns the original ctypes Slice at the index, so results can be handed to code expecting a Slice."""
+        if index is None:
+            return None
+        return self.ball_prediction.slices[index]
+
 
 def find_slice_at_time(ball_prediction: BallPrediction, game_time: float):
     """
@@ -23,13 +85,14 @@ def find_slice_at_time(ball_prediction: BallPrediction, game_time: float):
     return None
 
 
-def predict_future_goal(ball_prediction: BallPrediction):
+def predict_future_goal(ball_prediction: Union[BallPrediction, BallPredictionView]):
     """
     Analyzes the ball prediction to see if the ball will enter one of the goals. Only works on standard arenas.
     Will return the first ball slice which appears to be inside the goal, or None if it does not enter a goal.
     """
-    return find_matching_slice(ball_prediction, 0, lambda s: abs(s.physics.location.y) >= GOAL_THRESHOLD,
-                               search_increment=20)
+    view = as_view(ball_prediction)
+    index = find_first_index(np.abs(view.locations[:, 1]) >= GOAL_THRESHOLD)
+    return view.slice_at(index)
 
 
 def find_matching_slice(ball_prediction: BallPrediction, start_index: int, predicate: Callable[[Slice], bool],
@@ -46,3 +109,125 @@ def find_matching_slice(ball_prediction: BallPrediction, start_index: int, predi
                 if predicate(ball_slice):
                     return ball_slice
     return None
+
+
+def as_view(ball_prediction: Union[BallPrediction, BallPredictionView]) -> BallPredictionView:
+    """Lets functions accept both the raw struct and an already built view."""
+    if isinstance(ball_prediction, BallPredictionView):
+        return ball_prediction
+    return BallPredictionView(ball_prediction)
+
+
+def find_first_index(mask: np.ndarray, start_index: int = 0) -> Optional[int]:
+    """
+    Returns the first index at or after start_index where the boolean mask holds, or None. The mask usually
+    comes from a comparison on one of the BallPredictionView arrays, e.g. `view.locations[:, 2] < 200`.
+    """
+    if start_index < 0:
+        start_index = 0
+    sub_mask = mask[start_index:]
+    index = int(np.argmax(sub_mask)) if len(sub_mask) > 0 else 0
+    if len(sub_mask) == 0 or not sub_mask[index]:
+        return None
+    return start_index + index
+
+
+def find_crossing(values: np.ndarray, threshold: float, start_index: int = 0) -> Optional[int]:
+    """
+    Returns the first index after start_index where the values are on the other side of the threshold
+    than they were at start_index. Touching the threshold counts as crossing it.
+    """
+    if start_index >= len(values):
+        return None
+    if values[start_index] > threshold:
+        return find_first_index(values <= threshold, start_index + 1)
+    return find_first_index(values >= threshold, start_index + 1)
+
+
+def find_height_crossing(view: BallPredictionView, height: float, start_index: int = 0) -> Optional[int]:
+    """First slice where the ball passes the given height, e.g. the moment it falls below 200 uu."""
+    return find_crossing(view.locations[:, 2], height, start_index)
+
+
+def find_y_crossing(view: BallPredictionView, y: float, start_index: int = 0) -> Optional[int]:
+    """First slice where the ball passes the given y coordinate, e.g. a goal line or the midfield line."""
+    return find_crossing(view.locations[:, 1], y, start_index)
+
+
+def find_plane_crossing(view: BallPredictionView, point, normal, start_index: int = 0) -> Optional[int]:
+    """
+    First slice where the ball passes the plane through point with the given normal. Both can be a Vec3,
+    a flatbuffer vector or anything with three components.
+    """
+    point = _as_array(point)
+    normal = _as_array(normal)
+    distances = (view.locations - point) @ normal
+    return find_crossing(distances, 0, start_index)
+
+
+def find_first_in_box(view: BallPredictionView, box_p, box_n, start_index: int = 0) -> Optional[int]:
+    """First slice where the ball is inside the axis aligned box between the corners box_p and box_n."""
+    box_p = _as_array(box_p)
+    box_n = _as_array(box_n)
+    inside = np.all((view.locations <= box_p) & (view.locations >= box_n), axis=1)
+    return find_first_index(inside, start_index)
+
+
+def find_crossing_time(view: BallPredictionView, values: np.ndarray, threshold: float,
+                       index: Optional[int]) -> Optional[float]:
+    """
+    Refines a crossing index found with find_crossing to the game time at which the values actually reach the
+    threshold, by linear interpolation between the slice before the crossing and the crossing slice.
+    """
+    if index is None:
+        return None
+    if index == 0:
+        return float(view.times[0])
+    value_a, value_b = float(values[index - 1]), float(values[index])
+    time_a, time_b = float(view.times[index - 1]), float(view.times[index])
+    if value_a == value_b:
+        return time_b
+    ratio = (threshold - value_a) / (value_b - value_a)
+    return time_a + (time_b - time_a) * min(max(ratio, 0.0), 1.0)
+
+
+def interpolate_slice(view: BallPredictionView, game_time: float,
+                      hermite: bool = True) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Returns the (location, velocity) of the ball at game_time, in between the 1/60 s slices. Hermite
+    interpolation uses the slice velocities as tangents which follows the ballistic curve closely, linear
+    interpolation is cheaper and does not overshoot around bounces. Returns None outside the prediction.
+    """
+    if view.num_slices == 0:
+        return None
+    times = view.times
+    if not times[0] <= game_time <= times[-1]:
+        return None
+    index = min(int(np.searchsorted(times, game_time, side='right')) - 1, view.num_slices - 2)
+    if index < 0:
+        return view.locations[0].astype(np.float64), view.velocities[0].astype(np.float64)
+    delta_time = float(times[index + 1] - times[index])
+    p0 = view.locations[index].astype(np.float64)
+    p1 = view.locations[index + 1].astype(np.float64)
+    v0 = view.velocities[index].astype(np.float64)
+    v1 = view.velocities[index + 1].astype(np.float64)
+    if delta_time <= 0:
+        return p0, v0
+    s = (game_time - float(times[index])) / delta_time
+
+    if not hermite:
+        return p0 + (p1 - p0) * s, v0 + (v1 - v0) * s
+
+    s2 = s * s
+    s3 = s2 * s
+    location = ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * delta_time * v0
+                + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * delta_time * v1)
+    velocity = ((6 * s2 - 6 * s) * (p0 - p1) / delta_time
+                + (3 * s2 - 4 * s + 1) * v0 + (3 * s2 - 2 * s) * v1)
+    return location, velocity
+
+
+def _as_array(vector) -> np.ndarray:
+    if hasattr(vector, 'x'):
+        return np.array((vector.x, vector.y, vector.z), dtype=np.float64)
+    return np.asarray(vector, dtype=np.float64)
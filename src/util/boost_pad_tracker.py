@@ -1,11 +1,25 @@
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket
 
 from util.vec import Vec3
 
 
+# Seconds until a pad becomes active again after being picked up
+FULL_BOOST_RESPAWN_TIME = 10
+SMALL_BOOST_RESPAWN_TIME = 4
+
+# Memory layout of BoostPadState in the GameTickPacket: a bool followed by a float, padded to 8 bytes
+BOOST_PAD_STATE_DTYPE = np.dtype({
+    'names': ['is_active', 'timer'],
+    'formats': [np.bool_, np.float32],
+    'offsets': [0, 4],
+    'itemsize': 8,
+})
+
+
 @dataclass
 class BoostPad:
     location: Vec3
@@ -13,31 +27,182 @@ class BoostPad:
     is_active: bool  # Active means it's available to be picked up
     timer: float  # Counts the number of seconds that the pad has been *inactive*
 
+    @property
+    def respawn_duration(self) -> float:
+        return FULL_BOOST_RESPAWN_TIME if self.is_full_boost else SMALL_BOOST_RESPAWN_TIME
+
+
+@dataclass
+class BoostPadEvent:
+    pad: BoostPad
+    index: int  # Of the pad in boost_pads
+    picked_up: bool  # True when the pad was picked up, False when it respawned
+    game_time: float
+    respawn_time: float  # Predicted game time at which the pad is active again
+
+
+class BoostPadGrid:
+    """
+    Static spatial index over the boost pad locations. The arena layout never changes during a match, so the
+    pads are bucketed once into square cells on the ground plane and queries only look at the overlapping cells.
+    """
+
+    def __init__(self, locations: np.ndarray, cell_size: float = 2048):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], np.ndarray] = {}
+        cell_indices = np.floor(locations[:, :2] / cell_size).astype(np.int64)
+        for cell in set(map(tuple, cell_indices.tolist())):
+            in_cell = np.all(cell_indices == cell, axis=1)
+            self.cells[cell] = np.flatnonzero(in_cell)
+        if self.cells:
+            self.min_cell = tuple(cell_indices.min(axis=0).tolist())
+            self.max_cell = tuple(cell_indices.max(axis=0).tolist())
+        else:
+            # No cell is in range of any query
+            self.min_cell, self.max_cell = (0, 0), (-1, -1)
+
+    def query_box(self, corner_a, corner_b) -> np.ndarray:
+        """Returns the sorted indices of the pads in all cells overlapping the box between two xy corners."""
+        min_x, max_x = sorted((corner_a[0], corner_b[0]))
+        min_y, max_y = sorted((corner_a[1], corner_b[1]))
+        min_cell_x, max_cell_x = int(min_x // self.cell_size), int(max_x // self.cell_size)
+        min_cell_y, max_cell_y = int(min_y // self.cell_size), int(max_y // self.cell_size)
+        # Only the cells in range are looked up; a box far larger than the field is clamped to the occupied cells
+        min_cell_x, max_cell_x = max(min_cell_x, self.min_cell[0]), min(max_cell_x, self.max_cell[0])
+        min_cell_y, max_cell_y = max(min_cell_y, self.min_cell[1]), min(max_cell_y, self.max_cell[1])
+        found = [self.cells[cell] for cell in ((x, y) for x in range(min_cell_x, max_cell_x + 1)
+                                               for y in range(min_cell_y, max_cell_y + 1))
+                 if cell in self.cells]
+        if len(found) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
 
 class BoostPadTracker:
     """
     This class merges together the boost pad location info with the is_active info so you can access it
     in one convenient list. For it to function correctly, you need to call initialize_boosts once when the
     game has started, and then update_boost_status every frame so that it knows which pads are active.
+
+    The pad locations and states are kept in numpy arrays (indexed the same as boost_pads) with a spatial
+    index, which the find_* queries use to select pads without looping over all of them. Every frame the state
+    is copied into the BoostPad objects only for the pads that changed or are inactive. After every update,
+    events holds the pads that were picked up or respawned during that frame, so planners only need to
+    recompute when something changed.
     """
 
     def __init__(self):
         self.boost_pads: List[BoostPad] = []
         self._full_boosts_only: List[BoostPad] = []
 
+        self.locations = np.empty((0, 3))
+        self.is_full_boost = np.empty(0, dtype=bool)
+        self.is_active = np.empty(0, dtype=bool)
+        self.timers = np.empty(0, dtype=np.float32)
+        self.events: List[BoostPadEvent] = []
+        self._was_active = np.empty(0, dtype=bool)
+        self._has_status = False
+        self.grid = BoostPadGrid(self.locations)
+        self._full_boost_indices = np.empty(0, dtype=np.int64)
+        self._respawn_durations = np.empty(0)
+
     def initialize_boosts(self, game_info: FieldInfoPacket):
         raw_boosts = [game_info.boost_pads[i] for i in range(game_info.num_boosts)]
-        self.boost_pads: List[BoostPad] = [BoostPad(Vec3(rb.location), rb.is_full_boost, False, 0) for rb in raw_boosts]
+        self.boost_pads: List[BoostPad] = [BoostPad(Vec3(rb.location), rb.is_full_boost, False, 0)
+                                           for rb in raw_boosts]
         # Cache the list of full boosts since they're commonly requested.
         # They reference the same objects in the boost_pads list.
         self._full_boosts_only: List[BoostPad] = [bp for bp in self.boost_pads if bp.is_full_boost]
 
+        self.locations = np.array([(bp.location.x, bp.location.y, bp.location.z) for bp in self.boost_pads],
+                                  dtype=np.float64).reshape(-1, 3)
+        self.is_full_boost = np.array([bp.is_full_boost for bp in self.boost_pads], dtype=bool)
+        self.is_active = np.zeros(len(self.boost_pads), dtype=bool)
+        self.timers = np.zeros(len(self.boost_pads), dtype=np.float32)
+        self.events: List[BoostPadEvent] = []
+        self._was_active = np.zeros(len(self.boost_pads), dtype=bool)
+        self._has_status = False
+        self.grid = BoostPadGrid(self.locations)
+        self._full_boost_indices = np.flatnonzero(self.is_full_boost)
+        self._respawn_durations = np.where(self.is_full_boost, FULL_BOOST_RESPAWN_TIME, SMALL_BOOST_RESPAWN_TIME)
+
     def update_boost_status(self, packet: GameTickPacket):
-        for i in range(packet.num_boost):
-            our_pad = self.boost_pads[i]
-            packet_pad = packet.game_boosts[i]
-            our_pad.is_active = packet_pad.is_active
-            our_pad.timer = packet_pad.timer
+        num_boost = min(packet.num_boost, len(self.boost_pads))
+        states = np.frombuffer(packet.game_boosts, dtype=BOOST_PAD_STATE_DTYPE, count=num_boost)
+        np.copyto(self._was_active, self.is_active)
+        self.is_active[:num_boost] = states['is_active']
+        self.timers[:num_boost] = states['timer']
+
+        self.events.clear()
+        if not self._has_status:
+            # Everything would look like a change on the first frame
+            self._has_status = True
+            self._sync_pads(range(num_boost))
+            return
+        changed = np.flatnonzero(self._was_active != self.is_active)
+        # Only the timers of inactive pads run, active pads keep theirs at 0
+        self._sync_pads(np.union1d(changed, np.flatnonzero(~self.is_active[:num_boost])).tolist())
+        if len(changed) == 0:
+            return
+        game_time = packet.game_info.seconds_elapsed
+        for index in changed.tolist():
+            picked_up = not bool(self.is_active[index])
+            respawn_time = self.respawn_time(index, game_time) if picked_up else game_time
+            self.events.append(BoostPadEvent(self.boost_pads[index], index, picked_up, game_time, respawn_time))
+
+    def _sync_pads(self, indices):
+        # Copies the state of the arrays into the BoostPad objects, for the pads that can have changed
+        for index in indices:
+            pad = self.boost_pads[index]
+            pad.is_active = bool(self.is_active[index])
+            pad.timer = float(self.timers[index])
+
+    def respawn_time(self, index: int, game_time: float) -> float:
+        """Predicted game time at which the pad is active again, using how long it has been inactive."""
+        if self.is_active[index]:
+            return game_time
+        return game_time + max(float(self._respawn_durations[index] - self.timers[index]), 0.0)
+
+    def respawn_times(self, game_time: float) -> np.ndarray:
+        """respawn_time for all pads at once."""
+        remaining = np.maximum(self._respawn_durations - self.timers, 0)
+        return game_time + np.where(self.is_active, 0, remaining)
 
     def get_full_boosts(self) -> List[BoostPad]:
         return self._full_boosts_only
+
+    def find_pads_in_ellipse(self, focus_a: Vec3, focus_b: Vec3, max_distance: float,
+                             full_boost_bonus: float = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Finds the active pads for which the detour via the pad, distance to focus_a plus distance to focus_b,
+        is at most max_distance. Full boosts may take a detour that is full_boost_bonus longer.
+        Returns the pad indices in boost_pads order together with both distances of each pad.
+        """
+        # Every point of the ellipse is within half the maximum detour of the center
+        radius = (max_distance + max(full_boost_bonus, 0)) / 2
+        center_x, center_y = (focus_a.x + focus_b.x) / 2, (focus_a.y + focus_b.y) / 2
+        candidates = self.grid.query_box((center_x - radius, center_y - radius),
+                                         (center_x + radius, center_y + radius))
+        candidates = candidates[self.is_active[candidates]]
+
+        locations = self.locations[candidates]
+        distances_a = _distances(locations, focus_a)
+        distances_b = _distances(locations, focus_b)
+        bonus = np.where(self.is_full_boost[candidates], full_boost_bonus, 0)
+        in_ellipse = distances_a + (distances_b - bonus) <= max_distance
+        return candidates[in_ellipse], distances_a[in_ellipse], distances_b[in_ellipse]
+
+    def find_nearest_full_boost(self, location: Vec3) -> Optional[BoostPad]:
+        """Returns the closest active full boost pad, or None when all of them are taken."""
+        active = self._full_boost_indices[self.is_active[self._full_boost_indices]]
+        if len(active) == 0:
+            return None
+        nearest = active[np.argmin(_distances(self.locations[active], location))]
+        return self.boost_pads[nearest]
+
+
+def _distances(locations: np.ndarray, location: Vec3) -> np.ndarray:
+    dx = locations[:, 0] - location.x
+    dy = locations[:, 1] - location.y
+    dz = locations[:, 2] - location.z
+    return np.sqrt(dx * dx + dy * dy + dz * dz)
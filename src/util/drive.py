@@ -19,7 +19,10 @@ def limit_to_safe_range(value: float) -> float:
     return value
 
 
-def steer_toward_target(car: PlayerInfo, target: Vec3) -> float:
-    relative = relative_location(Vec3(car.physics.location), Orientation(car.physics.rotation), target)
+def steer_toward_target(car: PlayerInfo, target: Vec3, orientation: Orientation = None) -> float:
+    """Pass the orientation of the car when it is already known, to avoid computing it again."""
+    if orientation is None:
+        orientation = Orientation(car.physics.rotation)
+    relative = relative_location(Vec3(car.physics.location), orientation, target)
     angle = math.atan2(relative.y, relative.x)
     return limit_to_safe_range(angle * 5)
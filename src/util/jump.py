@@ -0,0 +1,144 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+TICK_RATE = 120
+TICK = 1 / TICK_RATE
+
+JUMP_FORCE = 291.667
+# Extra acceleration while the jump button is held
+JUMP_HOLD_ACCELERATION = JUMP_FORCE * 5
+GRAVITY = -650
+# Pulls the car to the ground during the first ticks of a jump
+STICKY_ACCELERATION = GRAVITY * 0.5
+STICKY_TICKS = 7
+# The jump button counts as held for at least this many ticks, and at most MAX_HOLD_TICKS
+MIN_HOLD_TICKS = 3
+MAX_HOLD_TICKS = 24
+
+WHEEL_FORCE = -GRAVITY
+WHEEL_HEIGHT = 13
+# Ticks simulated after the jump button is released
+LANDING_TICKS = 200
+
+MIN_POSITION = -100
+MIN_VELOCITY = -400
+MIN_ACCELERATION = -1000
+
+
+@dataclass(frozen=True)
+class JumpTrajectory:
+    """
+    Height, vertical velocity and vertical acceleration of the car relative to the moment the jump starts, one
+    value per tick. Index 0 is the tick before the jump, so every array has one more value than the ticks
+    simulated. The arrays are shared by everyone asking for the same hold time and are read only.
+    """
+    hold_ticks: int
+    positions: np.ndarray
+    velocities: np.ndarray
+    accelerations: np.ndarray
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def ticks(self) -> np.ndarray:
+        return np.arange(len(self.positions))
+
+
+# Keyed by hold ticks and length, a hold time between two ticks holds as long as the next tick but lands sooner
+_trajectory_cache: Dict[Tuple[int, int], JumpTrajectory] = {}
+
+
+def _hold_limit(hold_time: float) -> float:
+    # The button is held during every tick below this, so a fraction of a tick is held for a whole tick
+    return min(hold_time * TICK_RATE + 1, MAX_HOLD_TICKS)
+
+
+def hold_ticks_for(hold_time: float) -> int:
+    """The number of ticks the jump button is held for, rounded up to whole ticks and limited like the game does."""
+    return math.ceil(_hold_limit(hold_time))
+
+
+def trajectory_length(hold_ticks: int) -> int:
+    return LANDING_TICKS + 2 * hold_ticks + 1
+
+
+def trajectory_length_for(hold_time: float) -> int:
+    """The length of the trajectory for hold_time seconds, landing is simulated from twice the unrounded hold."""
+    return LANDING_TICKS + int(2 * _hold_limit(hold_time)) + 1
+
+
+def wheel_behaviour(positions: np.ndarray, velocities: np.ndarray) -> np.ndarray:
+    """How strongly the suspension pushes back, grows the lower and the faster the car falls."""
+    wheel_velocity = 1 - velocities * 0.08
+    wheel_position = positions * 2.5 - 1
+    return np.maximum(wheel_velocity - wheel_position, 0)
+
+
+def simulate_jumps(hold_ticks: Sequence[int]) -> np.ndarray:
+    """
+    Simulates one jump per hold time at once, returning an array of shape (3, jumps, ticks + 1) with the
+    positions, velocities and accelerations. Every jump runs as long as the one held the longest; the ticks
+    are integrated one after another, but each tick only costs a few array operations for the whole batch.
+    """
+    hold_ticks = np.asarray(hold_ticks, dtype=np.int64)
+    steps = trajectory_length(int(hold_ticks.max())) - 1
+    result = np.zeros((3, len(hold_ticks), steps + 1))
+    position = np.zeros(len(hold_ticks))
+    velocity = np.zeros(len(hold_ticks))
+    holding_until = np.maximum(hold_ticks, MIN_HOLD_TICKS)
+
+    for t in range(steps):
+        velocity_previous = velocity.copy()
+
+        if t == 0:
+            velocity += JUMP_FORCE
+        velocity += np.where(t < holding_until, JUMP_HOLD_ACCELERATION * TICK, 0)
+        if t < STICKY_TICKS:
+            velocity += STICKY_ACCELERATION * TICK
+        elif t > STICKY_TICKS:
+            # First wheel touches the ground
+            touching = position <= WHEEL_HEIGHT
+            velocity += np.where(touching, WHEEL_FORCE * wheel_behaviour(position, velocity) * TICK, 0)
+            # All wheels touch the ground, the suspension takes half the speed away
+            landed = (position < -1) & (velocity < 0)
+            velocity = np.where(landed, velocity * 0.5, velocity)
+
+        velocity += GRAVITY * TICK
+        position += velocity * TICK
+        acceleration = (velocity - velocity_previous) / TICK
+
+        np.maximum(position, MIN_POSITION, out=position)
+        np.maximum(velocity, MIN_VELOCITY, out=velocity)
+        result[0, :, t + 1] = position
+        result[1, :, t + 1] = velocity
+        result[2, :, t + 1] = np.maximum(acceleration, MIN_ACCELERATION)
+    return result
+
+
+def jump_trajectories(hold_times: Sequence[float]) -> List[JumpTrajectory]:
+    """The trajectories for many hold times (in seconds), only simulating the ones not cached yet."""
+    keys = [(hold_ticks_for(hold_time), trajectory_length_for(hold_time)) for hold_time in hold_times]
+    missing = sorted(set(keys) - _trajectory_cache.keys())
+    if missing:
+        # A trajectory is never longer than trajectory_length of its hold ticks, which is what gets simulated
+        positions, velocities, accelerations = simulate_jumps([ticks for ticks, _ in missing])
+        for row, (ticks, length) in enumerate(missing):
+            arrays = [values[row, :length].copy() for values in (positions, velocities, accelerations)]
+            for array in arrays:
+                array.setflags(write=False)
+            _trajectory_cache[ticks, length] = JumpTrajectory(ticks, *arrays)
+    return [_trajectory_cache[key] for key in keys]
+
+
+def jump_trajectory(hold_time: float) -> JumpTrajectory:
+    """The trajectory of a jump holding the button for hold_time seconds, simulated once per hold time."""
+    return jump_trajectories([hold_time])[0]
+
+
+def clear_jump_cache():
+    """Forgets all trajectories, for tests and benchmarks that need to measure the simulation itself."""
+    _trajectory_cache.clear()
@@ -0,0 +1,118 @@
+"""
+Lookup table of jump heights and vertical speeds for every hold time, so decisions can ask how high a jump gets
+(or how long to hold jump to reach a height) without simulating the jump.
+
+The table is generated offline from the jump model in util.jump and stored next to this module. Run
+`python -m util.jump_table` from the src directory after changing the jump model to write it again.
+"""
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+from util.jump import MAX_HOLD_TICKS, TICK_RATE, simulate_jumps, trajectory_length
+
+JUMP_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'jump_table.npz')
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class JumpTable:
+    """
+    Height and vertical speed (relative to the start of the jump) indexed by hold ticks and ticks since the
+    jump started. Times in between ticks are interpolated linearly, after the end of a trajectory the car is
+    on the ground and the last values are repeated.
+    """
+
+    def __init__(self, heights: np.ndarray, velocities: np.ndarray):
+        # Row 0 holds for 1 tick, row i for i + 1 ticks
+        self.heights = heights
+        self.velocities = velocities
+
+    @property
+    def max_hold_ticks(self) -> int:
+        return len(self.heights)
+
+    @property
+    def duration(self) -> float:
+        """Seconds covered by the table."""
+        return (self.heights.shape[1] - 1) / TICK_RATE
+
+    def _row(self, hold_ticks: ArrayLike) -> np.ndarray:
+        return np.clip(np.asarray(hold_ticks, dtype=np.int64), 1, self.max_hold_ticks) - 1
+
+    def _sample(self, table: np.ndarray, hold_ticks: ArrayLike, time: ArrayLike) -> ArrayLike:
+        tick = np.clip(np.asarray(time, dtype=float) * TICK_RATE, 0, table.shape[1] - 1)
+        low = np.minimum(tick.astype(np.int64), table.shape[1] - 2)
+        fraction = tick - low
+        row = self._row(hold_ticks)
+        result = table[row, low] * (1 - fraction) + table[row, low + 1] * fraction
+        return float(result) if np.ndim(result) == 0 else result
+
+    def height(self, hold_ticks: ArrayLike, time: ArrayLike) -> ArrayLike:
+        """Height above the start of the jump, time seconds after the jump started. Works on arrays as well."""
+        return self._sample(self.heights, hold_ticks, time)
+
+    def vertical_speed(self, hold_ticks: ArrayLike, time: ArrayLike) -> ArrayLike:
+        return self._sample(self.velocities, hold_ticks, time)
+
+    def max_height(self, hold_ticks: int) -> float:
+        return float(self.heights[self._row(hold_ticks)].max())
+
+    def hold_for_height(self, height: float, time: float) -> Optional[float]:
+        """
+        The hold time in seconds that puts the car at height time seconds after the jump started, interpolated
+        between the hold ticks around it. Returns None when no jump is at that height by then. When even the
+        shortest jump is higher, the shortest hold time is returned.
+        """
+        heights = self.height(np.arange(1, self.max_hold_ticks + 1), np.full(self.max_hold_ticks, time))
+        reaching = np.flatnonzero(heights >= height)
+        if len(reaching) == 0:
+            return None
+        row = int(reaching[0])
+        if row == 0:
+            return 0.0
+        lower, upper = heights[row - 1], heights[row]
+        fraction = (height - lower) / (upper - lower)
+        # Row i holds for i + 1 ticks, which any hold time above i - 1 ticks up to i ticks does, so the hold time
+        # never falls short of the height (see util.jump.hold_ticks_for)
+        return (row - 1 + fraction) / TICK_RATE
+
+
+def build_jump_table() -> JumpTable:
+    hold_ticks = np.arange(1, MAX_HOLD_TICKS + 1)
+    positions, velocities, _ = simulate_jumps(hold_ticks)
+    # Every jump is simulated as long as the longest one, so shorter ones already rest on the ground at the end
+    for row, ticks in enumerate(hold_ticks):
+        length = trajectory_length(int(ticks))
+        positions[row, length:] = positions[row, length - 1]
+        velocities[row, length:] = velocities[row, length - 1]
+    return JumpTable(positions.astype(np.float32), velocities.astype(np.float32))
+
+
+def save_jump_table(table: JumpTable, path: str = JUMP_TABLE_PATH):
+    np.savez_compressed(path, heights=table.heights, velocities=table.velocities)
+
+
+def load_jump_table(path: str = JUMP_TABLE_PATH) -> JumpTable:
+    """Loads the stored table, or builds it when it was not generated yet."""
+    if not os.path.exists(path):
+        return build_jump_table()
+    with np.load(path) as data:
+        return JumpTable(data['heights'], data['velocities'])
+
+
+_jump_table: Optional[JumpTable] = None
+
+
+def get_jump_table() -> JumpTable:
+    """The table shared by all agents, loaded the first time it is needed."""
+    global _jump_table
+    if _jump_table is None:
+        _jump_table = load_jump_table()
+    return _jump_table
+
+
+if __name__ == '__main__':
+    save_jump_table(build_jump_table())
+    print(f'Saved the jump table to {JUMP_TABLE_PATH}')
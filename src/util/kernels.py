@@ -0,0 +1,79 @@
+"""
+Geometry kernels on plain floats. Vec3 creates an object for every intermediate result, which dominates the
+cost of small functions that are called every tick, like find_shot. These kernels take and return floats (or
+one tuple at the end) and do the same floating point operations in the same order as the Vec3 versions, so
+the Vec3 level functions that delegate to them return exactly the same results.
+
+Vectors are passed as their x, y and z components. Where Vec3 would raise ZeroDivisionError, the kernels
+return None instead, so callers can branch without exceptions. Squares are written as x ** 2 like in Vec3,
+for some values pow rounds differently than x * x.
+"""
+import math
+from typing import Optional, Tuple
+
+Vector = Tuple[float, float, float]
+
+
+def normalize(x: float, y: float, z: float) -> Optional[Vector]:
+    """Same as Vec3.normalized, or None for a vector with a length of zero."""
+    length = math.sqrt(x ** 2 + y ** 2 + z ** 2)
+    if length == 0:
+        return None
+    scale = 1 / length
+    return x * scale, y * scale, z * scale
+
+
+def clamp2d_index(dx: float, dy: float, dz: float, sx: float, sy: float, sz: float,
+                  ex: float, ey: float, ez: float) -> int:
+    """
+    The decision of clamp2D: 0 when the direction d lies between start s and end e (seen from above),
+    otherwise 1 for start or 2 for end, whichever is closer to the direction.
+    """
+    # direction.dot(end.cross(Vec3(0, 0, -1))) with the zero terms left out
+    is_right = dy * ex - dx * ey < 0
+    is_left = dy * sx - dx * sy > 0
+    if ey * sx - ex * sy > 0:
+        if is_left and is_right:
+            return 0
+    elif is_left or is_right:
+        return 0
+    if sx * dx + sy * dy + sz * dz < ex * dx + ey * dy + ez * dz:
+        return 2
+    return 1
+
+
+def shot_target(ax: float, ay: float, az: float, bx: float, by: float, bz: float,
+                ball_x: float, ball_y: float, ball_z: float,
+                car_x: float, car_y: float, car_z: float, ball_radius: float, side_adjustment: float) -> Vector:
+    """
+    The target of find_shot: the point behind the ball (seen from between targets a and b) the car should drive
+    to, moved sideways the further the car has to turn to come in from that direction.
+    """
+    cx, cy, cz = ball_x - car_x, ball_y - car_y, ball_z - car_z
+    direction = normalize(cx, cy, cz)
+    if direction is None:
+        return ball_x, ball_y, ball_z
+    left = normalize(ax - ball_x, ay - ball_y, az - ball_z)
+    right = normalize(bx - ball_x, by - ball_y, bz - ball_z)
+    if left is None or right is None:
+        # Vec3 raises on these as well, find_shot does not catch it there
+        raise ZeroDivisionError('float division by zero')
+    approach = (direction, left, right)[clamp2d_index(*direction, *left, *right)]
+    px, py, pz = approach
+    offset_x, offset_y, offset_z = ball_x - px * ball_radius, ball_y - py * ball_radius, ball_z - pz * ball_radius
+
+    # The side of the approach direction the car is on, the car moves to the other side
+    side = -1 if cx * py - cy * px < 0 else 1
+    perpendicular = normalize(cy * side, -cx * side, 0.0)
+    if perpendicular is None:
+        return offset_x, offset_y, offset_z
+    # The angle between both directions flattened onto the ground
+    lengths = math.sqrt(cx ** 2 + cy ** 2) * math.sqrt(px ** 2 + py ** 2)
+    if lengths == 0:
+        return offset_x, offset_y, offset_z
+    cos_angle = (cx * px + cy * py) / lengths
+    if not -1 <= cos_angle <= 1:
+        return offset_x, offset_y, offset_z
+    adjustment = abs(math.acos(cos_angle)) * side_adjustment
+    return (offset_x + perpendicular[0] * adjustment, offset_y + perpendicular[1] * adjustment,
+            offset_z + perpendicular[2] * adjustment)
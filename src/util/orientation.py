@@ -1,6 +1,9 @@
 import math
+from typing import Dict, Tuple, Union
 
-from util.vec import Vec3
+import numpy as np
+
+from util.vec import Vec3, Vec3Array
 
 
 # This is a helper class for calculating directions relative to your car. You can extend it or delete if you want.
@@ -26,6 +29,62 @@ class Orientation:
         self.forward = Vec3(cp * cy, cp * sy, sp)
         self.right = Vec3(cy*sp*sr-cr*sy, sy*sp*sr+cr*cy, -cp*sr)
         self.up = Vec3(-cr*cy*sp-sr*sy, -cr*sy*sp+sr*cy, cp*cr)
+        self._matrix = None
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The rotation matrix with forward, right and up as rows. It maps world directions to local ones."""
+        if self._matrix is None:
+            self._matrix = np.array([
+                (self.forward.x, self.forward.y, self.forward.z),
+                (self.right.x, self.right.y, self.right.z),
+                (self.up.x, self.up.y, self.up.z),
+            ])
+        return self._matrix
+
+    def to_local(self, points: Union[Vec3, Vec3Array, np.ndarray], center: Vec3 = None):
+        """
+        Same as relative_location, for many points in one call. Returns the same type that was given:
+        a Vec3 for a Vec3, otherwise a Vec3Array with x forward, y right and z up.
+        """
+        if isinstance(points, Vec3):
+            return relative_location(center if center is not None else Vec3(), self, points)
+        data = Vec3Array(points).data
+        if center is not None:
+            data = data - (center.x, center.y, center.z)
+        return Vec3Array(data @ self.matrix.T)
+
+    def to_world(self, points: Union[Vec3, Vec3Array, np.ndarray], center: Vec3 = None):
+        """The inverse of to_local: turns locations relative to center back into world locations."""
+        if isinstance(points, Vec3):
+            world = self.forward * points.x + self.right * points.y + self.up * points.z
+            return world + center if center is not None else world
+        data = Vec3Array(points).data @ self.matrix
+        if center is not None:
+            data += (center.x, center.y, center.z)
+        return Vec3Array(data)
+
+
+# Orientations computed this tick, per car index
+_orientation_cache: Dict[int, Tuple[float, Orientation]] = {}
+
+
+def get_orientation(car, index: int, game_time: float) -> Orientation:
+    """
+    Returns the Orientation of the car, computing it only once per car per tick. Every function that needs the
+    orientation of the same car during the same tick receives the same object.
+    """
+    cached = _orientation_cache.get(index)
+    if cached is not None and cached[0] == game_time:
+        return cached[1]
+    orientation = Orientation(car.physics.rotation)
+    _orientation_cache[index] = (game_time, orientation)
+    return orientation
+
+
+def clear_orientation_cache():
+    """Forgets every cached orientation, needed when the game clock starts over (e.g. in a new simulation)."""
+    _orientation_cache.clear()
 
 
 # Sometimes things are easier, when everything is seen from your point of view.
@@ -41,7 +100,11 @@ def relative_location(center: Vec3, ori: Orientation, target: Vec3) -> Vec3:
     * y: how far right
     * z: how far above
     """
-    x = (target - center).dot(ori.forward)
-    y = (target - center).dot(ori.right)
-    z = (target - center).dot(ori.up)
+    dx = target.x - center.x
+    dy = target.y - center.y
+    dz = target.z - center.z
+    forward, right, up = ori.forward, ori.right, ori.up
+    x = dx*forward.x + dy*forward.y + dz*forward.z
+    y = dx*right.x + dy*right.y + dz*right.z
+    z = dx*up.x + dy*up.y + dz*up.z
     return Vec3(x, y, z)
@@ -0,0 +1,112 @@
+import ctypes
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+from rlbot.agents.base_agent import BaseAgent
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction, Slice
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from util.ball_prediction_analysis import BallPredictionView
+
+BALL_RADIUS = 92.75
+# Height margin above the ball radius at which a slice still counts as touching the ground
+GROUND_CONTACT_MARGIN = 5
+
+
+class CachedPrediction:
+    """
+    One ball prediction together with the indexes derived from it. The derived indexes are computed the
+    first time they are requested and then shared by everything that uses this tick's prediction.
+    """
+
+    def __init__(self, ball_prediction: BallPrediction, game_time: float):
+        self.ball_prediction = ball_prediction
+        self.view = BallPredictionView(ball_prediction)
+        self.game_time = game_time
+        self._lowest_points: Dict[int, np.ndarray] = {}
+        self._ground_contacts: Optional[np.ndarray] = None
+
+    def index_at_time(self, game_time: float) -> Optional[int]:
+        return self.view.index_at_time(game_time)
+
+    def slice_at_time(self, game_time: float) -> Optional[Slice]:
+        """Same result as find_slice_at_time, without building the lookup again."""
+        return self.view.slice_at(self.view.index_at_time(game_time))
+
+    def lowest_points(self, window: int) -> np.ndarray:
+        """
+        Returns for every block of `window` slices the index of the slice where the ball is the lowest.
+        The last block can be shorter than the window.
+        """
+        if window not in self._lowest_points:
+            heights = self.view.locations[:, 2]
+            num_windows = -(-len(heights) // window)
+            padded = np.full(num_windows * window, np.inf, dtype=np.float32)
+            padded[:len(heights)] = heights
+            offsets = np.arange(num_windows) * window
+            self._lowest_points[window] = offsets + np.argmin(padded.reshape(num_windows, window), axis=1)
+        return self._lowest_points[window]
+
+    def ground_contacts(self) -> np.ndarray:
+        """Returns the indices of the slices in which the ball touches the ground (bounces or rolls)."""
+        if self._ground_contacts is None:
+            heights = self.view.locations[:, 2]
+            self._ground_contacts = np.flatnonzero(heights <= BALL_RADIUS + GROUND_CONTACT_MARGIN)
+        return self._ground_contacts
+
+
+def copy_ball_prediction(ball_prediction: BallPrediction) -> BallPrediction:
+    """Copies the slices in use into a new struct, one memmove instead of a copy per slice."""
+    result = BallPrediction()
+    result.num_slices = ball_prediction.num_slices
+    ctypes.memmove(result.slices, ball_prediction.slices, ctypes.sizeof(Slice) * ball_prediction.num_slices)
+    return result
+
+
+class BallPredictionCache:
+    """
+    Fetches the ball prediction at most once per game tick. The cache is keyed on the packet's game time,
+    so every agent running in the same interpreter that asks during the same tick gets the same prediction
+    and its derived indexes, instead of fetching the struct and recomputing them again.
+
+    The framework refills the struct of an agent in place on every fetch, so on a miss the slices are copied
+    into a struct owned by the cache. A CachedPrediction then stays valid after the tick, for warm starts or
+    comparisons, and no agent reads a struct that another agent's next fetch overwrites.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current: Optional[CachedPrediction] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, agent: BaseAgent, packet: GameTickPacket) -> CachedPrediction:
+        game_time = packet.game_info.seconds_elapsed
+        with self.lock:
+            if self.current is not None and self.current.game_time == game_time:
+                self.hits += 1
+                return self.current
+            self.misses += 1
+            self.current = CachedPrediction(copy_ball_prediction(agent.get_ball_prediction_struct()), game_time)
+            return self.current
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def reset(self):
+        with self.lock:
+            self.current = None
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every agent in this interpreter
+shared_prediction_cache = BallPredictionCache()
+
+
+def get_ball_prediction(agent: BaseAgent, packet: GameTickPacket) -> CachedPrediction:
+    return shared_prediction_cache.get(agent, packet)
@@ -1,6 +1,7 @@
 import math
-from typing import Union
+from typing import Iterable, Union
 
+import numpy as np
 from rlbot.utils.structures.game_data_struct import Vector3
 
 
@@ -110,3 +111,162 @@ class Vec3:
         """Returns the angle to the ideal vector. Angle will be between 0 and pi."""
         cos_ang = self.dot(ideal) / (self.length() * ideal.length())
         return math.acos(cos_ang)
+
+
+class Vec3Array:
+    """
+    A batch of vectors stored as one N x 3 float64 array. It offers the same operations as Vec3, but every
+    operation works on all vectors at once, which avoids creating a Vec3 object for every single calculation.
+    Create one from flatbuffer vectors or Vec3 objects like this:
+    `pad_locations = Vec3Array.from_vectors(pad.location for pad in pads)`.
+
+    Operations between two Vec3Arrays work row by row, a single Vec3 is applied to every row.
+    Results that have one value per vector (length, dot, dist, ang_to) are returned as plain numpy arrays.
+    """
+    __slots__ = [
+        'data'
+    ]
+    # Makes numpy hand `ndarray + Vec3Array` over to our reflected operators instead of broadcasting itself
+    __array_ufunc__ = None
+
+    def __init__(self, data: Union[np.ndarray, 'Vec3Array', Iterable]=()):
+        """
+        Create a new Vec3Array from anything numpy can turn into an N x 3 array. The data is copied
+        unless it already is a float64 numpy array. Examples:
+
+        a = Vec3Array([[1, 2, 3], [4, 5, 6]])
+
+        b = Vec3Array(np.zeros((10, 3)))
+        """
+        if isinstance(data, Vec3Array):
+            data = data.data
+        self.data = np.asarray(data, dtype=np.float64).reshape(-1, 3)
+
+    @classmethod
+    def from_vectors(cls, vectors: Iterable[Union[Vec3, Vector3]]) -> 'Vec3Array':
+        """Creates a Vec3Array from a sequence of Vec3 or flatbuffer Vector3 objects."""
+        data = [(v.x, v.y, v.z) for v in vectors]
+        return cls(np.array(data, dtype=np.float64).reshape(-1, 3))
+
+    @classmethod
+    def zeros(cls, size: int) -> 'Vec3Array':
+        return cls(np.zeros((size, 3)))
+
+    def to_vectors(self):
+        """Returns the rows of this array as a list of Vec3."""
+        return [Vec3(x, y, z) for x, y, z in self.data.tolist()]
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[:, 1]
+
+    @property
+    def z(self) -> np.ndarray:
+        return self.data[:, 2]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, item):
+        """Indexing with an integer returns a Vec3, anything else (slices, masks, index arrays) a Vec3Array."""
+        if isinstance(item, (int, np.integer)):
+            x, y, z = self.data[item].tolist()
+            return Vec3(x, y, z)
+        return Vec3Array(self.data[item])
+
+    def __iter__(self):
+        return iter(self.to_vectors())
+
+    def __add__(self, other) -> 'Vec3Array':
+        return Vec3Array(self.data + _as_rows(other))
+
+    def __radd__(self, other) -> 'Vec3Array':
+        return Vec3Array(_as_rows(other) + self.data)
+
+    def __sub__(self, other) -> 'Vec3Array':
+        return Vec3Array(self.data - _as_rows(other))
+
+    def __rsub__(self, other) -> 'Vec3Array':
+        return Vec3Array(_as_rows(other) - self.data)
+
+    def __neg__(self):
+        return Vec3Array(-self.data)
+
+    def __mul__(self, scale) -> 'Vec3Array':
+        return Vec3Array(self.data * _as_scale(scale))
+
+    def __rmul__(self, scale):
+        return self * scale
+
+    def __truediv__(self, scale) -> 'Vec3Array':
+        return Vec3Array(self.data / _as_scale(scale))
+
+    def __str__(self):
+        return f"Vec3Array({len(self)} vectors)"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return isinstance(other, Vec3Array) and np.array_equal(self.data, other.data)
+
+    def flat(self) -> 'Vec3Array':
+        """Returns the vectors projected onto the ground plane. I.e. where z=0."""
+        data = self.data.copy()
+        data[:, 2] = 0
+        return Vec3Array(data)
+
+    def length(self) -> np.ndarray:
+        """Returns the length of every vector."""
+        return np.sqrt(np.einsum('ij,ij->i', self.data, self.data))
+
+    def dist(self, other) -> np.ndarray:
+        """Returns the distance between every vector and the other vector(s)."""
+        return (self - other).length()
+
+    def normalized(self) -> 'Vec3Array':
+        """
+        Returns vectors with the same direction but a length of one. Unlike Vec3 this does not raise on
+        vectors with a length of zero, those rows stay zero instead.
+        """
+        length = self.length()[:, None]
+        return Vec3Array(np.divide(self.data, length, out=np.zeros_like(self.data), where=length > 0))
+
+    def rescale(self, new_len) -> 'Vec3Array':
+        """Returns vectors with the same direction but a different length."""
+        return self.normalized() * new_len
+
+    def dot(self, other) -> np.ndarray:
+        """Returns the dot product of every vector with the other vector(s)."""
+        other = np.broadcast_to(_as_rows(other), self.data.shape)
+        return np.einsum('ij,ij->i', self.data, other)
+
+    def cross(self, other) -> 'Vec3Array':
+        """Returns the cross product of every vector with the other vector(s)."""
+        return Vec3Array(np.cross(self.data, _as_rows(other)))
+
+    def ang_to(self, ideal) -> np.ndarray:
+        """Returns the angle of every vector to the ideal vector(s). Angles will be between 0 and pi."""
+        ideal = Vec3Array(np.broadcast_to(_as_rows(ideal), self.data.shape))
+        cos_ang = self.dot(ideal) / (self.length() * ideal.length())
+        return np.arccos(np.clip(cos_ang, -1, 1))
+
+
+def _as_rows(other) -> np.ndarray:
+    """Converts the other operand of a Vec3Array operation to something that broadcasts against N x 3."""
+    if isinstance(other, Vec3Array):
+        return other.data
+    if hasattr(other, 'x'):
+        return np.array((other.x, other.y, other.z), dtype=np.float64)
+    return np.asarray(other, dtype=np.float64)
+
+
+def _as_scale(scale) -> Union[float, np.ndarray]:
+    """Scales given per vector (a 1D array of N values) need an extra axis to apply to every component."""
+    if isinstance(scale, np.ndarray) and scale.ndim == 1:
+        return scale[:, None]
+    return scale
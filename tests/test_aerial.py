@@ -0,0 +1,162 @@
+import time
+from unittest import TestCase
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from simulation.packets import create_ball_prediction
+from simulation.physics import SimulatedBall
+from tools.aerial import solve_aerial_intercept, scan_aerial_slices, AerialSolver, BOOST_ACCELERATION, GRAVITY
+from tools.helper import solve_aerial_direction, solve_aerial_target
+from tools.performance import SolverBudget
+from util.ball_prediction_analysis import BallPredictionView
+from util.vec import Vec3
+
+# Thrown up from the center toward the orange goal
+THROWN_BALL = SimulatedBall(Vec3(0, 0, 100), Vec3(0, 1000, 1500))
+
+
+class TestSolveAerialIntercept(TestCase):
+    def assertIntercepts(self, target, target_velocity, car_location, car_velocity, solution):
+        t = solution.time
+        car = car_location + car_velocity * t + 0.5 * (solution.direction * BOOST_ACCELERATION + GRAVITY) * t ** 2
+        ball = target + target_velocity * t + 0.5 * GRAVITY * t ** 2
+        self.assertLess(car.dist(ball), 1)
+
+    def test_moving_ball(self):
+        target, target_velocity = Vec3(500, 2000, 800), Vec3(0, 600, 1500)
+        car_location, car_velocity = Vec3(0, -500, 17), Vec3(0, 800, 0)
+        solution = solve_aerial_intercept(target, target_velocity, car_location, car_velocity)
+        self.assertTrue(solution.converged)
+        self.assertAlmostEqual(solution.direction.length(), 1)
+        self.assertIntercepts(target, target_velocity, car_location, car_velocity, solution)
+
+    def test_straight_up(self):
+        solution = solve_aerial_intercept(Vec3(0, 0, 1500), Vec3(), Vec3(0, 0, 17), Vec3())
+        self.assertTrue(solution.converged)
+        self.assertTrue(solution.feasible)
+        self.assertAlmostEqual(solution.direction.z, 1)
+        self.assertIntercepts(Vec3(0, 0, 1500), Vec3(), Vec3(0, 0, 17), Vec3(), solution)
+
+    def test_approaching_ball(self):
+        # The ball flies toward the car: the quartic has three positive roots and the first one is the intercept
+        target, target_velocity = Vec3(1000, 0, 500), Vec3(-2000, 0, 0)
+        car_location, car_velocity = Vec3(0, 0, 500), Vec3()
+        solution = solve_aerial_intercept(target, target_velocity, car_location, car_velocity)
+        self.assertTrue(solution.converged)
+        self.assertTrue(solution.feasible)
+        self.assertAlmostEqual(solution.time, 0.450, places=3)
+        self.assertIntercepts(target, target_velocity, car_location, car_velocity, solution)
+
+    def test_feasibility(self):
+        solution = solve_aerial_intercept(Vec3(0, 0, 1500), Vec3(), Vec3(0, 0, 17), Vec3(), boost_amount=10)
+        self.assertFalse(solution.feasible)
+
+    def test_same_location(self):
+        solution = solve_aerial_intercept(Vec3(1, 2, 3), Vec3(), Vec3(1, 2, 3), Vec3())
+        self.assertEqual(solution.time, 0)
+
+
+class TestScanAerialSlices(TestCase):
+    def setUp(self) -> None:
+        self.view = BallPredictionView(create_ball_prediction(THROWN_BALL, 10.0))
+
+    def test_earliest_reachable(self):
+        car_location, car_velocity = Vec3(0, 0, 17), Vec3(0, 500, 500)
+        scan = scan_aerial_slices(self.view, car_location, car_velocity, 10)
+        self.assertIsNotNone(scan.index)
+        self.assertTrue(scan.reachable[scan.index])
+        self.assertFalse(scan.reachable[:scan.index].any())
+
+        # The scan agrees with the single target solver on the reachable slice
+        t = scan.times[scan.index]
+        target = Vec3(*self.view.locations[scan.index].tolist())
+        acceleration = 2 * (target - car_location - car_velocity * t) / t ** 2 - GRAVITY
+        self.assertAlmostEqual(acceleration.length(), scan.required_acceleration[scan.index], places=3)
+        self.assertLessEqual(acceleration.length(), BOOST_ACCELERATION)
+
+    def test_unreachable(self):
+        scan = scan_aerial_slices(self.view, Vec3(0, -4000, 17), Vec3(), 10, boost_amount=0)
+        self.assertIsNone(scan.index)
+        self.assertFalse(scan.reachable.any())
+        self.assertIsNotNone(scan.best_index())
+
+    def test_prediction_in_the_past(self):
+        scan = scan_aerial_slices(self.view, Vec3(), Vec3(), 100)
+        self.assertIsNone(scan.best_index())
+
+
+class TestSolverBudget(TestCase):
+    def test_iteration_budget(self):
+        target, target_velocity = Vec3(500, 2000, 800), Vec3(0, 600, 1500)
+        car_location, car_velocity = Vec3(0, -500, 17), Vec3(0, 800, 0)
+        solution = solve_aerial_intercept(target, target_velocity, car_location, car_velocity,
+                                          budget=SolverBudget(max_iterations=1))
+        self.assertEqual(solution.iterations, 1)
+        self.assertFalse(solution.converged)
+        self.assertGreater(solution.time, 0)
+
+    def test_expired_deadline(self):
+        # The budget always allows one iteration, even when the deadline has passed already
+        budget = SolverBudget(deadline=time.perf_counter() - 1)
+        result = solve_aerial_direction(Vec3(1000, 1000, 1000), Vec3(0, 0, 17), Vec3(0, 500, 0), budget)
+        self.assertEqual(result.iterations, 1)
+        self.assertFalse(result.converged)
+        result = solve_aerial_target(Vec3(1000, 1000, 1000), Vec3(), Vec3(0, 0, 17), Vec3(0, 500, 0), budget)
+        self.assertLessEqual(result.iterations, 1)
+
+    def test_zero_iterations(self):
+        # Zero is a limit, not the absence of one, only min_iterations still run
+        self.assertTrue(SolverBudget(max_iterations=0, min_iterations=0).exhausted(0))
+        result = solve_aerial_direction(Vec3(1500, 2000, 1200), Vec3(0, 0, 17), Vec3(0, 1000, 0),
+                                        SolverBudget(max_iterations=0))
+        self.assertEqual(result.iterations, 1)
+
+    def test_more_time_more_precision(self):
+        target, car_location, car_velocity = Vec3(1500, 2000, 1200), Vec3(0, 0, 17), Vec3(0, 1000, 0)
+        short = solve_aerial_direction(target, car_location, car_velocity, SolverBudget(max_iterations=5))
+        long = solve_aerial_direction(target, car_location, car_velocity, SolverBudget(max_iterations=200))
+        self.assertGreater(long.iterations, short.iterations)
+        self.assertTrue(long.converged)
+
+
+class TestAerialSolver(TestCase):
+    def setUp(self) -> None:
+        self.solver = AerialSolver()
+        self.packet = GameTickPacket()
+
+    def fly(self, ticks, start_time=0.0):
+        # Car and ball follow the solved trajectory, so every next solution continues the previous one
+        target, target_velocity = Vec3(500, 2000, 800), Vec3(0, 600, 1500)
+        car_location, car_velocity = Vec3(0, -500, 17), Vec3(0, 800, 0)
+        solution = None
+        for tick in range(ticks):
+            dt = 1 / 120
+            self.packet.game_info.seconds_elapsed = start_time + tick * dt
+            self.solver.update(self.packet)
+            solution = self.solver.solve(target, target_velocity, car_location, car_velocity)
+            acceleration = solution.direction * BOOST_ACCELERATION + GRAVITY
+            car_location += car_velocity * dt + 0.5 * acceleration * dt ** 2
+            car_velocity += acceleration * dt
+            target += target_velocity * dt + 0.5 * GRAVITY * dt ** 2
+            target_velocity += GRAVITY * dt
+        return solution
+
+    def test_warm_start(self):
+        self.fly(60)
+        self.assertEqual(self.solver.cold_solves, 1)
+        self.assertEqual(self.solver.warm_solves, 59)
+        self.assertLess(self.solver.warm_iterations / self.solver.warm_solves,
+                        self.solver.cold_iterations / self.solver.cold_solves)
+        self.assertGreater(self.solver.iterations_saved(), 0)
+
+    def test_invalidate_on_touch(self):
+        self.fly(10)
+        self.packet.game_ball.latest_touch.time_seconds = 1
+        self.fly(10, start_time=10 / 120)
+        self.assertEqual(self.solver.cold_solves, 2)
+
+    def test_invalidate_on_reset(self):
+        self.fly(10)
+        self.fly(10, start_time=5)
+        self.assertEqual(self.solver.cold_solves, 2)
+        self.assertGreaterEqual(self.solver.invalidations, 1)
@@ -0,0 +1,78 @@
+import threading
+from unittest import TestCase
+
+import numpy as np
+
+from gui.application import AppThread, SERIES_MESSAGE
+
+
+def drain(queue, count):
+    # The queue is fed by a background thread, so wait for the messages instead of checking empty()
+    messages = [queue.get(timeout=1) for _ in range(count)]
+    assert queue.empty()
+    return messages
+
+
+class TestAppRunnable(TestCase):
+    def setUp(self) -> None:
+        self.app = AppThread()
+
+    def tearDown(self) -> None:
+        self.app.ring.close()
+
+    def test_sample_and_flush(self):
+        app = self.app
+        app.sample('velocity', 1, 100)
+        app.sample('acceleration', 1, -5)
+        app.sample('velocity', 2, 110)
+        self.assertEqual(len(app.ring), 0)
+        app.flush()
+        app.flush()  # Nothing new to send
+
+        messages = drain(app.queue_in, 2)
+        self.assertEqual(messages, [(SERIES_MESSAGE, 0, 'velocity'), (SERIES_MESSAGE, 1, 'acceleration')])
+        self.assertTrue(np.array_equal(app.ring.read(), [[0, 1, 100], [1, 1, -5], [0, 2, 110]]))
+        self.assertEqual(app.dropped, 0)
+
+    def test_buffer_grows(self):
+        app = self.app
+        for x in range(1000):
+            app.sample('position', x, x * 2)
+        app.flush()
+        samples = app.ring.read()
+        self.assertEqual(samples.shape, (1000, 3))
+        self.assertTrue(np.array_equal(samples[:, 2], np.arange(1000) * 2))
+
+    def test_sample_many(self):
+        app = self.app
+        app.sample('velocity', 0, 0)
+        app.sample_many('prediction', [1, 2, 3], [4, 5, 6])
+        messages = drain(app.queue_in, 3)
+        self.assertEqual(messages[1], (SERIES_MESSAGE, 1, 'prediction'))
+        self.assertTrue(np.array_equal(messages[2], [[1, 1, 4], [1, 2, 5], [1, 3, 6]]))
+
+    def test_series_id_threads(self):
+        app = self.app
+        keys = [f'series {i}' for i in range(50)]
+        threads = [threading.Thread(target=lambda: [app.series_id(key) for key in keys]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Every key got its own id and was announced once
+        self.assertEqual(sorted(app.series_ids.values()), list(range(50)))
+        messages = drain(app.queue_in, 50)
+        self.assertEqual(sorted(message[1] for message in messages), list(range(50)))
+
+    def test_window_does_not_free_ring(self):
+        # The window closes its own attachment, the agent keeps writing to the memory until it stops
+        consumer = self.app.ring.consumer()
+        consumer.close()
+        self.app.sample('velocity', 1, 100)
+        self.app.flush()
+        self.assertEqual(len(self.app.ring), 1)
+        self.app.stop()
+        self.assertIsNone(self.app.ring.memory)
+        # Samples after stopping are discarded
+        self.app.sample('velocity', 2, 110)
+        self.app.flush()
@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+
+from util.ball_prediction_analysis import BallPredictionView, find_slice_at_time, find_first_index, \
+    find_height_crossing, find_y_crossing, find_plane_crossing, find_first_in_box, find_crossing_time, \
+    interpolate_slice, predict_future_goal, find_matching_slice
+from util.vec import Vec3
+
+
+def create_ball_prediction(start_time=10.0, num_slices=360):
+    # Ball thrown up from the center, falling without bounces
+    ball_prediction = BallPrediction()
+    ball_prediction.num_slices = num_slices
+    for i in range(num_slices):
+        t = i / 60
+        ball_slice = ball_prediction.slices[i]
+        ball_slice.game_seconds = start_time + t
+        ball_slice.physics.location.y = 1000 * t
+        ball_slice.physics.location.z = 100 + 1500 * t - 325 * t ** 2
+        ball_slice.physics.velocity.y = 1000
+        ball_slice.physics.velocity.z = 1500 - 650 * t
+    return ball_prediction
+
+
+class TestBallPredictionView(TestCase):
+    def setUp(self) -> None:
+        self.ball_prediction = create_ball_prediction()
+        self.view = BallPredictionView(self.ball_prediction)
+
+    def test_arrays(self):
+        self.assertEqual(len(self.view), 360)
+        self.assertEqual(self.view.locations.shape, (360, 3))
+        ball_slice = self.ball_prediction.slices[42]
+        self.assertEqual(self.view.times[42], ball_slice.game_seconds)
+        self.assertEqual(self.view.locations[42, 2], ball_slice.physics.location.z)
+        self.assertEqual(self.view.velocities[42, 1], ball_slice.physics.velocity.y)
+
+    def test_no_copy(self):
+        self.ball_prediction.slices[3].physics.location.x = 123
+        self.assertEqual(self.view.locations[3, 0], 123)
+
+    def test_index_at_time(self):
+        for game_time in (9.0, 10.0, 11.5, 15.99, 16.1):
+            expected = find_slice_at_time(self.ball_prediction, game_time)
+            self.assertIs(self.view.slice_at(self.view.index_at_time(game_time)) is None, expected is None)
+            if expected is not None:
+                self.assertEqual(self.view.slice_at(self.view.index_at_time(game_time)).game_seconds,
+                                 expected.game_seconds)
+
+
+class TestPredictionQueries(TestCase):
+    def setUp(self) -> None:
+        self.ball_prediction = create_ball_prediction()
+        self.view = BallPredictionView(self.ball_prediction)
+
+    def test_find_first_index(self):
+        heights = self.view.locations[:, 2]
+        index = find_first_index(heights > 1000)
+        expected = find_matching_slice(self.ball_prediction, 0, lambda s: s.physics.location.z > 1000)
+        self.assertEqual(self.view.times[index], expected.game_seconds)
+        self.assertIsNone(find_first_index(heights > 10000))
+        self.assertEqual(find_first_index(heights > 1000, 100), 100)
+
+    def test_height_crossing(self):
+        # Going up through 1000 first, then falling back through it
+        rising = find_height_crossing(self.view, 1000)
+        falling = find_height_crossing(self.view, 1000, rising)
+        self.assertLess(self.view.locations[rising - 1, 2], 1000)
+        self.assertGreaterEqual(self.view.locations[rising, 2], 1000)
+        self.assertLessEqual(self.view.locations[falling, 2], 1000)
+        crossing_time = find_crossing_time(self.view, self.view.locations[:, 2], 1000, falling)
+        self.assertLess(self.view.times[falling - 1], crossing_time)
+        self.assertLessEqual(crossing_time, self.view.times[falling])
+
+    def test_plane_crossing(self):
+        y_index = find_y_crossing(self.view, 3000)
+        plane_index = find_plane_crossing(self.view, Vec3(0, 3000, 0), Vec3(0, 1, 0))
+        self.assertEqual(y_index, plane_index)
+        self.assertEqual(y_index, 180)
+
+    def test_box(self):
+        index = find_first_in_box(self.view, Vec3(100, 2100, 2000), Vec3(-100, 2000, 0))
+        self.assertEqual(index, 120)
+        self.assertIsNone(find_first_in_box(self.view, Vec3(100, 100, 50), Vec3(-100, -100, 0)))
+
+    def test_interpolation(self):
+        game_time = 10.0 + 1.234
+        t = 1.234
+        location, velocity = interpolate_slice(self.view, game_time)
+        self.assertAlmostEqual(location[2], 100 + 1500 * t - 325 * t ** 2, places=1)
+        self.assertAlmostEqual(velocity[2], 1500 - 650 * t, places=1)
+        location, _ = interpolate_slice(self.view, game_time, hermite=False)
+        self.assertAlmostEqual(location[1], 1000 * t, places=1)
+        self.assertIsNone(interpolate_slice(self.view, 9.0))
+
+    def test_predict_future_goal(self):
+        ball_slice = predict_future_goal(self.ball_prediction)
+        self.assertGreaterEqual(ball_slice.physics.location.y, 5235)
+        self.assertLess(self.ball_prediction.slices[313].physics.location.y, 5235)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from tools.benchmark import BENCHMARKS, compare, load_baseline, save_baseline, run_benchmarks, measure
+
+
+class TestBenchmark(TestCase):
+    def test_every_benchmark_runs(self):
+        for case in BENCHMARKS:
+            with self.subTest(case.name):
+                case.setup()()
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(['clamp2D', 'find_shot'], repeat=1, min_time=0.001)
+        self.assertEqual(sorted(results), ['clamp2D', 'find_shot'])
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+    def test_measure(self):
+        calls = []
+        seconds = measure(lambda: calls.append(1), repeat=2, min_time=0.001)
+        self.assertGreater(seconds, 0)
+        self.assertGreater(len(calls), 2)
+
+    def test_compare(self):
+        baseline = {'a': 1.0, 'b': 1.0}
+        regressions = compare({'a': 1.2, 'b': 1.5, 'c': 9.0}, baseline, threshold=0.25)
+        self.assertEqual([regression.name for regression in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0].ratio, 1.5)
+
+    def test_baseline_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            self.assertEqual(load_baseline(path), {})
+            save_baseline({'a': 1.0}, path)
+            save_baseline({'b': 2.0}, path)
+            self.assertEqual(load_baseline(path), {'a': 1.0, 'b': 2.0})
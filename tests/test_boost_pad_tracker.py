@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import FieldInfoPacket, GameTickPacket
+
+from util.boost_pad_tracker import BoostPad, BoostPadGrid, BoostPadTracker
+from util.vec import Vec3
+
+
+def create_field_info():
+    # A 5 by 7 grid of pads, the corners are full boosts
+    field_info = FieldInfoPacket()
+    index = 0
+    for x in range(-2, 3):
+        for y in range(-3, 4):
+            pad = field_info.boost_pads[index]
+            pad.location.x, pad.location.y, pad.location.z = x * 1500, y * 1500, 70
+            pad.is_full_boost = abs(x) == 2 and abs(y) == 3
+            index += 1
+    field_info.num_boosts = index
+    return field_info
+
+
+def create_packet(num_boost, inactive=()):
+    packet = GameTickPacket()
+    packet.num_boost = num_boost
+    for i in range(num_boost):
+        packet.game_boosts[i].is_active = i not in inactive
+        packet.game_boosts[i].timer = 1.5 if i in inactive else 0
+    return packet
+
+
+class TestBoostPadTracker(TestCase):
+    def setUp(self) -> None:
+        self.tracker = BoostPadTracker()
+        self.tracker.initialize_boosts(create_field_info())
+        self.tracker.update_boost_status(create_packet(35, inactive=(17,)))
+
+    def test_arrays(self):
+        self.assertEqual(self.tracker.locations.shape, (35, 3))
+        self.assertEqual(self.tracker.is_full_boost.sum(), 4)
+        self.assertFalse(self.tracker.is_active[17])
+        self.assertFalse(self.tracker.boost_pads[17].is_active)
+
+    def test_pads(self):
+        self.assertEqual(self.tracker.boost_pads[17], BoostPad(Vec3(0, 0, 70), False, False, 1.5))
+        self.assertEqual(self.tracker.boost_pads[0], BoostPad(Vec3(-3000, -4500, 70), True, True, 0))
+        # Respawned pads and pads still waiting are updated
+        self.tracker.update_boost_status(create_packet(35, inactive=(0,)))
+        self.assertTrue(self.tracker.boost_pads[17].is_active)
+        self.assertEqual(self.tracker.boost_pads[17].timer, 0)
+        self.assertEqual(self.tracker.boost_pads[0].timer, 1.5)
+        self.assertIs(self.tracker.get_full_boosts()[0], self.tracker.boost_pads[0])
+
+    def test_find_pads_in_ellipse(self):
+        car, target = Vec3(0, -3000, 17), Vec3(0, 3000, 17)
+        indices, distances_car, distances_target = self.tracker.find_pads_in_ellipse(car, target, 6100)
+        locations = [self.tracker.boost_pads[i].location for i in indices]
+        # The middle column without the inactive center pad
+        self.assertEqual(locations, [Vec3(0, y * 1500, 70) for y in (-2, -1, 1, 2)])
+        for location, distance_car, distance_target in zip(locations, distances_car, distances_target):
+            self.assertAlmostEqual(location.dist(car), distance_car)
+            self.assertAlmostEqual(location.dist(target), distance_target)
+
+    def test_grid_query_box(self):
+        grid = BoostPadGrid(self.tracker.locations, cell_size=1000)
+        cells = np.floor(self.tracker.locations[:, :2] / 1000)
+        for corner_a, corner_b in (((-10, -10), (10, 10)), ((2900, -4600), (-100, 1600)), ((-1e6, -1e6), (1e6, 1e6)),
+                                   ((5000, 5000), (6000, 6000))):
+            low = np.floor(np.minimum(corner_a, corner_b) / 1000)
+            high = np.floor(np.maximum(corner_a, corner_b) / 1000)
+            expected = np.flatnonzero(np.all((cells >= low) & (cells <= high), axis=1))
+            self.assertEqual(grid.query_box(corner_a, corner_b).tolist(), expected.tolist())
+        self.assertEqual(len(BoostPadGrid(np.empty((0, 3))).query_box((0, 0), (1, 1))), 0)
+
+    def test_find_nearest_full_boost(self):
+        pad = self.tracker.find_nearest_full_boost(Vec3(2000, 3000, 17))
+        self.assertEqual(pad.location, Vec3(3000, 4500, 70))
+        self.tracker.update_boost_status(create_packet(35, inactive=(0, 6, 28, 34)))
+        self.assertIsNone(self.tracker.find_nearest_full_boost(Vec3()))
+
+    def test_events(self):
+        self.assertEqual(self.tracker.events, [])
+        packet = create_packet(35, inactive=(0, 5))
+        packet.game_info.seconds_elapsed = 20
+        self.tracker.update_boost_status(packet)
+        events = {event.index: event for event in self.tracker.events}
+        self.assertEqual(sorted(events), [0, 5, 17])
+        self.assertTrue(events[0].picked_up)
+        self.assertAlmostEqual(events[0].respawn_time, 20 + 10 - 1.5)  # Full boost
+        self.assertAlmostEqual(events[5].respawn_time, 20 + 4 - 1.5)
+        self.assertFalse(events[17].picked_up)
+        self.assertEqual(events[17].respawn_time, 20)
+
+        self.tracker.update_boost_status(packet)
+        self.assertEqual(self.tracker.events, [])
+        respawn_times = self.tracker.respawn_times(20)
+        self.assertAlmostEqual(respawn_times[0], 28.5)
+        self.assertEqual(respawn_times[1], 20)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+from rlbot.agents.base_agent import BaseAgent, SimpleControllerState
+
+from simulation.harness import SimulationHarness, create_agent
+from simulation.physics import max_curvature, throttle_acceleration
+from tools.drive_model import DriveModel, SPEED_KNOTS, fit_drive_model, recorded_car_states
+from tools.recording import PacketRecorder, Recording
+from util.vec import Vec3
+
+
+class Sprinter(BaseAgent):
+    # Full throttle for two seconds, then full throttle with boost
+    def get_output(self, packet):
+        boost = packet.game_info.seconds_elapsed > 12
+        return SimpleControllerState(throttle=1, boost=boost)
+
+
+class TestDriveModel(TestCase):
+    def setUp(self) -> None:
+        self.model = DriveModel()
+
+    def test_time_to_reach(self):
+        model = self.model
+        # From rest the throttle curve takes a bit over a second to 1000 uu/s, covering about 600 uu
+        self.assertAlmostEqual(model.throttle.time_to_reach(0, 0), 0)
+        time = model.time_to_reach(600, 0)
+        self.assertTrue(0.9 < time < 1.2)
+        self.assertLess(model.time_to_reach(600, 0, boost=True), time)
+        self.assertLess(model.time_to_reach(600, 1000), time)
+        # Above the top speed of the throttle the car keeps its speed
+        self.assertAlmostEqual(model.time_to_reach(2000, 2000), 1, places=6)
+        times = model.time_to_reach(np.array([100, 1000, 20000]), np.array([0, 500, 1400]))
+        self.assertTrue(np.all(np.diff(times) > 0))
+
+    def test_turning_radius(self):
+        self.assertAlmostEqual(self.model.turning_radius(1000), 1 / max_curvature(1000), delta=1)
+        self.assertAlmostEqual(self.model.turning_radius(1000, 0.5), 2 / max_curvature(1000), delta=2)
+        self.assertEqual(self.model.turning_radius(1000, 0), np.inf)
+
+    def test_arrival_time(self):
+        model = self.model
+        location, forward = Vec3(0, 0, 17), Vec3(0, 1, 0)
+        ahead, behind = model.arrival_time(location, forward, 1000, np.array([[0, 2000, 17], [0, -2000, 17]]))
+        self.assertLess(ahead, behind)
+        self.assertAlmostEqual(ahead, model.time_to_reach(2000, 1000))
+        self.assertEqual(model.arrival_time(location, forward, 1000, Vec3(0, 2000, 17)), ahead)
+        # Inside the turning circle the car has to go around the other way, which takes longer than a target
+        # further away that it can turn toward
+        inside, outside = model.arrival_time(location, forward, 1500, np.array([[300, 300, 17], [1500, 1500, 17]]))
+        self.assertGreater(inside, outside)
+
+    def test_fit_recording(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sprint.dmrec')
+            harness = SimulationHarness(create_agent(Sprinter))
+            harness.reset(car_boost=100)
+            with PacketRecorder(path) as recorder:
+                harness.run(480, recorder)
+            recording = Recording(path)
+            speeds, wheel_contact = recorded_car_states(recording)
+            self.assertTrue(wheel_contact.all())
+            self.assertGreater(speeds[-1], 1500)
+
+            fitted = fit_drive_model([recording], base=DriveModel(np.zeros(len(SPEED_KNOTS)),
+                                                                  np.zeros(len(SPEED_KNOTS))))
+            del recording, speeds, wheel_contact
+        # The knots the sprint passed are fitted to the simulated curve, the others keep the base
+        for knot in [250, 500, 750, 1000]:
+            self.assertAlmostEqual(fitted.acceleration(knot), throttle_acceleration(knot), delta=150)
+        self.assertAlmostEqual(fitted.boost_accelerations[SPEED_KNOTS.tolist().index(1800)], 991.667, delta=50)
+        self.assertEqual(fitted.acceleration(2300), 0)
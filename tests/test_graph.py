@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from gui.graph import expand_view
+
+
+class TestExpandView(TestCase):
+    def test_data_inside_view(self):
+        self.assertIsNone(expand_view((0, 10, -5, 5), (-1, 20), (-10, 10)))
+        self.assertIsNone(expand_view((0, 20, -10, 10), (0, 20), (-10, 10)))
+
+    def test_data_leaves_view(self):
+        x, y = expand_view((0, 100, -5, 5), (-1, 20), (-10, 10), headroom=0.5)
+        self.assertLess(x[0], 0)
+        self.assertGreaterEqual(x[1], 150)
+        self.assertLess(y[0], -5)
+        self.assertGreater(y[1], 5)
+        # The new view holds the data until it grows by the headroom again
+        self.assertIsNone(expand_view((0, 140, -5, 5), x, y))
+
+    def test_flat_line(self):
+        x, y = expand_view((0, 0, 3, 3), (1, 2), (1, 2))
+        self.assertLess(x[0], x[1])
+        self.assertLess(y[0], 3)
+        self.assertGreater(y[1], 3)
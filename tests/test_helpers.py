@@ -1,9 +1,44 @@
 from unittest import TestCase
 
-from tools.helper import clip_to_box
+import numpy as np
+
+from tools.helper import clamp2D, clip_to_box, find_shot, get_target_goal
 from util.vec import Vec3
 
 
+def vec3_clamp2D(direction: Vec3, start: Vec3, end: Vec3):
+    # clamp2D and find_shot as they were written on Vec3, the kernels have to give exactly the same results
+    is_right = direction.dot(end.cross(Vec3(0, 0, -1))) < 0
+    is_left = direction.dot(start.cross(Vec3(0, 0, -1))) > 0
+    if end.dot(start.cross(Vec3(0, 0, -1))) > 0:
+        if is_left and is_right:
+            return direction
+    else:
+        if is_left or is_right:
+            return direction
+    if start.dot(direction) < end.dot(direction):
+        return end
+    return start
+
+
+def vec3_find_shot(target_a: Vec3, target_b: Vec3, ball_location: Vec3, car_location: Vec3):
+    try:
+        car_to_ball = ball_location - car_location
+        car_to_ball_direction = car_to_ball.normalized()
+    except ZeroDivisionError:
+        return ball_location
+    direction_of_approach = vec3_clamp2D(car_to_ball_direction, (target_a - ball_location).normalized(),
+                                         (target_b - ball_location).normalized())
+    offset_ball_location = ball_location - (direction_of_approach * 92.75)
+    try:
+        side = -1 if (ball_location - car_location).dot(direction_of_approach.cross(Vec3(0, 0, 1))) < 0 else 1
+        car_to_ball_perpendicular = car_to_ball.cross(Vec3(0, 0, side)).normalized()
+        adjustment = abs(car_to_ball.flat().ang_to(direction_of_approach.flat())) * 2560
+        return offset_ball_location + (car_to_ball_perpendicular * adjustment)
+    except (ZeroDivisionError, ValueError):
+        return offset_ball_location
+
+
 class Test(TestCase):
     def test_vec3_a(self):
         self.assertEqual(Vec3(), Vec3())
@@ -28,3 +63,22 @@ class Test(TestCase):
 
         result = clip_to_box(Vec3(30, -30, -10), mid_p, mid_n)
         self.assertEqual(Vec3(10, -20, 0), result)
+
+    def test_clamp2D_matches_vec3(self):
+        random = np.random.default_rng(0)
+        for _ in range(2000):
+            direction, start, end = (Vec3(*random.normal(size=3)) for _ in range(3))
+            self.assertIs(clamp2D(direction, start, end), vec3_clamp2D(direction, start, end))
+
+    def test_find_shot_matches_vec3(self):
+        random = np.random.default_rng(0)
+        goal_a, goal_b = get_target_goal(1)
+        for i in range(2000):
+            ball = Vec3(*random.uniform((-4000, -5000, 93), (4000, 5000, 1500)))
+            car = Vec3(*random.uniform((-4000, -5000, 17), (4000, 5000, 300)))
+            if i % 10 == 0:
+                # Right below the ball, and inside of it
+                car = Vec3(ball.x, ball.y, car.z) if i % 20 == 0 else Vec3(ball)
+            result = find_shot(goal_a, goal_b, ball, car)
+            expected = vec3_find_shot(goal_a, goal_b, ball, car)
+            self.assertEqual((result.x, result.y, result.z), (expected.x, expected.y, expected.z))
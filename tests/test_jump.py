@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+import numpy as np
+
+from util.jump import MAX_HOLD_TICKS, clear_jump_cache, hold_ticks_for, jump_trajectories, jump_trajectory, \
+    simulate_jumps, trajectory_length, trajectory_length_for
+
+
+def reference_jump(hold_time):
+    # The per tick loop the jump model replaced, kept as the reference the arrays have to match
+    increment = 1 / 120
+    jump_force = 291.667
+    gravity = -650
+    hold_ticks = hold_time * 120 + 1
+    if hold_ticks > 0.2 * 120:
+        hold_ticks = 0.2 * 120
+    position = velocity = 0
+    positions, velocities, accelerations = [0], [0], [0]
+    for t in range(200 + int(hold_ticks * 2)):
+        velocity_previous = velocity
+        if t == 0:
+            velocity += jump_force
+        if t < 3 or t < hold_ticks:
+            velocity += jump_force * 5 * increment
+        if t < 7:
+            velocity += gravity * 0.5 * increment
+        if position <= 13 and t > 7:
+            wheel = max(1 - velocity * 0.08 - (position * 2.5 - 1), 0)
+            velocity += -gravity * wheel * increment
+        if position < -1 and t > 7 and velocity < 0:
+            velocity += -velocity / increment / 2 * increment
+        velocity += gravity * increment
+        position += velocity * increment
+        acceleration = (velocity - velocity_previous) / increment
+        position = max(position, -100)
+        acceleration = max(acceleration, -1000)
+        velocity = max(velocity, -400)
+        positions.append(position)
+        velocities.append(velocity)
+        accelerations.append(acceleration)
+    return np.array([positions, velocities, accelerations])
+
+
+class TestJump(TestCase):
+    def setUp(self) -> None:
+        clear_jump_cache()
+
+    def test_matches_reference(self):
+        # Hold times between two ticks are held for the next whole tick but land after twice the exact hold
+        for hold_time in [0.0, 1 / 60, 0.1, 0.104, 0.105, 0.2, 0.5]:
+            trajectory = jump_trajectory(hold_time)
+            expected = reference_jump(hold_time)
+            self.assertEqual(len(trajectory), expected.shape[1])
+            self.assertTrue(np.allclose(trajectory.positions, expected[0]))
+            self.assertTrue(np.allclose(trajectory.velocities, expected[1]))
+            self.assertTrue(np.allclose(trajectory.accelerations, expected[2]))
+
+    def test_batch_matches_single(self):
+        batch = simulate_jumps([1, 12, MAX_HOLD_TICKS])
+        for row, hold_ticks in enumerate([1, 12, MAX_HOLD_TICKS]):
+            single = simulate_jumps([hold_ticks])[:, 0]
+            length = trajectory_length(hold_ticks)
+            self.assertTrue(np.allclose(batch[:, row, :length], single[:, :length]))
+
+    def test_hold_ticks(self):
+        self.assertEqual(hold_ticks_for(0), 1)
+        self.assertEqual(hold_ticks_for(0.1), 13)
+        self.assertEqual(trajectory_length_for(0.1), 227)
+        self.assertEqual(hold_ticks_for(0.104), 14)
+        self.assertEqual(trajectory_length_for(0.104), 227)
+        self.assertEqual(hold_ticks_for(0.2), MAX_HOLD_TICKS)
+        self.assertEqual(trajectory_length_for(0.2), 249)
+        self.assertEqual(hold_ticks_for(0.5), MAX_HOLD_TICKS)
+
+    def test_cache(self):
+        short, long, same = jump_trajectories([0.05, 0.2, 0.05])
+        self.assertIs(short, same)
+        # Held for the same ticks, but the longer hold lands a tick later
+        earlier, later = jump_trajectories([0.104, 0.105])
+        self.assertEqual(earlier.hold_ticks, later.hold_ticks)
+        self.assertEqual(len(later), len(earlier) + 1)
+        self.assertIs(jump_trajectory(0.2), long)
+        self.assertFalse(short.positions.flags.writeable)
+        # Holding longer jumps higher
+        self.assertGreater(long.positions.max(), short.positions.max())
+        # The car is back on the ground at the end
+        self.assertLess(abs(long.positions[-1]), 5)
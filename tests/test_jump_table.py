@@ -0,0 +1,51 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from util.jump import hold_ticks_for, jump_trajectory
+from util.jump_table import build_jump_table, get_jump_table, load_jump_table, save_jump_table
+
+
+class TestJumpTable(TestCase):
+    def setUp(self) -> None:
+        self.table = get_jump_table()
+
+    def test_matches_trajectories(self):
+        for hold_time in [0.0, 0.1, 0.2]:
+            trajectory = jump_trajectory(hold_time)
+            for tick in [0, 5, 30, 100, len(trajectory) - 1]:
+                self.assertAlmostEqual(self.table.height(trajectory.hold_ticks, tick / 120),
+                                       trajectory.positions[tick], places=2)
+                self.assertAlmostEqual(self.table.vertical_speed(trajectory.hold_ticks, tick / 120),
+                                       trajectory.velocities[tick], places=2)
+
+    def test_interpolates_and_vectorizes(self):
+        between = self.table.height(10, 20.5 / 120)
+        self.assertAlmostEqual(between, (self.table.height(10, 20 / 120) + self.table.height(10, 21 / 120)) / 2,
+                               places=3)
+        heights = self.table.height(np.array([1, 10, 24]), np.array([0.2, 0.2, 0.2]))
+        self.assertEqual(heights.shape, (3,))
+        self.assertEqual(heights[2], self.table.height(24, 0.2))
+        # Past the end the car stays on the ground
+        self.assertEqual(self.table.height(24, 10), self.table.height(24, self.table.duration))
+
+    def test_hold_for_height(self):
+        table = self.table
+        time = 0.4
+        hold_time = table.hold_for_height(table.height(12, time), time)
+        self.assertEqual(hold_ticks_for(hold_time), 12)
+        middle = (table.height(12, time) + table.height(13, time)) / 2
+        self.assertTrue(11 / 120 < table.hold_for_height(middle, time) < 12 / 120)
+        self.assertEqual(table.hold_for_height(-50, time), 0)
+        self.assertIsNone(table.hold_for_height(table.max_height(24) + 1, time))
+
+    def test_stored_table_is_current(self):
+        built = build_jump_table()
+        self.assertTrue(np.allclose(built.heights, self.table.heights, atol=1e-3))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'table.npz')
+            save_jump_table(built, path)
+            loaded = load_jump_table(path)
+        self.assertTrue(np.array_equal(loaded.velocities, built.velocities))
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+import numpy as np
+from rlbot.utils.structures.game_data_struct import PlayerInfo
+
+from util.orientation import Orientation, relative_location, get_orientation
+from util.vec import Vec3, Vec3Array
+
+
+def create_car(pitch=0.3, yaw=1.2, roll=-0.4):
+    car = PlayerInfo()
+    car.physics.rotation.pitch = pitch
+    car.physics.rotation.yaw = yaw
+    car.physics.rotation.roll = roll
+    return car
+
+
+class TestOrientation(TestCase):
+    def setUp(self) -> None:
+        self.orientation = Orientation(create_car().physics.rotation)
+        self.center = Vec3(100, -200, 50)
+        self.points = [Vec3(0, 0, 0), Vec3(1000, 500, 300), Vec3(-250, 40, 17)]
+
+    def test_to_local(self):
+        local = self.orientation.to_local(Vec3Array.from_vectors(self.points), self.center)
+        for point, row in zip(self.points, local):
+            expected = relative_location(self.center, self.orientation, point)
+            self.assertAlmostEqual(expected.dist(row), 0, places=6)
+        self.assertEqual(self.orientation.to_local(self.points[1], self.center),
+                         relative_location(self.center, self.orientation, self.points[1]))
+
+    def test_to_world(self):
+        array = Vec3Array.from_vectors(self.points)
+        local = self.orientation.to_local(array, self.center)
+        world = self.orientation.to_world(local, self.center)
+        self.assertTrue(np.allclose(world.data, array.data))
+        point = self.orientation.to_world(self.orientation.to_local(self.points[1], self.center), self.center)
+        self.assertAlmostEqual(point.dist(self.points[1]), 0, places=6)
+
+    def test_get_orientation(self):
+        car = create_car()
+        orientation = get_orientation(car, 3, 10.0)
+        self.assertIs(get_orientation(car, 3, 10.0), orientation)
+        self.assertIsNot(get_orientation(car, 3, 10.1), orientation)
+        self.assertIsNot(get_orientation(car, 4, 10.1), get_orientation(car, 3, 10.1))
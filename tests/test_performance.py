@@ -0,0 +1,118 @@
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from tools.performance import TickMonitor, TickProfiler, NullProfiler, profile_agent
+
+
+class Agent:
+    name = 'Test'
+
+    def __init__(self):
+        self.retired = False
+        self.profiler = profile_agent(self, enabled=True)
+
+    def get_output(self, packet):
+        time.sleep(0.001)
+        self.profiler.lap('prediction')
+        with self.profiler.span('solver'):
+            pass
+        return packet
+
+    def retire(self):
+        self.retired = True
+
+
+class TestTickProfiler(TestCase):
+    def test_sections(self):
+        profiler = TickProfiler('test', capacity=4)
+        for _ in range(6):
+            profiler.start_tick()
+            profiler.lap('prediction')
+            with profiler.span('solver'):
+                pass
+            profiler.end_tick()
+        statistics = profiler.statistics()
+        self.assertEqual(set(statistics), {'total', 'prediction', 'solver', 'control'})
+        self.assertEqual(profiler.tick_count, 6)
+        self.assertEqual(profiler.histogram.sum(), 6)
+        self.assertEqual(len(profiler.worst), 5)
+        p50, p95, p99, maximum = statistics['total']
+        self.assertLessEqual(p50, p95)
+        self.assertLessEqual(p99, maximum)
+
+    def test_late_section(self):
+        # A section first seen after some ticks only has statistics over the ticks it was timed in
+        clock = [0.0]
+        with patch('tools.performance.time.perf_counter', lambda: clock[0]):
+            profiler = TickProfiler('test', capacity=10)
+            for tick in range(8):
+                profiler.start_tick()
+                if tick >= 6:
+                    with profiler.span('solver'):
+                        clock[0] += 0.002
+                profiler.end_tick()
+        for value in profiler.statistics()['solver']:
+            self.assertAlmostEqual(value, 2.0)
+
+    def test_profile_agent(self):
+        agent = Agent()
+        self.assertIsInstance(agent.profiler, TickProfiler)
+        self.assertEqual(agent.get_output(3), 3)
+        self.assertEqual(agent.profiler.tick_count, 1)
+        self.assertGreaterEqual(agent.profiler.statistics()['prediction'][0], 1)
+        self.assertIn('prediction', agent.profiler.report())
+
+    def test_disabled(self):
+        profiler = profile_agent(object(), enabled=False)
+        self.assertIsInstance(profiler, NullProfiler)
+        with profiler.span('solver'):
+            profiler.lap('prediction')
+
+
+class TestTickMonitor(TestCase):
+    def run_frames(self, frame_times, game_time_scale=1.0):
+        clock = [0.0]
+        with patch('tools.performance.time.perf_counter', lambda: clock[0]):
+            monitor = TickMonitor(budget=1 / 120, window=10)
+            for frame_time in frame_times:
+                clock[0] += frame_time
+                monitor.step(clock[0] * game_time_scale)
+        return monitor, clock
+
+    def test_smoothed_tps(self):
+        monitor, _ = self.run_frames([1 / 120] * 50 + [1 / 20])
+        self.assertAlmostEqual(monitor.raw_tps, 20)
+        # One late frame barely moves the smoothed value
+        self.assertGreater(monitor.tps, 90)
+        self.assertGreater(monitor.window_tps, 60)
+        self.assertEqual(monitor.late_frames, 1)
+
+    def test_window_tps(self):
+        monitor, _ = self.run_frames([1 / 60] * 30)
+        self.assertAlmostEqual(monitor.window_tps, 60)
+        self.assertAlmostEqual(monitor.tps, 60)
+        self.assertEqual(monitor.late_frames, 29)
+
+    def test_first_step_starts_clock(self):
+        clock = [0.0]
+        with patch('tools.performance.time.perf_counter', lambda: clock[0]):
+            monitor = TickMonitor(budget=1 / 120)
+            # Loading the agent takes long, that should not count as a frame
+            clock[0] += 5
+            monitor.step()
+            for _ in range(10):
+                clock[0] += 1 / 120
+                monitor.step()
+        self.assertAlmostEqual(monitor.tps, 120)
+        self.assertAlmostEqual(monitor.window_tps, 120)
+        self.assertEqual(monitor.late_frames, 0)
+
+    def test_drift(self):
+        monitor, _ = self.run_frames([1 / 120] * 121, game_time_scale=0.5)
+        self.assertAlmostEqual(monitor.drift, 0.5, places=6)
+
+    def test_remaining_budget(self):
+        monitor, clock = self.run_frames([1 / 120])
+        with patch('tools.performance.time.perf_counter', lambda: clock[0] + 0.002):
+            self.assertAlmostEqual(monitor.remaining_budget(), 1 / 120 - 0.002)
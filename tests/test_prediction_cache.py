@@ -0,0 +1,64 @@
+import ctypes
+from unittest import TestCase
+
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+from simulation.packets import create_ball_prediction
+from simulation.physics import SimulatedBall
+from util.prediction_cache import BallPredictionCache
+from util.vec import Vec3
+
+
+class PredictionAgent:
+    def __init__(self):
+        self.calls = 0
+        self.ball_prediction = BallPrediction()
+
+    def get_ball_prediction_struct(self):
+        # Like the framework, fills the same struct on every call
+        self.calls += 1
+        ball = SimulatedBall(Vec3(0, 0, 93), Vec3(self.calls * 100, 0, 0))
+        ctypes.memmove(ctypes.byref(self.ball_prediction), ctypes.byref(create_ball_prediction(ball, 10.0)),
+                       ctypes.sizeof(BallPrediction))
+        return self.ball_prediction
+
+
+class TestBallPredictionCache(TestCase):
+    def setUp(self) -> None:
+        self.cache = BallPredictionCache()
+        self.packet = GameTickPacket()
+        self.packet.game_info.seconds_elapsed = 10
+
+    def test_shared_within_tick(self):
+        agent_a, agent_b = PredictionAgent(), PredictionAgent()
+        prediction = self.cache.get(agent_a, self.packet)
+        self.assertIs(self.cache.get(agent_b, self.packet), prediction)
+        self.assertIs(self.cache.get(agent_a, self.packet), prediction)
+        self.assertEqual(agent_a.calls + agent_b.calls, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+        self.packet.game_info.seconds_elapsed = 10 + 1 / 120
+        self.assertIsNot(self.cache.get(agent_b, self.packet), prediction)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_kept_after_tick(self):
+        agent = PredictionAgent()
+        prediction = self.cache.get(agent, self.packet)
+        locations = prediction.view.locations.copy()
+        # The next fetch refills the agent's struct, the cached prediction of the last tick stays the same
+        self.packet.game_info.seconds_elapsed = 10 + 1 / 120
+        self.cache.get(agent, self.packet)
+        self.assertTrue((prediction.view.locations == locations).all())
+        self.assertIsNot(prediction.ball_prediction, agent.ball_prediction)
+
+    def test_derived_indexes(self):
+        prediction = self.cache.get(PredictionAgent(), self.packet)
+        self.assertEqual(prediction.slice_at_time(11).game_seconds, 11)
+        lowest = prediction.lowest_points(60)
+        self.assertEqual(len(lowest), 6)
+        heights = prediction.view.locations[:, 2]
+        for window, index in enumerate(lowest):
+            self.assertEqual(heights[index], heights[window * 60:(window + 1) * 60].min())
+        contacts = prediction.ground_contacts()
+        self.assertTrue((heights[contacts] <= 97.75).all())
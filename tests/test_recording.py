@@ -0,0 +1,142 @@
+import ctypes
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from rlbot.agents.base_agent import SimpleControllerState
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction, Slice
+
+from Eagle import FlyingEagle
+from Rhino import ChargingRhino
+from simulation.harness import SimulationHarness, create_agent
+from simulation.packets import create_field_info, create_game_tick_packet, create_ball_prediction
+from simulation.physics import SimulatedBall
+from simulation.replay import Replayer
+from training.exercises import aerial_mid_field
+from tools.recording import PacketRecorder, Recording, record_agent, record_dtype, SLICES_SUFFIX
+from util.vec import Vec3
+
+
+class TestRecording(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.dmrec')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        packet = create_game_tick_packet(2)
+        packet.game_info.frame_num = 7
+        packet.game_info.seconds_elapsed = 12.5
+        packet.game_cars[1].physics.location.x = 1234
+        packet.game_ball.physics.velocity.z = 500
+        prediction = create_ball_prediction(SimulatedBall(Vec3(0, 0, 500), Vec3(100, 0, 0)), 12.5)
+        controls = SimpleControllerState(throttle=0.5, steer=-1, boost=True)
+
+        with PacketRecorder(self.path, create_field_info(), num_cars=2, flush_interval=4) as recorder:
+            for _ in range(10):
+                recorder.record(packet, prediction, controls, 0.001)
+        recording = Recording(self.path)
+
+        self.assertEqual(len(recording), 10)
+        self.assertEqual(recording.field_info.num_boosts, 34)
+        self.assertEqual(bytes(recording.packet(9)), bytes(packet))
+        self.assertEqual(bytes(recording.ball_prediction(3)), bytes(prediction))
+        replayed = recording.controls_at(0)
+        self.assertEqual((replayed.throttle, replayed.steer, replayed.boost), (0.5, -1, True))
+        self.assertEqual(recording.find_frame(7), 0)
+        self.assertIsNone(recording.find_frame(8))
+        # The same prediction every tick is stored once
+        self.assertEqual(len(recording.slices), 360)
+
+    def test_compact(self):
+        packet = create_game_tick_packet(2)
+        ball = SimulatedBall(Vec3(0, 0, 500), Vec3(100, 0, 0))
+        # Ticks of the same prediction moving on one slice at a time, and a touch that changes it
+        path = create_ball_prediction(ball, 12.5)
+        predictions = [BallPrediction() for _ in range(4)]
+        for shift, prediction in enumerate(predictions[:3]):
+            prediction.num_slices = 300
+            ctypes.memmove(prediction.slices, ctypes.byref(path.slices[shift]), 300 * ctypes.sizeof(Slice))
+        ball.velocity = Vec3(-500, 0, 0)
+        predictions[3] = create_ball_prediction(ball, 12.5 + 3 / 60)
+
+        with PacketRecorder(self.path) as recorder:
+            for prediction in predictions:
+                recorder.record(packet, prediction, SimpleControllerState(), 0)
+        recording = Recording(self.path)
+        self.assertEqual(len(recording.slices), 302 + 360)
+        for index, prediction in enumerate(predictions):
+            self.assertEqual(bytes(recording.ball_prediction(index)), bytes(prediction))
+        # The records only hold the cars of the match
+        self.assertEqual(recording.num_cars, 2)
+        self.assertLess(record_dtype(2).itemsize, 2500)
+        self.assertEqual(os.path.getsize(self.path + SLICES_SUFFIX), (302 + 360) * ctypes.sizeof(Slice))
+
+    def test_only_cars_in_the_match_are_stored(self):
+        packet = create_game_tick_packet(3)
+        packet.game_cars[2].boost = 50
+        with PacketRecorder(self.path, num_cars=2) as recorder:
+            recorder.record(packet, None, SimpleControllerState(), 0)
+        replayed = Recording(self.path).packet(0)
+        self.assertEqual(replayed.num_cars, 2)
+        self.assertEqual(replayed.game_cars[2].boost, 0)
+        self.assertEqual(Recording(self.path).ball_prediction(0).num_slices, 0)
+
+    def test_not_a_recording(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'nothing to see here')
+        with self.assertRaises(ValueError):
+            Recording(self.path)
+
+    def test_record_agent_disabled(self):
+        agent = create_agent(ChargingRhino)
+        get_output = agent.get_output
+        self.assertIsNone(record_agent(agent, enabled=False))
+        self.assertEqual(agent.get_output, get_output)
+
+    def test_record_agent(self):
+        harness = SimulationHarness(create_agent(ChargingRhino))
+        path = record_agent(harness.agent, self.path)
+        harness.run(50)
+        harness.agent.retire()
+        recording = Recording(path)
+        self.assertEqual(len(recording), 50)
+        self.assertTrue(np.all(np.diff(recording.frames) == 1))
+        self.assertGreater(recording.ball_prediction(0).num_slices, 0)
+
+    def test_replay_is_deterministic(self):
+        harness = SimulationHarness(create_agent(ChargingRhino))
+        with PacketRecorder(self.path, harness.field_info) as recorder:
+            harness.run(300, recorder)
+        recording = Recording(self.path)
+        self.assertEqual(recording.slowest(3).shape, (3,))
+
+        replayer = Replayer(recording, create_agent(ChargingRhino))
+        record = replayer.replay()
+        self.assertEqual(len(record), 300)
+        self.assertEqual(len(replayer.mismatches(record)), 0)
+        self.assertEqual(replayer.around(10), (0, 11))
+        self.assertEqual(replayer.around(200, warm_up=50), (150, 201))
+
+    def test_replay_eagle_is_deterministic(self):
+        harness = SimulationHarness(create_agent(FlyingEagle), seed=0)
+        harness.set_game_state(aerial_mid_field(0, variation=1))
+        with PacketRecorder(self.path, harness.field_info) as recorder:
+            harness.run(120, recorder)
+        recording = Recording(self.path)
+
+        first = Replayer(recording, create_agent(FlyingEagle)).replay()
+        # A machine so slow that every deadline has passed already
+        clock = [0.0]
+
+        def slow_clock():
+            clock[0] += 0.01
+            return clock[0]
+
+        with patch('tools.performance.time.perf_counter', slow_clock):
+            second = Replayer(recording, create_agent(FlyingEagle)).replay()
+        self.assertEqual(first.controls.tobytes(), second.controls.tobytes())
@@ -0,0 +1,85 @@
+import multiprocessing
+import pickle
+from unittest import TestCase
+
+import numpy as np
+
+from gui.ring_buffer import SharedRingBuffer
+
+
+def rows(start, stop):
+    values = np.arange(start, stop, dtype=float)
+    return np.stack((values, values * 2, values * 3), axis=1)
+
+
+def produce(ring, batches, batch_size):
+    for batch in range(batches):
+        ring.write(rows(batch * batch_size, (batch + 1) * batch_size))
+
+
+class TestSharedRingBuffer(TestCase):
+    def setUp(self) -> None:
+        self.ring = SharedRingBuffer(capacity=8)
+
+    def tearDown(self) -> None:
+        self.ring.close()
+
+    def test_write_and_read(self):
+        self.ring.write(rows(0, 3))
+        self.ring.write(rows(3, 5))
+        self.assertEqual(len(self.ring), 5)
+        self.assertTrue(np.array_equal(self.ring.read(), rows(0, 5)))
+        self.assertEqual(self.ring.read().shape, (0, 3))
+
+    def test_wrap_around(self):
+        self.ring.write(rows(0, 6))
+        self.ring.read()
+        self.ring.write(rows(6, 12))
+        self.assertTrue(np.array_equal(self.ring.read(), rows(6, 12)))
+        self.assertEqual(self.ring.dropped, 0)
+
+    def test_drop_oldest(self):
+        self.ring.write(rows(0, 5))
+        self.ring.write(rows(5, 11))
+        self.assertEqual(len(self.ring), 8)
+        self.assertTrue(np.array_equal(self.ring.read(), rows(3, 11)))
+        self.assertEqual(self.ring.dropped, 3)
+
+        self.ring.write(rows(11, 31))  # Larger than the whole buffer
+        self.assertTrue(np.array_equal(self.ring.read(), rows(23, 31)))
+        self.assertEqual(self.ring.dropped, 15)
+
+    def test_attach_by_name(self):
+        other = pickle.loads(pickle.dumps(self.ring))
+        self.assertFalse(other.owner)
+        self.ring.write(rows(0, 4))
+        self.assertTrue(np.array_equal(other.read(), rows(0, 4)))
+        self.assertEqual(len(self.ring), 0)
+        other.close()
+
+    def test_consumer(self):
+        consumer = self.ring.consumer()
+        self.assertFalse(consumer.owner)
+        self.ring.write(rows(0, 2))
+        self.assertTrue(np.array_equal(consumer.read(), rows(0, 2)))
+        # Closing the reading side leaves the memory to the producer
+        consumer.close()
+        self.ring.write(rows(2, 4))
+        self.assertEqual(len(self.ring), 2)
+
+    def test_other_process(self):
+        ring = SharedRingBuffer(capacity=1 << 12)
+        try:
+            process = multiprocessing.get_context('spawn').Process(target=produce, args=(ring, 50, 64))
+            process.start()
+            received = []
+            while process.is_alive() or len(ring):
+                received.append(ring.read())
+            process.join()
+            received = np.concatenate(received)
+            # Whatever arrived arrived whole and in order, and everything else was counted as dropped
+            self.assertEqual(len(received) + ring.dropped, 50 * 64)
+            self.assertTrue(np.array_equal(received[:, 1], received[:, 0] * 2))
+            self.assertTrue(np.all(np.diff(received[:, 0]) > 0))
+        finally:
+            ring.close()
@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+import numpy as np
+
+from gui.series import Series
+
+
+class TestSeries(TestCase):
+    def test_append_and_grow(self):
+        series = Series(capacity=4)
+        for x in range(10):
+            series.append(x, x * 10)
+        x, y = series.data()
+        self.assertEqual(len(series), 10)
+        self.assertGreaterEqual(series.capacity, 10)
+        self.assertTrue(np.array_equal(x, np.arange(10)))
+        self.assertTrue(np.array_equal(y, np.arange(10) * 10))
+        self.assertEqual(series.last_x, 9)
+
+    def test_keep_last_and_wrap(self):
+        series = Series(capacity=8)
+        series.extend(np.arange(8), np.arange(8))
+        series.keep_last(3)
+        series.extend([8, 9, 10], [-1, 20, 3])  # Wraps around the end of the arrays
+        self.assertEqual(series.capacity, 8)
+        x, y = series.data()
+        self.assertTrue(np.array_equal(x, [5, 6, 7, 8, 9, 10]))
+        self.assertEqual(series.bounds(), (5, 10, -1, 20))
+
+    def test_bounds_follow_appends(self):
+        series = Series()
+        series.extend([0, 1, 2], [5, -5, 0])
+        self.assertEqual(series.bounds(), (0, 2, -5, 5))
+        series.append(3, 100)
+        series.extend([4, 5], [-50, 0])
+        self.assertEqual(series.bounds(), (0, 5, -50, 100))
+        series.keep_last(1)
+        self.assertEqual(series.bounds(), (5, 5, 0, 0))
+
+    def test_sorted(self):
+        series = Series()
+        series.extend([0, 1, 2], [0, 0, 0])
+        self.assertTrue(series.is_sorted)
+        series.append(1.5, 0)
+        self.assertFalse(series.is_sorted)
+
+    def test_decimate_keeps_peaks(self):
+        series = Series()
+        x = np.arange(100000, dtype=float)
+        y = np.sin(x / 1000)
+        y[12345] = 10
+        y[67890] = -10
+        series.extend(x, y)
+        decimated_x, decimated_y = series.decimate(500)
+        self.assertLessEqual(len(decimated_x), 1000)
+        self.assertTrue(np.all(np.diff(decimated_x) > 0))
+        self.assertEqual(decimated_y.max(), 10)
+        self.assertEqual(decimated_y.min(), -10)
+        self.assertEqual(decimated_x[0], 0)
+        self.assertIn(12345, decimated_x)
+
+        # Small series are left alone
+        small = Series()
+        small.extend([0, 1, 2], [1, 2, 3])
+        self.assertEqual(len(small.decimate(500)[0]), 3)
+
+    def test_decimate_visible_range(self):
+        series = Series()
+        series.extend(np.arange(1000), np.arange(1000))
+        x, y = series.decimate(1000, x_range=(100.5, 200))
+        self.assertEqual(x[0], 100)
+        self.assertEqual(x[-1], 201)
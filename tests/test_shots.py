@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+import math
+
+import numpy as np
+from rlbot.agents.base_agent import SimpleControllerState
+
+from simulation.packets import create_ball_prediction
+from simulation.physics import SimulatedBall, SimulatedCar
+from tools.helper import clamp2D, find_shot, get_target_goal
+from tools.drive_model import get_drive_model
+from tools.shots import ANGLE_WEIGHT, ARRIVAL_SLACK, MAX_SHOT_HEIGHT, clamp2D_many, find_shots, plan_shot, \
+    _find_shots
+from util.ball_prediction_analysis import as_view
+from util.vec import Vec3, Vec3Array
+
+
+class TestShots(TestCase):
+    def setUp(self) -> None:
+        self.random = np.random.default_rng(0)
+        self.goal_a, self.goal_b = get_target_goal(0)
+
+    def test_clamp2D_many_matches_clamp2D(self):
+        directions, starts, ends = (Vec3Array(self.random.normal(size=(200, 3))).normalized() for _ in range(3))
+        result = clamp2D_many(directions, starts, ends)
+        for i in range(200):
+            expected = clamp2D(directions[i], starts[i], ends[i])
+            self.assertEqual(result[i], expected)
+
+    def test_find_shots_matches_find_shot(self):
+        balls = self.random.uniform((-4000, -5000, 93), (4000, 5000, 1500), (200, 3))
+        car = Vec3(-800, -3000, 17)
+        # Includes the fallbacks: the car inside the ball and right below it
+        balls[0] = (car.x, car.y, car.z)
+        balls[1] = (car.x, car.y, 500)
+        result = find_shots(self.goal_a, self.goal_b, Vec3Array(balls), car)
+        for i, ball in enumerate(balls):
+            expected = find_shot(self.goal_a, self.goal_b, Vec3(*ball), car)
+            self.assertTrue(np.allclose(result.data[i], (expected.x, expected.y, expected.z), atol=1e-6))
+
+    def test_plan_shot(self):
+        # A ball rolling across the field in front of the car
+        prediction = as_view(create_ball_prediction(SimulatedBall(Vec3(-2000, 0, 93), Vec3(500, 0, 0)), 10.0))
+        car, forward = Vec3(0, -3000, 17), Vec3(0, 1, 0)
+        shot = plan_shot(prediction, 10.0, car, forward, 1000, self.goal_a, self.goal_b)
+        self.assertIsNotNone(shot)
+        self.assertLessEqual(shot.arrival_time, shot.time - 10.0 + 0.05)
+        self.assertAlmostEqual(shot.time, float(prediction.times[shot.index]))
+        self.assertEqual(shot.target, find_shot(self.goal_a, self.goal_b, shot.ball_location, car))
+        # Boosting gets there sooner
+        boosted = plan_shot(prediction, 10.0, car, forward, 1000, self.goal_a, self.goal_b, boost=True)
+        self.assertLessEqual(boosted.time, shot.time)
+
+    def test_plan_shot_score(self):
+        # Of the reachable slices the one quickest to drive to wins, not the earliest one
+        prediction = as_view(create_ball_prediction(SimulatedBall(Vec3(-2000, 0, 93), Vec3(500, 0, 0)), 10.0))
+        car, forward = Vec3(0, -3000, 17), Vec3(0, 1, 0)
+        shot = plan_shot(prediction, 10.0, car, forward, 1000, self.goal_a, self.goal_b)
+        times = prediction.times.astype(np.float64) - 10.0
+        candidates = np.flatnonzero((times > 0) & (prediction.locations[:, 2] < MAX_SHOT_HEIGHT))
+        balls = Vec3Array(prediction.locations[candidates])
+        arrival_times = get_drive_model().arrival_time(car, forward, 1000, balls.data)
+        angles = _find_shots(self.goal_a, self.goal_b, balls, car)[1]
+        scores = np.where(arrival_times <= times[candidates] + ARRIVAL_SLACK, arrival_times + ANGLE_WEIGHT * angles,
+                          np.inf)
+        self.assertEqual(shot.index, candidates[np.argmin(scores)])
+        self.assertGreater(shot.index, candidates[np.flatnonzero(np.isfinite(scores))[0]])
+
+    def test_plan_shot_behind(self):
+        # The car drives fast away from the ball, it has to turn around before it can get there
+        for ball in (SimulatedBall(Vec3(300, -800, 93), Vec3(300, 0, 0)),
+                     SimulatedBall(Vec3(300, -1500, 93), Vec3(-200, 0, 0))):
+            prediction = as_view(create_ball_prediction(ball, 10.0))
+            car = SimulatedCar(yaw=math.pi / 2)
+            car.velocity = car.forward() * 1500
+            shot = plan_shot(prediction, 10.0, car.location, car.forward(), 1500, self.goal_a, self.goal_b)
+            self.assertIsNotNone(shot)
+            # The simulated car steering straight at the ball gets there in the time the plan gives it
+            time = 0.0
+            while (shot.ball_location - car.location).flat().length() > 100:
+                relative = shot.ball_location - car.location
+                angle = (math.atan2(relative.y, relative.x) - car.yaw + math.pi) % (2 * math.pi) - math.pi
+                car.step(SimpleControllerState(throttle=1, steer=max(-1.0, min(1.0, angle * 5))), 1 / 120)
+                time += 1 / 120
+                self.assertLessEqual(time, shot.time - 10.0 + ARRIVAL_SLACK)
+
+    def test_plan_shot_unreachable(self):
+        # Flying high over the whole prediction
+        ball = SimulatedBall(Vec3(0, 0, 1500), Vec3(0, 0, 0))
+        prediction = as_view(create_ball_prediction(ball, 10.0, num_slices=30))
+        self.assertIsNone(plan_shot(prediction, 10.0, Vec3(0, -3000, 17), Vec3(0, 1, 0), 0,
+                                    self.goal_a, self.goal_b))
@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+import numpy as np
+from rlbot.agents.base_agent import SimpleControllerState
+
+from Eagle import FlyingEagle
+from Rhino import ChargingRhino
+from simulation.harness import SimulationHarness, create_agent
+from simulation.packets import create_field_info, create_ball_prediction
+from simulation.physics import SimulatedBall, SimulatedCar, BALL_RADIUS
+from training.exercises import aerial_mid_field
+import tools.drive_model
+import util.jump_table
+from util.ball_prediction_analysis import BallPredictionView
+from util.vec import Vec3
+
+
+class TestPackets(TestCase):
+    def test_field_info(self):
+        field_info = create_field_info()
+        self.assertEqual(field_info.num_boosts, 34)
+        self.assertEqual(sum(field_info.boost_pads[i].is_full_boost for i in range(34)), 6)
+        self.assertEqual(field_info.goals[0].location.y, -5120)
+        self.assertEqual(field_info.goals[1].direction.y, -1)
+
+    def test_ball_prediction(self):
+        ball = SimulatedBall(Vec3(0, 0, 1000), Vec3(600, 0, 0))
+        view = BallPredictionView(create_ball_prediction(ball, 5.0))
+        self.assertEqual(len(view), 360)
+        self.assertAlmostEqual(view.start_time, 5.0)
+        self.assertAlmostEqual(float(view.times[60]), 6.0, places=4)
+        self.assertAlmostEqual(float(view.locations[60][0]), 600, delta=1)
+        # The ball falls, bounces on the floor and never goes through it
+        self.assertGreaterEqual(view.locations[:, 2].min(), BALL_RADIUS - 1e-3)
+        self.assertTrue((view.velocities[:, 2] > 0).any())
+
+
+class TestSimulatedCar(TestCase):
+    def test_drive_and_jump(self):
+        car = SimulatedCar(yaw=0)
+        for _ in range(120):
+            car.step(SimpleControllerState(throttle=1), 1 / 120)
+        self.assertGreater(car.velocity.x, 900)
+        self.assertAlmostEqual(car.velocity.y, 0)
+
+        car.step(SimpleControllerState(throttle=1, jump=True), 1 / 120)
+        self.assertFalse(car.has_wheel_contact)
+        for _ in range(240):
+            car.step(SimpleControllerState(), 1 / 120)
+        self.assertTrue(car.has_wheel_contact)
+
+
+class TestSimulationHarness(TestCase):
+    def test_run_rhino(self):
+        harness = SimulationHarness(create_agent(ChargingRhino))
+        record = harness.run(600)
+        self.assertEqual(len(record), 600)
+        self.assertTrue(np.allclose(np.diff(record.game_times), 1 / 120))
+        self.assertGreater(record.ticks_per_second, 0)
+        # Rhino drives to the ball from the kickoff position
+        self.assertGreater(record.controls['throttle'].mean(), 0)
+        self.assertLess(harness.car.location.dist(harness.ball.location), 4000)
+
+    def test_initialize_loads_tables(self):
+        for agent_class in [ChargingRhino, FlyingEagle]:
+            util.jump_table._jump_table = None
+            SimulationHarness(create_agent(agent_class))
+            self.assertIsNotNone(util.jump_table._jump_table)
+        tools.drive_model._drive_model = None
+        SimulationHarness(create_agent(ChargingRhino))
+        self.assertIsNotNone(tools.drive_model._drive_model)
+
+    def test_deterministic(self):
+        first = SimulationHarness(create_agent(ChargingRhino)).run(300)
+        second = SimulationHarness(create_agent(ChargingRhino)).run(300)
+        self.assertTrue(np.array_equal(first.controls, second.controls))
+
+    def test_ball_prediction_follows_the_ball(self):
+        harness = SimulationHarness(create_agent(ChargingRhino), initialize=False)
+        harness.reset(ball_location=Vec3(0, 0, 800), ball_velocity=Vec3(0, 500, 0))
+        for _ in range(400):
+            harness.advance(SimpleControllerState())
+        prediction = BallPredictionView(harness.get_ball_prediction_struct())
+        for _ in range(400):
+            harness.advance(SimpleControllerState())
+        # The ball path had to be extended in between, ticks still land on the predicted slices
+        self.assertAlmostEqual(float(prediction.times[200]), harness.game_time, places=3)
+        self.assertAlmostEqual(float(prediction.locations[200][1]), harness.ball.location.y, delta=0.1)
+        self.assertAlmostEqual(float(prediction.locations[200][2]), harness.ball.location.z, delta=0.1)
+
+    def test_set_game_state(self):
+        harness = SimulationHarness(create_agent(FlyingEagle), seed=0)
+        harness.set_game_state(aerial_mid_field(0, variation=1))
+        self.assertEqual(harness.ball.velocity, Vec3(0, 600, 1500))
+        self.assertEqual(harness.car.boost, 100)
+        self.assertEqual(harness.packet.game_cars[0].physics.location.y, -1000)
+        record = harness.run(240)
+        self.assertEqual(len(record), 240)
+
+    def test_boost_pickup(self):
+        harness = SimulationHarness(create_agent(ChargingRhino), initialize=False)
+        harness.reset(car_location=Vec3(-3072, -4096, 17.01), car_boost=0)
+        harness.advance(SimpleControllerState())
+        self.assertEqual(harness.packet.game_cars[0].boost, 100)
+        self.assertFalse(harness.packet.game_boosts[3].is_active)
+        self.assertAlmostEqual(harness.packet.game_boosts[3].timer, 1 / 120, places=5)
@@ -0,0 +1,51 @@
+import math
+from unittest import TestCase
+
+import numpy as np
+
+from util.vec import Vec3, Vec3Array
+
+
+class TestVec3Array(TestCase):
+    def setUp(self) -> None:
+        self.vectors = [Vec3(1, 2, 3), Vec3(-4, 0, 2), Vec3(0, 0, 0), Vec3(3, -1, 0)]
+        self.array = Vec3Array.from_vectors(self.vectors)
+
+    def test_conversion(self):
+        self.assertEqual(len(self.array), 4)
+        self.assertEqual(self.array.to_vectors(), self.vectors)
+        self.assertEqual(self.array[1], Vec3(-4, 0, 2))
+        self.assertEqual(len(self.array[1:3]), 2)
+
+    def test_arithmetic(self):
+        other = Vec3(1, 1, 1)
+        result = (self.array + other) * 2 - self.array
+        for vector, row in zip(self.vectors, result):
+            self.assertEqual((vector + other) * 2 - vector, row)
+        result = np.zeros((4, 3)) + self.array
+        self.assertEqual(result, self.array)
+
+    def test_length_and_dist(self):
+        other = Vec3(1, -1, 2)
+        for vector, length, dist in zip(self.vectors, self.array.length(), self.array.dist(other)):
+            self.assertAlmostEqual(vector.length(), length)
+            self.assertAlmostEqual(vector.dist(other), dist)
+
+    def test_dot_cross(self):
+        other = Vec3(0.5, -2, 1)
+        for vector, dot, cross in zip(self.vectors, self.array.dot(other), self.array.cross(other)):
+            self.assertAlmostEqual(vector.dot(other), dot)
+            self.assertEqual(vector.cross(other), cross)
+
+    def test_normalized(self):
+        normalized = self.array.normalized()
+        self.assertAlmostEqual(normalized[0].dist(self.vectors[0].normalized()), 0)
+        self.assertEqual(normalized[2], Vec3())
+        self.assertEqual(self.array.flat()[0], self.vectors[0].flat())
+
+    def test_ang_to(self):
+        ideal = Vec3(0, 1, 0)
+        angles = self.array[[0, 1, 3]].ang_to(ideal)
+        for vector, angle in zip([self.vectors[i] for i in (0, 1, 3)], angles):
+            self.assertAlmostEqual(vector.ang_to(ideal), angle)
+        self.assertAlmostEqual(Vec3Array([[0, -2, 0]]).ang_to(ideal)[0], math.pi)